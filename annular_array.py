@@ -0,0 +1,385 @@
+# 环形相控阵声场计算库
+# 从 AI-N-ring-*.ipynb / ai-math.ipynb 中提取的函数，去掉对全局变量
+# (m、a1_list、k、rho0 等) 的依赖，输入输出均为 NumPy 数组。
+from dataclasses import dataclass
+
+import numpy as np
+
+from sound_field import jinc
+
+# 计算核版本号，修改任何会改变计算结果的代码时加 1，使 result_cache 中的旧结果失效
+KERNEL_VERSION = 1
+
+
+@dataclass
+class Medium:
+    """传播介质与激励参数"""
+    c: float = 1500.0      # 声速，单位：m/s
+    rho0: float = 1000.0   # 介质密度，单位：kg/m^3
+    f: float = 4e6         # 频率，单位：Hz
+    u: float = 1.0         # 质点振动速度
+
+    @property
+    def w(self):
+        """角频率"""
+        return 2 * np.pi * self.f
+
+    @property
+    def k(self):
+        """波数"""
+        return self.w / self.c
+
+    @property
+    def lambda_(self):
+        """波长"""
+        return self.c / self.f
+
+
+@dataclass
+class AnnularArray:
+    """
+    环形阵列几何参数。
+
+    a1、a2 的最后一维为圆环编号，前面的维度可以是批量维度，
+    例如形状为 (设计数, m) 时一次计算多个设计。
+    """
+    a1: np.ndarray        # 各圆环内半径
+    a2: np.ndarray        # 各圆环外半径
+    F: float = 10e-3      # 聚焦焦距，单位：m
+    center: str = 'mean'  # 圆环中心半径的计算规则，'mean' 或 'centroid'
+
+    def __post_init__(self):
+        self.a1 = np.asarray(self.a1, dtype=float)
+        self.a2 = np.asarray(self.a2, dtype=float)
+        if self.a1.shape != self.a2.shape:
+            raise ValueError("a1 和 a2 的形状必须相同")
+        if np.any(self.a1 > self.a2):
+            raise ValueError("内半径不能大于外半径")
+
+    @property
+    def m(self):
+        """圆环个数"""
+        return self.a1.shape[-1]
+
+    @classmethod
+    def equal_area(cls, R_max, m, delta_d, F=10e-3, center='mean'):
+        """按等面积规则生成阵列，见 calculate_annular_radii"""
+        return cls(*calculate_annular_radii(R_max, m, delta_d), F=F, center=center)
+
+    @classmethod
+    def equal_width(cls, R_max, m, delta_d, F=10e-3, center='centroid'):
+        """按等宽规则生成阵列，见 calculate_annular_radii_equal_width"""
+        return cls(*calculate_annular_radii_equal_width(R_max, m, delta_d), F=F, center=center)
+
+    def areas(self):
+        """各圆环面积"""
+        return np.pi * (self.a2 ** 2 - self.a1 ** 2)
+
+    def centers(self):
+        """各圆环的中心半径"""
+        return ring_centers(self.a1, self.a2, self.center)
+
+    def delays(self, medium):
+        """各圆环的聚焦延时，见 focus_delays"""
+        return focus_delays(self.centers(), self.F, medium.c)
+
+
+def calculate_annular_radii(R_max, m, delta_d):
+    """
+    计算等面积圆环的内外半径，总面积扣除 (m-1) 道间隙后均分。
+
+    参数:
+    R_max (float): 阵列最大半径。
+    m (int): 圆环个数。
+    delta_d (array_like): 圆环间距，可以是数组，用于批量生成多个设计。
+
+    返回:
+    tuple: (a1, a2)，形状为 delta_d.shape + (m,)。
+    """
+    delta_d = np.asarray(delta_d, dtype=float)
+    total_area = np.pi * R_max ** 2
+    ring_area = (total_area - (m - 1) * 2 * np.pi * R_max / 2 * delta_d) / m
+    a1 = np.zeros(delta_d.shape + (m,))
+    a2 = np.zeros(delta_d.shape + (m,))
+    for i in range(m):
+        if i > 0:
+            a1[..., i] = a2[..., i - 1] + delta_d
+        a2[..., i] = np.sqrt(a1[..., i] ** 2 + ring_area / np.pi)
+    return a1, a2
+
+
+def calculate_annular_radii_equal_width(R_max, m, delta_d):
+    """
+    计算等宽圆环的内外半径，宽度为 (R_max - (m-1)*delta_d) / m。
+
+    参数:
+    R_max (float): 阵列最大半径。
+    m (int): 圆环个数。
+    delta_d (array_like): 圆环间距。
+
+    返回:
+    tuple: (a1, a2)，形状为 delta_d.shape + (m,)。
+    """
+    delta_d = np.asarray(delta_d, dtype=float)
+    avgW = (R_max - (m - 1) * delta_d) / m
+    return calculate_annular_radii_w(avgW, m, delta_d)
+
+
+def calculate_annular_radii_w(we, m, delta_d):
+    """
+    按给定环宽计算圆环内外半径。
+
+    参数:
+    we (array_like): 环宽。
+    m (int): 圆环个数。
+    delta_d (array_like): 圆环间距。
+
+    返回:
+    tuple: (a1, a2)，形状为 broadcast(we, delta_d).shape + (m,)。
+    """
+    we, delta_d = np.broadcast_arrays(np.asarray(we, dtype=float), np.asarray(delta_d, dtype=float))
+    i = np.arange(m)
+    a1 = i * (we[..., None] + delta_d[..., None])
+    a2 = a1 + we[..., None]
+    return a1, a2
+
+
+def ring_centers(a1, a2, rule='mean'):
+    """
+    计算圆环的中心半径。
+
+    参数:
+    a1, a2 (array_like): 内外半径。
+    rule (str): 'mean' 取 (a1+a2)/2；'centroid' 取面积形心 2/3*(a2³-a1³)/(a2²-a1²)。
+
+    返回:
+    ndarray: 中心半径。
+    """
+    a1 = np.asarray(a1, dtype=float)
+    a2 = np.asarray(a2, dtype=float)
+    if rule == 'mean':
+        return (a1 + a2) / 2
+    if rule == 'centroid':
+        return 2 / 3 * (a2 ** 3 - a1 ** 3) / (a2 ** 2 - a1 ** 2)
+    raise ValueError(f"未知的中心半径规则: {rule}")
+
+
+def focus_delays(R_m, F, c):
+    """
+    聚焦延时 t_m = (sqrt(R_ref²+F²) - sqrt(R_m²+F²)) / c，
+    以最外圈为参考，最外圈延时为 0，内圈依次推迟激励。
+
+    参数:
+    R_m (array_like): 各圆环中心半径，最后一维为圆环编号。
+    F (float): 焦距。
+    c (float): 声速。
+
+    返回:
+    ndarray: 与 R_m 同形状的延时。
+    """
+    R_m = np.asarray(R_m, dtype=float)
+    R_ref = R_m.max(axis=-1, keepdims=True)
+    return (np.sqrt(R_ref ** 2 + F ** 2) - np.sqrt(R_m ** 2 + F ** 2)) / c
+
+
+def _ring_axis(x, field_ndim):
+    """把形状为 (*B, m) 的几何量扩展为 (*B, 1, ..., 1, m)，以便与场点广播"""
+    x = np.asarray(x, dtype=float)
+    return x.reshape(x.shape[:-1] + (1,) * field_ndim + x.shape[-1:])
+
+
+def annular_array_pressure(array, medium, r, theta, phi=0.0, t=0.0, jinc=jinc, attenuation=None,
+                           engine='numpy'):
+    """
+    远场近似下环形阵列的复声压，各圆环贡献按最后一维求和。
+
+    参数:
+    array (AnnularArray): 阵列几何，a1/a2 形状为 (*B, m)。
+    medium (Medium): 介质参数。
+    r (array_like): 场点距离。
+    theta (array_like): 场点极角。
+    phi (array_like): 场点方位角。
+    t (array_like): 时间。
+    jinc (callable): 指向性函数 2*J1(x)/x 的实现。
+    attenuation (callable): 衰减因子 attenuation(r, theta, f)，例如 attenuation.LayeredMedium，
+        默认不计衰减。
+    engine (str): 圆环求和的实现，'numpy'、'numba' 或 'auto'，见 annular_jit.use_jit；
+        JIT 计算核自带 J1 逼近，忽略 jinc 参数，medium.f 为数组时总是使用 NumPy。
+
+    返回:
+    ndarray: 形状为 (*B, *P) 的复数数组，P 为 r、theta、phi、t 广播后的形状。
+    """
+    r, theta, phi, t = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (r, theta, phi, t)))
+    nd = r.ndim
+    a1 = _ring_axis(array.a1, nd)
+    a2 = _ring_axis(array.a2, nd)
+    t_m = _ring_axis(array.delays(medium), nd)
+    # medium.f 可以是数组 (宽带计算)，此时须能与输出形状广播
+    k = np.asarray(medium.k)
+    w = np.asarray(medium.w)
+    x = np.sin(theta) * np.cos(phi)
+
+    use_jit = False
+    if engine != 'numpy':
+        import annular_jit
+        # 宽带计算 (medium.f 为数组) 时 JIT 计算核不适用
+        use_jit = annular_jit.use_jit(engine) and k.ndim == 0
+    if use_jit:
+        ring_sum = annular_jit.jit_ring_sum(array.a1, array.a2, np.exp(-1j * w * array.delays(medium)), k, x)
+    else:
+        # a²·J1(k·a·x)/(k·a·x) = a²/2·jinc(k·a·x)，x=0 时自然取极限 a²/2
+        term1 = a2 ** 2 / 2 * jinc(k[..., None] * a2 * x[..., None])
+        term2 = a1 ** 2 / 2 * jinc(k[..., None] * a1 * x[..., None])
+        ring_sum = np.sum((term1 - term2) * np.exp(-1j * w[..., None] * t_m), axis=-1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        amp = 1j * k * medium.rho0 * medium.c * medium.u / r
+    if attenuation is not None:
+        amp = amp * attenuation(r, theta, medium.f)
+    return amp * ring_sum * np.exp(1j * (w * t - k * r))
+
+
+def annular_array_pressure_axis(array, medium, r, t=0.0, attenuation=None):
+    """
+    轴线上环形阵列的复声压 (精确解)。
+
+    参数:
+    array (AnnularArray): 阵列几何，a1/a2 形状为 (*B, m)。
+    medium (Medium): 介质参数。
+    r (array_like): 轴向距离。
+    t (array_like): 时间。
+    attenuation (callable): 衰减因子 attenuation(r, theta, f)，分别作用于
+        从内外边缘到场点的两条路径，默认不计衰减。
+
+    返回:
+    ndarray: 形状为 (*B, *P) 的复数数组，P 为 r、t 广播后的形状。
+    """
+    r, t = np.broadcast_arrays(np.asarray(r, dtype=float), np.asarray(t, dtype=float))
+    nd = r.ndim
+    a1 = _ring_axis(array.a1, nd)
+    a2 = _ring_axis(array.a2, nd)
+    t_m = _ring_axis(array.delays(medium), nd)
+    k = np.asarray(medium.k)[..., None]
+    w = np.asarray(medium.w)
+    rr = r[..., None]
+    t1 = np.sqrt(a1 ** 2 + rr ** 2)
+    t2 = np.sqrt(a2 ** 2 + rr ** 2)
+    e1 = np.exp(-1j * k * t1)
+    e2 = np.exp(-1j * k * t2)
+    if attenuation is not None:
+        f = np.asarray(medium.f)[..., None]
+        e1 = e1 * attenuation(t1, np.arctan2(a1, rr), f)
+        e2 = e2 * attenuation(t2, np.arctan2(a2, rr), f)
+    ring_sum = np.sum(np.exp(-1j * w[..., None] * t_m) * (e1 - e2), axis=-1)
+    return medium.rho0 * medium.c * medium.u * np.exp(1j * w * t) * ring_sum
+
+
+def beam_pattern(array, medium, theta, r=None, phi=0.0, jinc=jinc, engine='numpy', attenuation=None):
+    """
+    焦距处的声压幅值随角度的分布。
+
+    参数:
+    array (AnnularArray): 阵列几何。
+    medium (Medium): 介质参数。
+    theta (array_like): 角度。
+    r (float): 观察距离，默认等于焦距。
+    phi (float): 方位角。
+    jinc (callable): 指向性函数的实现，可传入 sound_field.JincTable 以查表代替 j1。
+    engine (str): 圆环求和的实现，见 annular_array_pressure。
+    attenuation (callable): 衰减因子，见 annular_array_pressure。
+
+    返回:
+    ndarray: 声压幅值，形状为 (*B, len(theta))。
+    """
+    if r is None:
+        r = array.F
+    return np.abs(annular_array_pressure(array, medium, r, theta, phi, jinc=jinc, attenuation=attenuation,
+                                         engine=engine))
+
+
+def calculate_phase_delay(rho1, rho2, z_f, k):
+    """
+    近场计算中各圆环内外边缘相对于环中心的聚焦相位。
+
+    参数:
+    rho1, rho2 (array_like): 内外半径。
+    z_f (float): 焦距。
+    k (float): 波数。
+
+    返回:
+    tuple: (phi1, phi2)。
+    """
+    rho_avg = (rho1 + rho2) / 2
+    h_f0 = np.sqrt(rho_avg ** 2 + z_f ** 2)
+    h_f1 = np.sqrt(rho1 ** 2 + z_f ** 2)
+    h_f2 = np.sqrt(rho2 ** 2 + z_f ** 2)
+    return k * (h_f1 - h_f0), k * (h_f2 - h_f0)
+
+
+def single_ring_pressure(z, rho1, rho2, phi1, phi2, medium):
+    """
+    单个圆环的轴向声压。
+
+    参数:
+    z (array_like): 轴向距离。
+    rho1, rho2 (array_like): 内外半径。
+    phi1, phi2 (array_like): 内外边缘的相位。
+    medium (Medium): 介质参数。
+
+    返回:
+    ndarray: 广播后的复声压。
+    """
+    k = medium.k
+    return medium.rho0 * medium.c * medium.u * (
+        np.exp(-1j * k * np.sqrt(rho1 ** 2 + z ** 2) + 1j * phi1) -
+        np.exp(-1j * k * np.sqrt(rho2 ** 2 + z ** 2) + 1j * phi2))
+
+
+def total_pressure(array, medium, z):
+    """
+    圆环阵列在轴线上的总声压，使用边缘相位聚焦到 array.F。
+
+    参数:
+    array (AnnularArray): 阵列几何，a1/a2 形状为 (*B, m)。
+    medium (Medium): 介质参数。
+    z (array_like): 轴向距离。
+
+    返回:
+    ndarray: 形状为 (*B, *z.shape) 的复数数组。
+    """
+    z = np.asarray(z, dtype=float)
+    rho1 = _ring_axis(array.a1, z.ndim)
+    rho2 = _ring_axis(array.a2, z.ndim)
+    phi1, phi2 = calculate_phase_delay(rho1, rho2, array.F, medium.k)
+    return single_ring_pressure(z[..., None], rho1, rho2, phi1, phi2, medium).sum(axis=-1)
+
+
+def evaluate_sidelobe_mainlobe(pressure_values):
+    """
+    评价主瓣和旁瓣的平均声压，规则与 notebook 中的同名函数一致：
+    主瓣取最大值左右各 5 个点，旁瓣取主瓣外所有局部峰值的平均。
+
+    参数:
+    pressure_values (array_like): 声压幅值，最后一维为角度，可带批量维度。
+
+    返回:
+    tuple: (mainlobe_avg, sidelobe_avg)，形状为批量维度。
+    """
+    values = np.asarray(pressure_values, dtype=float)
+    num = values.shape[-1]
+    max_index = np.argmax(values, axis=-1)
+    max_index = np.where(max_index < num / 2, int(num / 2), max_index)[..., None]
+    mainlobe_start = np.maximum(0, max_index - 5)
+    mainlobe_end = np.minimum(num, max_index + 5)
+
+    idx = np.arange(num)
+    in_main = (idx >= mainlobe_start) & (idx < mainlobe_end)
+    mainlobe_avg = np.sum(values * in_main, axis=-1) / np.sum(in_main, axis=-1)
+
+    # 局部峰值：严格大于左右相邻点
+    peaks = np.zeros(values.shape, dtype=bool)
+    peaks[..., 1:-1] = (values[..., 1:-1] > values[..., :-2]) & (values[..., 1:-1] > values[..., 2:])
+    side = peaks & ~in_main
+    count = np.sum(side, axis=-1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sidelobe_avg = np.where(count > 0, np.sum(values * side, axis=-1) / count, 0.0)[()]
+    return mainlobe_avg, sidelobe_avg
@@ -0,0 +1,336 @@
+# 声场计算核的性能基准和回归跟踪
+# 覆盖波束图、轴线声压、二维声场图和设计扫描四类负载，每类取几种网格规模，
+# 记录耗时、峰值内存和每秒计算点数，追加到 JSON 历史文件并与保存的基线比较。
+# 同时用仓库中原始的逐点实现 (six-ring-math.py 的 SoundPower / AxisSoundPower、
+# AI-N-ring-equlArea-math.ipynb 的 total_pressure) 检查向量化结果的精度，
+# 原始函数从源码中按名字取出执行，不运行脚本中的绘图代码。
+#
+# 用法:
+#   python annular_bench.py                 # 运行并与基线比较，有回归时返回 1
+#   python annular_bench.py --set-baseline  # 把本次结果设为新的基线
+#   python annular_bench.py --quick         # 只跑每类负载的最小规模
+import argparse
+import ast
+import cmath
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+from scipy.special import j1
+
+import annular_jit
+import sound_field
+from annular_array import (AnnularArray, Medium, annular_array_pressure, annular_array_pressure_axis,
+                           total_pressure)
+from annular_sweep import design_grid, evaluate_design
+from field_map import sound_power_tile
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_HISTORY = os.path.join(_HERE, 'bench_history.json')
+SIX_RING_MATH = os.path.join(_HERE, 'six-ring-math.py')                         # 逐点参考实现
+NEAR_FIELD_NOTEBOOK = os.path.join(_HERE, 'AI-N-ring-equlArea-math.ipynb')     # 近场逐环参考实现
+TIME_TOLERANCE = 0.25      # 耗时超过基线 25% 判为回归
+MEMORY_TOLERANCE = 0.25    # 峰值内存超过基线 25% 判为回归
+TIME_FLOOR = 2e-3          # 耗时增加不足 2 ms 时不判为回归，避免小规模负载的计时抖动
+ACCURACY_TOL = 1e-9        # 与原始逐点实现的最大相对误差
+REPEAT = 3                 # 每个负载重复次数，耗时取最小值
+
+# 每类负载的规模：波束图和轴线为点数，二维图为边长，扫描为设计数
+SIZES = {
+    'beam_pattern': (1_000, 10_000, 100_000),
+    'axial_profile': (1_000, 10_000, 100_000),
+    'field_map': (128, 512, 1024),
+    'sweep': (4, 16, 64),
+}
+
+
+def _example_array(medium, m=6):
+    return AnnularArray.equal_area(7e-3, m, 0.6 * medium.lambda_, 10e-3)
+
+
+def _beam_pattern(n, engine='numpy'):
+    medium = Medium()
+    array = _example_array(medium)
+    theta = np.linspace(-np.pi / 2, np.pi / 2, n)
+    return lambda: annular_array_pressure(array, medium, array.F, theta, engine=engine), n
+
+
+def _beam_pattern_jit(n):
+    func, points = _beam_pattern(n, engine='numba')
+    func()   # 第一次调用包含编译时间，不计入
+    return func, points
+
+
+def _axial_profile(n):
+    medium = Medium()
+    array = _example_array(medium)
+    z = np.linspace(1e-4, 50e-3, n)
+
+    def run():
+        annular_array_pressure_axis(array, medium, z)
+        total_pressure(array, medium, z)
+    return run, 2 * n
+
+
+def _field_map(n):
+    medium = Medium()
+    array = _example_array(medium)
+    r = np.linspace(1e-3, 50e-3, n)
+    xita = np.linspace(-np.pi / 2, np.pi / 2, n)
+    tile_func = sound_power_tile(array.a1, array.a2, array.delays(medium))
+    return lambda: tile_func(r, xita), n * n
+
+
+def _sweep(n):
+    theta = np.linspace(-np.pi / 2, np.pi / 2, 1000)
+    designs = design_grid({'F': np.linspace(8e-3, 12e-3, n)})
+    return lambda: [evaluate_design(design, theta=theta) for design in designs], n * len(theta)
+
+
+# 负载名称到构造函数的映射，构造函数返回 (可调用对象, 计算点数)
+WORKLOADS = {
+    'beam_pattern': _beam_pattern,
+    'axial_profile': _axial_profile,
+    'field_map': _field_map,
+    'sweep': _sweep,
+}
+
+if annular_jit.NUMBA_AVAILABLE:
+    SIZES['beam_pattern_jit'] = SIZES['beam_pattern']
+    WORKLOADS['beam_pattern_jit'] = _beam_pattern_jit
+
+
+def measure(func, repeat=REPEAT):
+    """
+    测量一个负载的耗时和峰值内存。
+
+    耗时取 repeat 次中的最小值；峰值内存另外运行一次，用 tracemalloc 统计
+    (NumPy 的数组内存也会被记录)，避免追踪开销影响计时。
+
+    返回:
+    tuple: (秒, 峰值字节数)。
+    """
+    seconds = math.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        seconds = min(seconds, time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return seconds, peak
+
+
+def run_benchmarks(sizes=None, repeat=REPEAT):
+    """
+    运行所有负载。
+
+    参数:
+    sizes (dict): 负载名到规模列表的映射，默认 SIZES。
+    repeat (int): 重复次数。
+
+    返回:
+    list: 每个 (负载, 规模) 一条记录，包含 seconds、peak_bytes、points_per_second。
+    """
+    results = []
+    for name, workload_sizes in (sizes or SIZES).items():
+        for size in workload_sizes:
+            func, points = WORKLOADS[name](size)
+            seconds, peak = measure(func, repeat)
+            results.append({'workload': name, 'size': size, 'points': points, 'seconds': seconds,
+                            'peak_bytes': peak, 'points_per_second': points / seconds})
+    return results
+
+
+def _load_functions(source, names, namespace):
+    """
+    从脚本源码中只取出指定的函数定义和常数赋值并执行，跳过绘图等顶层代码。
+
+    参数:
+    source (str): Python 源码。
+    names (tuple): 要取出的函数名和顶层变量名，变量只取第一次赋值。
+    namespace (dict): 执行用的全局命名空间，须提供源码中用到的模块。
+
+    返回:
+    dict: 执行后的命名空间。
+    """
+    body, assigned = [], set()
+    for node in ast.parse(source).body:
+        if isinstance(node, ast.FunctionDef) and node.name in names:
+            body.append(node)
+        elif (isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name)
+              and node.targets[0].id in names and node.targets[0].id not in assigned):
+            assigned.add(node.targets[0].id)
+            body.append(node)
+    exec(compile(ast.Module(body=body, type_ignores=[]), '<reference>', 'exec'), namespace)
+    return namespace
+
+
+def load_six_ring_math(path=SIX_RING_MATH):
+    """six-ring-math.py 原始的 Jf / SoundPower / AxisSoundPower 及其使用的全局常数"""
+    with open(path, encoding='utf-8') as f:
+        source = f.read()
+    return _load_functions(source, ('f0', 'c0', 'u', 'p', 'w', 'lamd', 'k', 'Jf', 'SoundPower', 'AxisSoundPower'),
+                           {'np': np, 'math': math, 'cmath': cmath, 'j1': j1})
+
+
+def load_near_field_notebook(array, medium, path=NEAR_FIELD_NOTEBOOK):
+    """
+    notebook 中原始的 calculate_phase_delay / single_ring_pressure / total_pressure，
+    notebook 的全局变量 (k、rho0、c、u、F、a1_list、a2_list) 取自 array 和 medium。
+    """
+    with open(path, encoding='utf-8') as f:
+        cells = json.load(f)['cells']
+    source = '\n'.join(''.join(cell['source']) for cell in cells if cell['cell_type'] == 'code')
+    namespace = {'np': np, 'k': medium.k, 'rho0': medium.rho0, 'c': medium.c, 'u': medium.u, 'F': array.F,
+                 'a1_list': list(array.a1), 'a2_list': list(array.a2)}
+    return _load_functions(source, ('calculate_phase_delay', 'single_ring_pressure', 'total_pressure'), namespace)
+
+
+def _relative_error(vector, scalar):
+    scalar = np.asarray(scalar)
+    return float(np.max(np.abs(np.asarray(vector) - scalar)) / np.max(np.abs(scalar)))
+
+
+def check_accuracy(n=64):
+    """
+    在小网格上比较向量化实现与仓库中原始的逐点实现 (six-ring-math.py 和近场 notebook)。
+
+    参数:
+    n (int): 每个方向的采样点数，取偶数使角度网格不含 θ=0
+        (原始的 Jf 在 sin(θ)=0 处为 0/0)。
+
+    返回:
+    dict: 函数名到最大相对误差的映射。
+    """
+    medium = Medium()
+    array = _example_array(medium)
+    delays = array.delays(medium)
+    r = np.linspace(1e-3, 50e-3, n)
+    xita = np.linspace(-np.pi / 2, np.pi / 2, n)
+    t = np.linspace(0, 1e-6, 3)
+    six_ring = load_six_ring_math()
+    sound_power, axis_sound_power = six_ring['SoundPower'], six_ring['AxisSoundPower']
+
+    grid = sound_field.sound_power_grid(r, xita, array.a1, array.a2, t, delays)
+    ref = [[[[sound_power(ri, array.a1[m], array.a2[m], xj, tl - delays[m]) for tl in t]
+             for xj in xita] for ri in r] for m in range(array.m)]
+    axis = sound_field.axis_sound_power_grid(r, array.a1, array.a2, t, delays)
+    axis_ref = [[[axis_sound_power(ri, array.a1[m], array.a2[m], tl - delays[m]) for tl in t]
+                 for ri in r] for m in range(array.m)]
+    # annular_array_pressure 与各圆环 SoundPower 之和只差常数因子：
+    # i·k·ρ0·c·u/2 相对于 SoundPower 的 w·p·u (w = k·c)
+    scale = 1j * medium.rho0 * medium.u / (2 * six_ring['p'] * six_ring['u'])
+    pressure = annular_array_pressure(array, medium, r[:, None], xita)
+    pressure_ref = [[scale * sum(sound_power(ri, array.a1[m], array.a2[m], xj, -delays[m]) for m in range(array.m))
+                     for xj in xita] for ri in r]
+    notebook_total = load_near_field_notebook(array, medium)['total_pressure']
+    return {
+        'sound_power_grid': _relative_error(grid, ref),
+        'axis_sound_power_grid': _relative_error(axis, axis_ref),
+        'annular_array_pressure': _relative_error(pressure, pressure_ref),
+        'total_pressure': _relative_error(total_pressure(array, medium, r), [notebook_total(zi) for zi in r]),
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=_HERE, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_history(path=DEFAULT_HISTORY):
+    """读取历史文件，不存在时返回空历史 {'baseline': None, 'runs': []}"""
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {'baseline': None, 'runs': []}
+
+
+def compare(results, baseline, time_tol=TIME_TOLERANCE, memory_tol=MEMORY_TOLERANCE):
+    """
+    与基线比较，找出回归的负载。
+
+    参数:
+    results (list): run_benchmarks 的结果。
+    baseline (dict): 历史中的基线记录。
+    time_tol, memory_tol (float): 允许的相对增加量。
+
+    返回:
+    list: 回归说明，每条为字符串；基线中没有的负载不比较。
+    """
+    if not baseline:
+        return []
+    reference = {(row['workload'], row['size']): row for row in baseline['results']}
+    regressions = []
+    for row in results:
+        base = reference.get((row['workload'], row['size']))
+        if base is None:
+            continue
+        if row['seconds'] - base['seconds'] > max(base['seconds'] * time_tol, TIME_FLOOR):
+            regressions.append(f"{row['workload']}[{row['size']}] 耗时 {row['seconds'] * 1e3:.2f} ms，"
+                               f"基线 {base['seconds'] * 1e3:.2f} ms")
+        if row['peak_bytes'] > base['peak_bytes'] * (1 + memory_tol):
+            regressions.append(f"{row['workload']}[{row['size']}] 峰值内存 {row['peak_bytes'] / 2 ** 20:.1f} MB，"
+                               f"基线 {base['peak_bytes'] / 2 ** 20:.1f} MB")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="声场计算核的性能基准")
+    parser.add_argument('--history', default=DEFAULT_HISTORY, help="JSON 历史文件")
+    parser.add_argument('--set-baseline', action='store_true', help="把本次结果设为基线")
+    parser.add_argument('--quick', action='store_true', help="只运行每类负载的最小规模")
+    parser.add_argument('--repeat', type=int, default=REPEAT, help="每个负载的重复次数")
+    args = parser.parse_args(argv)
+
+    sizes = {name: values[:1] for name, values in SIZES.items()} if args.quick else SIZES
+    accuracy = check_accuracy()
+    results = run_benchmarks(sizes, args.repeat)
+    run = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'commit': _git_commit(),
+        'host': platform.node(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'accuracy': accuracy,
+        'results': results,
+    }
+
+    print(f"{'负载':<14}{'规模':>8}{'耗时 (ms)':>12}{'峰值 (MB)':>12}{'点/秒':>14}")
+    for row in results:
+        print(f"{row['workload']:<14}{row['size']:>8}{row['seconds'] * 1e3:>12.2f}"
+              f"{row['peak_bytes'] / 2 ** 20:>12.2f}{row['points_per_second']:>14.3g}")
+    for name, error in accuracy.items():
+        print(f"精度 {name}: {error:.2e}")
+
+    history = load_history(args.history)
+    problems = compare(results, history['baseline'])
+    problems += [f"{name} 与原始实现的误差 {error:.2e} 超过 {ACCURACY_TOL:.0e}"
+                 for name, error in accuracy.items() if error > ACCURACY_TOL]
+    run['regressions'] = problems
+    history['runs'].append(run)
+    if args.set_baseline or history['baseline'] is None:
+        history['baseline'] = run
+    with open(args.history, 'w', encoding='utf-8') as f:
+        json.dump(history, f, ensure_ascii=False, indent=1)
+
+    for problem in problems:
+        print("回归:", problem)
+    return 1 if problems else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,218 @@
+# 环形阵列计算的命令行入口
+# 读取 JSON/YAML 任务文件，在计算节点上无界面运行，结果写成 NPZ、Parquet 或 CSV。
+# 不导入 matplotlib；NumPy/SciPy 和各计算模块只在执行任务时导入，
+# 以便调度器一次启动成千上万个任务。
+#
+# 用法:
+#   python annular_cli.py job.json -o result.npz
+#   python annular_cli.py sweep.yaml -o sweep.parquet --workers 8
+import argparse
+import json
+import os
+import sys
+
+# 任务文件中未指定时使用的默认值，单位均为国际单位制
+DEFAULT_JOB = {
+    'kind': 'pattern',          # 任务类型，见 JOB_KINDS
+    'rule': 'equal_area',       # 圆环半径生成规则，见 annular_sweep.RADII_RULES
+    'm': 6,                     # 圆环个数
+    'R_max': 7e-3,              # 阵列最大半径 (m)
+    'delta_d': 0.6 * 1500 / 4e6,  # 圆环间距 (m)
+    'F': 10e-3,                 # 焦距 (m)
+    'f0': 4e6,                  # 频率 (Hz)
+    'c0': 1500.0,               # 声速 (m/s)
+    'theta': [-1.5707963267948966, 1.5707963267948966, 1000],  # 角度网格 [起点, 终点, 点数]
+    'depths': [5e-3, 40e-3, 351],  # 轴向距离或焦深 [起点, 终点, 点数] (m)
+    'attenuation': None,        # 衰减模型：None、'water' 或 'water_tissue'
+    'metrics': None,            # 输出的指标，默认 beam_metrics.METRICS 全部
+}
+
+FORMATS = ('npz', 'parquet', 'csv')
+
+
+def load_job(path):
+    """
+    读取任务文件，.yaml/.yml 需要安装 PyYAML，其他后缀按 JSON 解析。
+
+    返回:
+    dict: 补全默认值后的任务参数。
+    """
+    with open(path, encoding='utf-8') as f:
+        if path.endswith(('.yaml', '.yml')):
+            try:
+                import yaml
+            except ImportError:
+                raise SystemExit("读取 YAML 任务文件需要安装 PyYAML (pip install pyyaml)")
+            job = yaml.safe_load(f)
+        else:
+            job = json.load(f)
+    unknown = set(job) - set(DEFAULT_JOB) - {'axes', 'fixed', 'workers', 'clock', 'bits', 'output'}
+    if unknown:
+        raise SystemExit(f"任务文件中有未知的参数: {sorted(unknown)}")
+    return {**DEFAULT_JOB, **job}
+
+
+def _medium(job):
+    from annular_array import Medium
+    return Medium(c=float(job['c0']), f=float(job['f0']))
+
+
+def _array(job, medium):
+    import numpy as np
+    from annular_array import AnnularArray
+    from annular_sweep import RADII_RULES
+    a1, a2 = RADII_RULES[job['rule']](float(job['R_max']), int(job['m']), float(job['delta_d']))
+    if not np.all(np.isfinite(a2)) or np.any(a2 <= a1):
+        raise SystemExit("圆环间距过大，该设计不可实现")
+    return AnnularArray(a1, a2, F=float(job['F']))
+
+
+def _attenuation(job):
+    if job['attenuation'] is None:
+        return None
+    import attenuation
+    models = {'water': attenuation.WATER, 'water_tissue': attenuation.WATER_TISSUE}
+    if job['attenuation'] not in models:
+        raise SystemExit(f"未知的衰减模型: {job['attenuation']}，可选 {sorted(models)}")
+    return models[job['attenuation']]
+
+
+def _linspace(spec):
+    import numpy as np
+    start, stop, num = spec
+    return np.linspace(float(start), float(stop), int(num))
+
+
+def _metric_names(job):
+    from beam_metrics import METRICS
+    names = job['metrics'] or list(METRICS)
+    unknown = set(names) - set(METRICS)
+    if unknown:
+        raise SystemExit(f"未知的指标: {sorted(unknown)}，可选 {list(METRICS)}")
+    return names
+
+
+def run_pattern(job, out_path, workers=None):
+    """波束图任务：焦距处的波束图和评价指标"""
+    import numpy as np
+    from annular_array import annular_array_pressure
+    from beam_metrics import beam_metrics
+    medium = _medium(job)
+    array = _array(job, medium)
+    theta = _linspace(job['theta'])
+    pattern = np.abs(annular_array_pressure(array, medium, array.F, theta, attenuation=_attenuation(job)))
+    metrics = beam_metrics(pattern, theta)
+    meta = {name: float(metrics[name][0]) for name in _metric_names(job)}
+    return {'theta': theta, 'amplitude': pattern}, meta
+
+
+def run_axis(job, out_path, workers=None):
+    """轴线任务：轴线上的声压幅值 (精确解)"""
+    import numpy as np
+    from annular_array import annular_array_pressure_axis
+    medium = _medium(job)
+    array = _array(job, medium)
+    z = _linspace(job['depths'])
+    p = annular_array_pressure_axis(array, medium, z, attenuation=_attenuation(job))
+    return {'z': z, 'amplitude': np.abs(p), 'phase': np.angle(p)}, {'peak_z': float(z[np.argmax(np.abs(p))])}
+
+
+def run_zones(job, out_path, workers=None):
+    """延时任务：多焦深的量化延时表"""
+    from delay_law import CLOCK, zone_table
+    medium = _medium(job)
+    array = _array(job, medium)
+    table = zone_table(array, medium, _linspace(job['depths']), float(job.get('clock', CLOCK)), job.get('bits'))
+    columns = {name: table[name] for name in ('depth', 'gain_db', 'quantized_gain_db', 'loss_db', 'phase_error')}
+    for n in range(array.m):
+        columns[f'counts_{n}'] = table['counts'][:, n]
+    return columns, {'clock': float(job.get('clock', CLOCK))}
+
+
+def run_sweep_job(job, out_path, workers=None):
+    """扫描任务：设计参数的笛卡尔积，每个设计一行"""
+    import numpy as np
+    from annular_sweep import DEFAULT_DESIGN, run_sweep
+    axes = {name: np.asarray(values, dtype=float) for name, values in (job.get('axes') or {}).items()}
+    fixed = {name: job[name] for name in DEFAULT_DESIGN if name not in axes}
+    fixed.update(job.get('fixed') or {})
+    # run_sweep 逐行写出全部列的 CSV，先写到旁边的临时文件，完成后删除，
+    # 输出文件由 write_results 按选定的指标写出
+    csv_path = out_path + '.partial.csv'
+    rows = run_sweep(axes, csv_path, fixed=fixed, rule=job['rule'], medium=_medium(job),
+                     theta=_linspace(job['theta']), workers=workers or job.get('workers') or 1,
+                     attenuation=_attenuation(job))
+    os.remove(csv_path)
+    names = ['design'] + list(DEFAULT_DESIGN) + _metric_names(job)
+    return {name: np.array([row[name] for row in rows]) for name in names}, {}
+
+
+# 任务类型到执行函数的映射，函数返回 (等长一维列, 标量结果)
+JOB_KINDS = {
+    'pattern': run_pattern,
+    'axis': run_axis,
+    'zones': run_zones,
+    'sweep': run_sweep_job,
+}
+
+
+def write_results(path, columns, meta, job, fmt=None):
+    """
+    写出结果。
+
+    参数:
+    path (str): 输出路径。
+    columns (dict): 列名到等长一维数组的映射。
+    meta (dict): 标量结果，NPZ 中保存为零维数组，Parquet 中保存在表的元数据里。
+    job (dict): 任务参数，以 JSON 字符串一起保存，便于追溯。
+    fmt (str): 'npz'、'parquet' 或 'csv'，默认由后缀判断。
+    """
+    import numpy as np
+    fmt = fmt or os.path.splitext(path)[1].lstrip('.') or 'npz'
+    if fmt not in FORMATS:
+        raise SystemExit(f"不支持的输出格式: {fmt}，可选 {FORMATS}")
+    job_text = json.dumps(job, ensure_ascii=False, default=float)
+    if fmt == 'npz':
+        np.savez(path, job=np.array(job_text), **columns, **{f'meta_{k}': v for k, v in meta.items()})
+    elif fmt == 'parquet':
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise SystemExit("写 Parquet 需要安装 pyarrow (pip install pyarrow)")
+        table = pa.table(columns)
+        table = table.replace_schema_metadata({'job': job_text, 'meta': json.dumps(meta)})
+        pq.write_table(table, path)
+    else:
+        import csv
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(list(columns))
+            writer.writerows(zip(*(np.asarray(v).tolist() for v in columns.values())))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="环形阵列声场批量计算")
+    parser.add_argument('job', help="JSON 或 YAML 任务文件")
+    parser.add_argument('-o', '--output', help="输出文件，后缀决定格式 (.npz/.parquet/.csv)，"
+                                               "默认为任务文件中的 output 或 <任务文件名>.npz")
+    parser.add_argument('--format', choices=FORMATS, help="输出格式，覆盖后缀")
+    parser.add_argument('--workers', type=int, help="扫描任务的进程数，默认为任务文件中的 workers 或 1")
+    args = parser.parse_args(argv)
+
+    job = load_job(args.job)
+    if job['kind'] not in JOB_KINDS:
+        raise SystemExit(f"未知的任务类型: {job['kind']}，可选 {sorted(JOB_KINDS)}")
+    out_path = args.output or job.get('output') or os.path.splitext(args.job)[0] + '.npz'
+    if args.format and os.path.splitext(out_path)[1].lstrip('.') != args.format:
+        out_path = os.path.splitext(out_path)[0] + '.' + args.format
+    columns, meta = JOB_KINDS[job['kind']](job, out_path, args.workers)
+    write_results(out_path, columns, meta, job, args.format)
+    for name, value in meta.items():
+        print(f"{name}: {value:g}")
+    print(f"已写入 {out_path}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
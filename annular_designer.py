@@ -0,0 +1,108 @@
+import streamlit as st
+import numpy as np
+import matplotlib.pyplot as plt
+
+from annular_array import AnnularArray, Medium, annular_array_pressure, annular_array_pressure_axis
+from annular_sweep import RADII_RULES
+from attenuation import WATER_TISSUE
+from beam_metrics import beam_metrics
+
+st.title("环形阵列设计")
+
+# 参数不变时直接返回上次的结果 (Streamlit 1.10 没有 st.cache_data，退回 st.cache)
+if hasattr(st, 'cache_data'):
+    memo = st.cache_data(max_entries=64)
+else:
+    memo = st.cache(max_entries=64, allow_output_mutation=True)
+
+
+@memo
+def compute(rule, m, R_max, kerf, F, f0, c0, tissue, n_theta=1000, n_map=256):
+    """计算波束图、轴线声压和 (x, z) 平面的声压分布，参数均为标量以便缓存"""
+    medium = Medium(c=c0, f=f0)
+    with np.errstate(invalid='ignore'):
+        a1, a2 = RADII_RULES[rule](R_max, m, kerf)
+    if not np.all(np.isfinite(a2)) or np.any(a2 <= a1):
+        return None
+    array = AnnularArray(a1, a2, F=F)
+    attenuation = WATER_TISSUE if tissue else None
+
+    theta = np.linspace(-np.pi / 2, np.pi / 2, n_theta)
+    pattern = np.abs(annular_array_pressure(array, medium, F, theta, attenuation=attenuation))
+    metrics = {name: float(value[0]) for name, value in beam_metrics(pattern, theta).items()}
+
+    z = np.linspace(F / 50, 3 * F, n_theta)
+    axial = np.abs(annular_array_pressure_axis(array, medium, z, attenuation=attenuation))
+
+    # 远场模型在 (x, z) 网格上计算：r = sqrt(x²+z²)，θ = atan(x/z)
+    x = np.linspace(-R_max * 1.5, R_max * 1.5, n_map)
+    zz = np.linspace(F / 4, 3 * F, n_map)
+    X, Z = np.meshgrid(x, zz)
+    field = np.abs(annular_array_pressure(array, medium, np.hypot(X, Z), np.arctan2(X, Z),
+                                          attenuation=attenuation))
+    return {'a1': a1, 'a2': a2, 'delays': array.delays(medium), 'theta': theta, 'pattern': pattern,
+            'metrics': metrics, 'z': z, 'axial': axial, 'x': x, 'zz': zz, 'field': field}
+
+
+col1, col2, col3 = st.columns(3)
+with col1:
+    m = st.number_input("圆环个数 m", min_value=1, max_value=32, value=6, step=1)
+    rule = st.selectbox("圆环规则", list(RADII_RULES))
+with col2:
+    f0_mhz = st.number_input("频率 f0 (MHz)", min_value=0.1, value=4.0, step=0.25)
+    c0 = st.number_input("声速 c0 (m/s)", min_value=100.0, value=1500.0, step=10.0)
+with col3:
+    R_max_mm = st.number_input("最大半径 Rmax (mm)", min_value=0.5, value=7.0, step=0.5)
+    F_mm = st.number_input("焦距 F (mm)", min_value=0.5, value=10.0, step=0.5)
+
+lam = c0 / (f0_mhz * 1e6)
+kerf_lam = st.slider("圆环间距 (λ)", 0.0, 2.0, 0.6, 0.05)
+tissue = st.checkbox("计入水 → 组织衰减 (z_tissue = 24.6 mm)")
+
+with st.spinner("计算中..."):
+    result = compute(rule, int(m), R_max_mm * 1e-3, kerf_lam * lam, F_mm * 1e-3, f0_mhz * 1e6, c0, tissue)
+
+if result is None:
+    st.error("圆环间距过大，该设计不可实现")
+    st.stop()
+
+metrics = result['metrics']
+col1, col2, col3, col4 = st.columns(4)
+with col1: st.metric("-3 dB 主瓣宽度", f"{np.degrees(metrics['mainlobe_width_3db']):.2f}°")
+with col2: st.metric("-6 dB 主瓣宽度", f"{np.degrees(metrics['mainlobe_width_6db']):.2f}°")
+with col3: st.metric("峰值旁瓣电平", f"{metrics['psl_db']:.1f} dB")
+with col4: st.metric("积分旁瓣比", f"{metrics['isr_db']:.1f} dB")
+
+fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 4))
+pattern = result['pattern']
+ax1.plot(np.degrees(result['theta']), 20 * np.log10(pattern / pattern.max()))
+ax1.set_ylim(-60, 0)
+ax1.set_xlabel('θ (deg)')
+ax1.set_ylabel('dB')
+ax1.set_title('beam pattern')
+ax1.grid(True)
+ax2.plot(result['z'] * 1e3, result['axial'] / result['axial'].max())
+ax2.axvline(F_mm, color='red', linestyle='--')
+ax2.set_xlabel('z (mm)')
+ax2.set_ylabel('|p| (norm.)')
+ax2.set_title('axial profile')
+ax2.grid(True)
+st.pyplot(fig)
+
+fig, ax = plt.subplots(figsize=(8, 6))
+field = result['field']
+x_mm, z_mm = result['x'] * 1e3, result['zz'] * 1e3
+image = ax.imshow(20 * np.log10(field / field.max()), extent=[x_mm[0], x_mm[-1], z_mm[-1], z_mm[0]],
+                  vmin=-40, vmax=0, aspect='auto', cmap='jet')
+fig.colorbar(image, ax=ax, label='dB')
+ax.set_xlabel('x (mm)')
+ax.set_ylabel('z (mm)')
+ax.set_title('|p| (far-field model)')
+st.pyplot(fig)
+
+st.dataframe({
+    '环编号': np.arange(1, len(result['a1']) + 1),
+    '内径 (mm)': result['a1'] * 1e3,
+    '外径 (mm)': result['a2'] * 1e3,
+    '延时 (ns)': result['delays'] * 1e9,
+})
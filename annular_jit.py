@@ -0,0 +1,132 @@
+# 圆环求和的 JIT 编译计算核 (可选，依赖 numba)
+# annular_array_pressure 的 NumPy 实现要生成 (*B, *P, m) 大小的复数临时数组；
+# 这里把逐环循环、J1 计算和累加合并在一个并行循环里，每个场点只写一次输出。
+# 未安装 numba 时自动退回 NumPy 实现，通过 annular_array_pressure(engine=...) 逐次选择。
+import math
+import os
+import warnings
+
+import numpy as np
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+NUMBA_AVAILABLE = numba is not None
+ENGINES = ('numpy', 'numba', 'auto')
+WORK_PER_THREAD = 20_000   # 每个线程至少分到的圆环求值次数，工作量小时少开线程
+JIT_TOL = 1e-7             # J1 有理逼近带来的相对误差上限，tests/test_annular_jit.py 用它对照 NumPy 实现
+
+_warned = False
+
+
+def use_jit(engine):
+    """
+    判断本次调用是否使用 JIT 计算核。
+
+    参数:
+    engine (str): 'numpy' 总是使用 NumPy；'numba' 要求使用 JIT，未安装 numba 时
+        给出一次警告后退回 NumPy；'auto' 在安装了 numba 时使用 JIT。
+
+    返回:
+    bool: 是否使用 JIT。
+    """
+    global _warned
+    if engine not in ENGINES:
+        raise ValueError(f"未知的计算引擎: {engine}，可选 {ENGINES}")
+    if engine == 'numpy':
+        return False
+    if not NUMBA_AVAILABLE:
+        if engine == 'numba' and not _warned:
+            warnings.warn("未安装 numba，改用 NumPy 实现", RuntimeWarning, stacklevel=3)
+            _warned = True
+        return False
+    return True
+
+
+def _jinc_scalar(x):
+    """
+    2·J1(x)/x，J1 取 Numerical Recipes 的有理逼近 (绝对误差约 1e-8)。
+
+    |x| < 8 时分子含因子 x，直接约去，x=0 处自然得到 1。
+    """
+    ax = abs(x)
+    if ax < 8.0:
+        y = x * x
+        num = (72362614232.0 + y * (-7895059235.0 + y * (242396853.1 + y * (
+            -2972611.439 + y * (15704.48260 + y * (-30.16036606))))))
+        den = (144725228442.0 + y * (2300535178.0 + y * (18583304.74 + y * (
+            99447.43394 + y * (376.9991397 + y)))))
+        return 2.0 * num / den
+    z = 8.0 / ax
+    y = z * z
+    xx = ax - 2.356194491
+    p1 = 1.0 + y * (0.183105e-2 + y * (-0.3516396496e-4 + y * (0.2457520174e-5 + y * (-0.240337019e-6))))
+    p2 = 0.04687499995 + y * (-0.2002690873e-3 + y * (0.8449199096e-5 + y * (
+        -0.88228987e-6 + y * 0.105787412e-6)))
+    # J1 为奇函数、jinc 为偶函数，因此直接用 |x|
+    return 2.0 * math.sqrt(0.636619772 / ax) * (math.cos(xx) * p1 - z * math.sin(xx) * p2) / ax
+
+
+def _ring_sum_kernel(a1, a2, phase, k, x, out):
+    """
+    out[b, p] = Σ_n (a2²·jinc(k·a2·x) - a1²·jinc(k·a1·x)) / 2 · phase[b, n]，
+    a1/a2/phase 形状为 (nb, m)，x 形状为 (P,)，out 形状为 (nb, P)。
+    """
+    nb, m = a1.shape
+    n_points = x.shape[0]
+    for idx in numba.prange(nb * n_points):
+        b = idx // n_points
+        p = idx % n_points
+        kx = k * x[p]
+        acc = 0j
+        for n in range(m):
+            outer = a2[b, n]
+            inner = a1[b, n]
+            term = 0.5 * (outer * outer * _jinc_scalar(kx * outer) - inner * inner * _jinc_scalar(kx * inner))
+            acc += term * phase[b, n]
+        out[b, p] = acc
+
+
+if NUMBA_AVAILABLE:
+    _jinc_scalar = numba.njit(cache=True)(_jinc_scalar)
+    _ring_sum_kernel = numba.njit(parallel=True, cache=True)(_ring_sum_kernel)
+
+
+def thread_count(work):
+    """
+    按工作量选择线程数：每个线程至少 WORK_PER_THREAD 次圆环求值，
+    不超过 numba 的线程上限 (可用环境变量 NUMBA_NUM_THREADS 限制)。
+    """
+    limit = numba.config.NUMBA_NUM_THREADS if NUMBA_AVAILABLE else (os.cpu_count() or 1)
+    return int(max(1, min(limit, work // WORK_PER_THREAD)))
+
+
+def jit_ring_sum(a1, a2, phase, k, x):
+    """
+    用 JIT 计算核求各圆环指向性的加权和，不生成逐环的临时数组。
+
+    参数:
+    a1, a2 (ndarray): 圆环内外半径，形状为 (*B, m)。
+    phase (ndarray): 各圆环的复相位因子 e^{-jωt_m}，形状为 (*B, m)。
+    k (float): 波数 (标量)。
+    x (ndarray): sinθ·cosφ，形状为 P。
+
+    返回:
+    ndarray: 形状为 (*B, *P) 的复数数组。
+    """
+    batch = a1.shape[:-1]
+    m = a1.shape[-1]
+    a1 = np.ascontiguousarray(a1, dtype=float).reshape(-1, m)
+    a2 = np.ascontiguousarray(a2, dtype=float).reshape(-1, m)
+    phase = np.ascontiguousarray(np.broadcast_to(phase, batch + (m,)), dtype=complex).reshape(-1, m)
+    x = np.asarray(x, dtype=float)
+    out = np.empty((a1.shape[0], x.size), dtype=complex)
+    previous = numba.get_num_threads()
+    numba.set_num_threads(thread_count(out.size * m))
+    try:
+        _ring_sum_kernel(a1, a2, phase, float(k), np.ascontiguousarray(x).ravel(), out)
+    finally:
+        numba.set_num_threads(previous)
+    return out.reshape(batch + x.shape)
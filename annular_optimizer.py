@@ -0,0 +1,216 @@
+# 环形阵列几何优化
+# 在给定焦距下直接搜索圆环个数、间距和各环宽度，使峰值旁瓣电平最低。
+# 采用交叉熵法：每一代批量采样候选几何，一次性计算所有波束图；
+# 量化后相同的几何只计算一次，连续若干代无改进时提前停止。
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from annular_array import AnnularArray, Medium, beam_pattern, calculate_annular_radii
+from beam_metrics import beam_metrics
+
+MAX_ITERATIONS = 100       # 每个圆环个数的最大迭代代数
+POPULATION = 64            # 每代候选数
+ELITE_FRACTION = 0.2       # 精英比例
+PLATEAU_THRESHOLD = 10     # 连续无改进代数达到该值时提前停止
+MIN_IMPROVEMENT = 1e-3     # 视为改进的最小旁瓣下降量 (dB)
+RADIUS_RESOLUTION = 1e-6   # 几何量化精度 (m)，同时作为缓存键的分辨率
+
+
+@dataclass
+class OptimizationResult:
+    """优化结果"""
+    psl_db: float                 # 最优峰值旁瓣电平 (dB)
+    array: AnnularArray           # 最优几何
+    kerf: float                   # 最优圆环间距 (m)
+    history: list = field(default_factory=list)   # 每代的最优值
+    evaluations: int = 0          # 实际计算的波束图个数
+    cache_hits: int = 0           # 命中缓存的候选个数
+
+
+def widths_to_radii(weights, kerf, R_max):
+    """
+    由相对环宽和间距生成内外半径，外半径恰为 R_max。
+
+    参数:
+    weights (ndarray): 相对环宽，形状 (B, m)，取正值。
+    kerf (ndarray): 圆环间距，形状 (B,)。
+    R_max (float): 阵列最大半径。
+
+    返回:
+    tuple: (a1, a2)，形状均为 (B, m)。
+    """
+    m = weights.shape[-1]
+    active = R_max - (m - 1) * kerf
+    if np.any(active <= 0):
+        raise ValueError(f"{m} 个圆环的间距之和不小于 R_max，圆环宽度为负")
+    widths = weights / weights.sum(axis=-1, keepdims=True) * active[:, None]
+    a2 = np.cumsum(widths, axis=-1) + np.arange(m) * kerf[:, None]
+    a1 = a2 - widths
+    return a1, a2
+
+
+class GeometryObjective:
+    """
+    以峰值旁瓣电平为目标的批量评价函数，带几何缓存。
+
+    几何先量化到 RADIUS_RESOLUTION，量化后相同的候选直接取缓存值。
+    """
+
+    def __init__(self, F, medium=None, theta=None, resolution=RADIUS_RESOLUTION):
+        self.F = F
+        self.medium = medium or Medium()
+        self.theta = np.linspace(-np.pi / 2, np.pi / 2, 1000) if theta is None else np.asarray(theta)
+        self.resolution = resolution
+        self.cache = {}
+        self.evaluations = 0
+        self.cache_hits = 0
+
+    def __call__(self, a1, a2):
+        """
+        参数:
+        a1, a2 (ndarray): 形状为 (B, m) 的内外半径。
+
+        返回:
+        tuple: (psl_db, a1, a2)，其中 a1、a2 为量化后的几何。
+        """
+        a1 = np.round(a1 / self.resolution) * self.resolution
+        a2 = np.round(a2 / self.resolution) * self.resolution
+        keys = [(a1[i].tobytes(), a2[i].tobytes()) for i in range(a1.shape[0])]
+        psl = np.empty(a1.shape[0])
+
+        todo = {}
+        for i, key in enumerate(keys):
+            if key in self.cache:
+                psl[i] = self.cache[key]
+                self.cache_hits += 1
+            else:
+                todo.setdefault(key, []).append(i)
+        if todo:
+            first = [rows[0] for rows in todo.values()]
+            array = AnnularArray(a1[first], a2[first], F=self.F)
+            patterns = beam_pattern(array, self.medium, self.theta)
+            values = beam_metrics(patterns, self.theta)['psl_db']
+            self.evaluations += len(first)
+            for (key, rows), value in zip(todo.items(), values):
+                self.cache[key] = value
+                psl[rows] = value
+        return psl, a1, a2
+
+
+def check_kerf_range(m, R_max, kerf_range):
+    """
+    检查间距范围对 m 个圆环是否可行：0 <= kerf_min <= kerf_max，且 (m-1)·kerf_max < R_max。
+
+    异常:
+    ValueError: 间距范围不可行。
+    """
+    kerf_min, kerf_max = kerf_range
+    if not 0 <= kerf_min <= kerf_max:
+        raise ValueError(f"间距范围须满足 0 <= kerf_min <= kerf_max，实际为 {kerf_range}")
+    if (m - 1) * kerf_max >= R_max:
+        raise ValueError(f"{m} 个圆环时 kerf_max 须小于 R_max/(m-1) = {R_max / max(m - 1, 1):.4g} m，"
+                         f"实际为 {kerf_max:.4g} m")
+
+
+def optimize_ring_count(m, R_max, F, kerf_range, objective=None, population=POPULATION,
+                        max_iterations=MAX_ITERATIONS, seed=None):
+    """
+    固定圆环个数，优化间距和各环宽度。
+
+    参数:
+    m (int): 圆环个数。
+    R_max (float): 阵列最大半径。
+    F (float): 焦距。
+    kerf_range (tuple): 间距的取值范围 (min, max)。
+    objective (GeometryObjective): 评价函数，多个圆环个数之间可共享缓存。
+    population (int): 每代候选数。
+    max_iterations (int): 最大迭代代数。
+    seed (int): 随机数种子。
+
+    返回:
+    OptimizationResult: 优化结果。
+
+    异常:
+    ValueError: 间距范围不可行，见 check_kerf_range。
+    RuntimeError: 所有候选的旁瓣电平都不是有限值。
+    """
+    check_kerf_range(m, R_max, kerf_range)
+    objective = objective or GeometryObjective(F)
+    rng = np.random.default_rng(seed)
+    kerf_min, kerf_max = kerf_range
+    n_elite = max(2, int(population * ELITE_FRACTION))
+
+    # 以等面积闭式解作为初始均值，搜索空间为 (log 相对环宽, 间距)
+    kerf0 = (kerf_min + kerf_max) / 2
+    a1, a2 = calculate_annular_radii(R_max, m, kerf0)
+    mean = np.append(np.log(a2 - a1), kerf0)
+    sigma = np.append(np.full(m, 0.3), (kerf_max - kerf_min) / 4)
+
+    best_psl, best = np.inf, None
+    history = []
+    stall = 0
+    for _ in range(max_iterations):
+        samples = mean + sigma * rng.standard_normal((population, m + 1))
+        samples[0] = mean
+        samples[:, -1] = np.clip(samples[:, -1], kerf_min, kerf_max)
+        a1, a2 = widths_to_radii(np.exp(samples[:, :m]), samples[:, -1], R_max)
+        psl, a1, a2 = objective(a1, a2)
+
+        order = np.argsort(psl)
+        if psl[order[0]] < best_psl - MIN_IMPROVEMENT:
+            best_psl = psl[order[0]]
+            best = (a1[order[0]], a2[order[0]], samples[order[0], -1])
+            stall = 0
+        else:
+            stall += 1
+        history.append(best_psl)
+        if stall >= PLATEAU_THRESHOLD:
+            break
+
+        elite = samples[order[:n_elite]]
+        mean = elite.mean(axis=0)
+        sigma = elite.std(axis=0) + 1e-9
+
+    if best is None:
+        raise RuntimeError(f"{m} 个圆环时没有候选几何得到有限的旁瓣电平")
+    return OptimizationResult(
+        psl_db=float(best_psl),
+        array=AnnularArray(best[0], best[1], F=F),
+        kerf=float(best[2]),
+        history=history,
+        evaluations=objective.evaluations,
+        cache_hits=objective.cache_hits,
+    )
+
+
+def optimize_geometry(ring_counts, R_max, F, kerf_range, medium=None, theta=None,
+                      population=POPULATION, max_iterations=MAX_ITERATIONS, seed=None):
+    """
+    在多个圆环个数上分别优化，返回旁瓣电平最低的设计。
+
+    参数:
+    ring_counts (iterable): 候选圆环个数。
+    R_max (float): 阵列最大半径。
+    F (float): 焦距。
+    kerf_range (tuple): 间距的取值范围 (min, max)。
+    medium (Medium): 介质参数。
+    theta (ndarray): 角度网格。
+    population (int): 每代候选数。
+    max_iterations (int): 每个圆环个数的最大迭代代数。
+    seed (int): 随机数种子。
+
+    返回:
+    tuple: (最优结果, {圆环个数: 结果})。
+    """
+    ring_counts = list(ring_counts)
+    # 先检查全部圆环个数，避免算完前几个后才报错
+    for m in ring_counts:
+        check_kerf_range(m, R_max, kerf_range)
+    objective = GeometryObjective(F, medium, theta)
+    results = {}
+    for m in ring_counts:
+        results[m] = optimize_ring_count(m, R_max, F, kerf_range, objective,
+                                         population, max_iterations, seed)
+    best = min(results.values(), key=lambda result: result.psl_db)
+    return best, results
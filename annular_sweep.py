@@ -0,0 +1,192 @@
+# 环形阵列设计参数扫描
+# 对 F / delta_d / R_max / m 的笛卡尔积并行求解波束图，
+# 每个设计完成后立即把主瓣、旁瓣指标追加写入 CSV。
+import csv
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from annular_array import (AnnularArray, Medium, beam_pattern, calculate_annular_radii,
+                           calculate_annular_radii_equal_width, evaluate_sidelobe_mainlobe)
+import sound_field
+from beam_metrics import METRICS, beam_metrics
+from design_catalog import design_columns
+
+# 可扫描的设计参数，以及未指定时的默认值
+DEFAULT_DESIGN = {
+    'F': 10e-3,                # 焦距 (m)
+    'delta_d': 0.6 * 1500 / 4e6,  # 圆环间距 (m)
+    'R_max': 7e-3,             # 阵列最大半径 (m)
+    'm': 6,                    # 圆环个数
+}
+
+# 圆环半径生成规则
+RADII_RULES = {
+    'equal_area': calculate_annular_radii,
+    'equal_width': calculate_annular_radii_equal_width,
+}
+
+# 默认角度网格，与 notebook 相同
+DEFAULT_THETA = np.linspace(-np.pi / 2, np.pi / 2, 1000)
+
+
+def design_grid(axes, fixed=None):
+    """
+    生成设计参数的笛卡尔积。
+
+    参数:
+    axes (dict): 参数名到取值列表的映射，例如 {'F': F_array, 'm': n_d_array}。
+    fixed (dict): 固定参数，覆盖 DEFAULT_DESIGN 中的默认值。
+
+    返回:
+    list: 每个元素是一个完整的设计参数字典。
+    """
+    base = dict(DEFAULT_DESIGN)
+    base.update(fixed or {})
+    unknown = set(axes) - set(base)
+    if unknown:
+        raise ValueError(f"未知的扫描参数: {sorted(unknown)}")
+    names = list(axes)
+    designs = []
+    for values in itertools.product(*(axes[name] for name in names)):
+        design = dict(base)
+        design.update(zip(names, values))
+        design = {name: int(v) if name == 'm' else float(v) for name, v in design.items()}
+        designs.append(design)
+    return designs
+
+
+def design_array(design, rule='equal_area'):
+    """
+    按设计参数生成阵列几何。
+
+    参数:
+    design (dict): 设计参数，包含 F、delta_d、R_max、m。
+    rule (str): 圆环半径生成规则，见 RADII_RULES。
+
+    返回:
+    AnnularArray: 阵列几何；间距过大导致圆环面积或宽度为负、设计不可实现时返回 None。
+    """
+    with np.errstate(invalid='ignore'):
+        a1, a2 = RADII_RULES[rule](design['R_max'], design['m'], design['delta_d'])
+    if not np.all(np.isfinite(a2)) or np.any(a2 <= a1):
+        return None
+    return AnnularArray(a1, a2, F=design['F'])
+
+
+def evaluate_design(design, rule='equal_area', medium=None, theta=None, jinc=None, attenuation=None):
+    """
+    计算单个设计的波束图并评价主瓣和旁瓣。
+
+    参数:
+    design (dict): 设计参数，包含 F、delta_d、R_max、m。
+    rule (str): 圆环半径生成规则，见 RADII_RULES。
+    medium (Medium): 介质参数，默认 Medium()。
+    theta (ndarray): 角度网格，默认 DEFAULT_THETA。
+    jinc (callable): 指向性函数的实现，例如 sound_field.JincTable；默认直接调用 j1。
+    attenuation (callable): 衰减模型，例如 attenuation.LayeredMedium；默认不计衰减。
+
+    返回:
+    dict: 设计参数加上 mainlobe_avg、sidelobe_avg、ratio、peak 以及 METRICS 中的指标。
+    """
+    medium = medium or Medium()
+    theta = DEFAULT_THETA if theta is None else theta
+    array = design_array(design, rule)
+    row = dict(design)
+    if array is None:
+        row.update(mainlobe_avg=np.nan, sidelobe_avg=np.nan, ratio=np.nan, peak=np.nan)
+        row.update(dict.fromkeys(METRICS, np.nan))
+        return row
+
+    pattern = beam_pattern(array, medium, theta, jinc=jinc or sound_field.jinc, attenuation=attenuation)
+    mainlobe_avg, sidelobe_avg = evaluate_sidelobe_mainlobe(pattern)
+    row.update(mainlobe_avg=float(mainlobe_avg),
+               sidelobe_avg=float(sidelobe_avg),
+               ratio=float(mainlobe_avg / sidelobe_avg) if sidelobe_avg else np.inf,
+               peak=float(pattern.max()))
+    metrics = beam_metrics(pattern, theta)
+    row.update({name: float(metrics[name][0]) for name in METRICS})
+    return row
+
+
+def _evaluate_indexed(index, design, rule, medium, theta, jinc, attenuation=None):
+    """进程池任务入口，返回设计编号以便按完成顺序写出"""
+    row = evaluate_design(design, rule, medium, theta, jinc, attenuation)
+    row['design'] = index
+    return row
+
+
+def run_sweep(axes, out_path, fixed=None, rule='equal_area', medium=None, theta=None, workers=None,
+              jinc=None, cache=None, catalog=None, attenuation=None):
+    """
+    在进程池上并行扫描设计参数，每完成一个设计就写一行 CSV。
+
+    参数:
+    axes (dict): 扫描参数，见 design_grid。
+    out_path (str): 输出 CSV 路径，已存在时覆盖。
+    fixed (dict): 固定参数。
+    rule (str): 圆环半径生成规则。
+    medium (Medium): 介质参数。
+    theta (ndarray): 角度网格。
+    workers (int): 进程数，默认使用全部 CPU 核；为 1 时在当前进程内顺序计算。
+    jinc (callable): 指向性函数的实现，传入 sound_field.JincTable 可用查表代替 j1。
+    cache (ResultCache): 结果缓存，已计算过的设计直接读取，不再提交到进程池。
+    catalog (design_catalog.CatalogWriter): 设计目录，每完成一个可实现的设计就追加其各圆环的行。
+    attenuation (callable): 衰减模型，见 evaluate_design；须可被 pickle 以传给子进程。
+
+    返回:
+    list: 所有设计的结果，按设计编号排序。
+    """
+    designs = design_grid(axes, fixed)
+    medium = medium or Medium()
+    theta = DEFAULT_THETA if theta is None else np.asarray(theta)
+    workers = workers or os.cpu_count() or 1
+    fields = ['design'] + list(DEFAULT_DESIGN) + ['mainlobe_avg', 'sidelobe_avg', 'ratio', 'peak'] + list(METRICS)
+
+    rows = []
+    with open(out_path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+
+        def key(design):
+            # 不计衰减时不加入该参数，已有缓存的键保持不变
+            extra = {} if attenuation is None else {'attenuation': attenuation}
+            return cache.key(design=design, rule=rule, medium=medium, theta=theta, jinc=jinc, **extra)
+
+        def emit(row, cached=False):
+            writer.writerow(row)
+            f.flush()
+            rows.append(row)
+            if catalog is not None:
+                design = {name: row[name] for name in DEFAULT_DESIGN}
+                array = design_array(design, rule)
+                if array is not None:
+                    catalog.append(design_columns(row['design'], array, medium, design, row))
+            if cache is not None and not cached:
+                design = {name: row[name] for name in DEFAULT_DESIGN}
+                cache.put(key(design), {name: v for name, v in row.items() if name != 'design'})
+
+        pending = []
+        for i, design in enumerate(designs):
+            hit = cache.get(key(design)) if cache is not None else None
+            if hit is None:
+                pending.append((i, design))
+            else:
+                row = {name: int(v) if name == 'm' else float(v) for name, v in hit.items()}
+                row['design'] = i
+                emit(row, cached=True)
+
+        if workers == 1:
+            for i, design in pending:
+                emit(_evaluate_indexed(i, design, rule, medium, theta, jinc, attenuation))
+        elif pending:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(_evaluate_indexed, i, design, rule, medium, theta, jinc, attenuation)
+                           for i, design in pending]
+                for future in as_completed(futures):
+                    emit(future.result())
+
+    rows.sort(key=lambda row: row['design'])
+    return rows
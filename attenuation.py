@@ -0,0 +1,74 @@
+# 分层介质 (水 → 生体组织) 中的频率相关衰减
+# 参数取自 model-area.md / ring.mphtxt 的 COMSOL 模型：z_tissue 以内为水，以外为组织。
+# 从阵列中心沿直线到场点的路径按层分段，每段乘以 exp(-α(f)·L)，
+# 作为一个与圆环无关的额外因子乘到声压上，不增加逐环计算的开销。
+# 两层声速和密度均取 Medium 的值，不计界面折射和反射。
+from dataclasses import dataclass
+
+import numpy as np
+
+F_REF = 4e6   # 吸声系数的参考频率，单位：Hz (COMSOL 模型的 f0)
+
+
+@dataclass
+class LayeredMedium:
+    """
+    水 → 组织两层介质的衰减模型，α(f) = α_ref·(f/F_REF)^y，单位：Np/m。
+
+    实例可以直接作为 attenuation 参数传给 annular_array_pressure、sound_power_grid 等函数。
+    """
+    z_tissue: float = 24.6e-3    # 生体组织的起始位置，单位：m
+    alpha_water: float = 0.025   # 水在 F_REF 处的吸声系数，单位：1/m
+    alpha_tissue: float = 8.55   # 生体组织在 F_REF 处的吸声系数，单位：1/m
+    y_water: float = 2.0         # 水的频率指数
+    y_tissue: float = 1.0        # 生体组织的频率指数
+    f_ref: float = F_REF         # 参考频率，单位：Hz
+
+    def alpha(self, f):
+        """
+        两层在频率 f 处的吸声系数。
+
+        返回:
+        tuple: (α_water, α_tissue)。
+        """
+        ratio = np.asarray(f, dtype=float) / self.f_ref
+        return self.alpha_water * ratio ** self.y_water, self.alpha_tissue * ratio ** self.y_tissue
+
+    def path_lengths(self, r, theta):
+        """
+        从原点沿极角 theta 到距离 r 的直线路径在水中和组织中的长度。
+
+        参数:
+        r (array_like): 路径长度。
+        theta (array_like): 路径与轴线的夹角。
+
+        返回:
+        tuple: (L_water, L_tissue)，与 broadcast(r, theta) 同形状。
+        """
+        r = np.asarray(r, dtype=float)
+        cos_t = np.cos(theta)
+        with np.errstate(divide='ignore'):
+            # 路径到达组织界面时走过的距离，cos θ <= 0 时永远到不了
+            entry = np.where(cos_t > 0, self.z_tissue / cos_t, np.inf)
+        tissue = np.clip(r - entry, 0.0, None)
+        return r - tissue, tissue
+
+    def __call__(self, r, theta, f):
+        """
+        路径上的幅值衰减因子 exp(-α_w·L_w - α_t·L_t)。
+
+        参数:
+        r (array_like): 路径长度。
+        theta (array_like): 路径与轴线的夹角。
+        f (array_like): 频率，可以是与 r/theta 广播的数组。
+
+        返回:
+        ndarray: 广播后的实数因子，取值 (0, 1]。
+        """
+        a_w, a_t = self.alpha(f)
+        l_w, l_t = self.path_lengths(r, theta)
+        return np.exp(-(a_w * l_w + a_t * l_t))
+
+
+WATER = LayeredMedium(z_tissue=np.inf)   # 全程为水
+WATER_TISSUE = LayeredMedium()           # COMSOL 模型的水 → 组织两层介质
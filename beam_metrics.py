@@ -0,0 +1,169 @@
+# 波束图评价指标
+# 对一批波束图 (设计数, 角度点数) 一次性计算主瓣宽度、峰值旁瓣电平、
+# 积分旁瓣比和焦点增益，全部为数组运算，不含逐点 Python 循环。
+import numpy as np
+
+# 计算核版本号，修改任何会改变指标结果的代码时加 1，使 result_cache 中的旧结果失效
+KERNEL_VERSION = 2
+
+# beam_metrics 返回的指标名称
+METRICS = ('mainlobe_width_3db', 'mainlobe_width_6db', 'psl_db', 'isr_db', 'focal_gain_db')
+
+
+def _last_before(mask, index):
+    """每一行中位置 <= index 的最后一个 True 的下标，不存在时为 -1"""
+    n = mask.shape[-1]
+    pos = np.where(mask, np.arange(n), -1)
+    pos = np.maximum.accumulate(pos, axis=-1)
+    return np.take_along_axis(pos, index[:, None], axis=-1)[:, 0]
+
+
+def _first_after(mask, index):
+    """每一行中位置 >= index 的第一个 True 的下标，不存在时为 n"""
+    n = mask.shape[-1]
+    pos = np.where(mask, np.arange(n), n)
+    pos = np.minimum.accumulate(pos[:, ::-1], axis=-1)[:, ::-1]
+    return np.take_along_axis(pos, index[:, None], axis=-1)[:, 0]
+
+
+def _plateau_neighbours(values):
+    """
+    每个点所在平台 (相等值的连续段) 左右两侧第一个不同的值，超出边界时为 NaN。
+
+    返回:
+    tuple: (left, right)，与 values 同形状。
+    """
+    n = values.shape[-1]
+    idx = np.arange(n)
+    change = values[:, 1:] != values[:, :-1]
+    # 平台的第一个和最后一个下标
+    first = np.maximum.accumulate(np.where(np.c_[np.ones(len(values), bool), change], idx, 0), axis=-1)
+    last = np.minimum.accumulate(np.where(np.c_[change, np.ones(len(values), bool)], idx, n - 1)[:, ::-1],
+                                 axis=-1)[:, ::-1]
+    left = np.take_along_axis(values, np.maximum(first - 1, 0), axis=-1)
+    right = np.take_along_axis(values, np.minimum(last + 1, n - 1), axis=-1)
+    return np.where(first > 0, left, np.nan), np.where(last < n - 1, right, np.nan)
+
+
+def _mainlobe(values, theta=None):
+    """
+    确定每条波束图的主瓣：距离正前方 (θ=0，theta 为 None 时为网格中点) 最近的极大值，
+    两侧最近的严格极小值为零点。相等值的平台合并为一个点判断，平台不会被当作零点；
+    距离相同的极大值取较高者。
+
+    返回:
+    tuple: (peak_index, left_null, right_null)，形状均为 (B,)；一侧没有极小值时零点取该侧端点。
+    """
+    n = values.shape[-1]
+    idx = np.arange(n)
+    left, right = _plateau_neighbours(values)
+    # 端点外侧视为更低 (极大值) 或更高 (极小值)
+    maxima = (np.nan_to_num(left, nan=-np.inf) < values) & (np.nan_to_num(right, nan=-np.inf) < values)
+    minima = (np.nan_to_num(left, nan=np.inf) > values) & (np.nan_to_num(right, nan=np.inf) > values)
+    # 全部相等的曲线没有严格极大值，整条作为主瓣
+    maxima |= ~maxima.any(axis=-1, keepdims=True)
+
+    position = idx - (n - 1) / 2 if theta is None else np.asarray(theta, dtype=float)
+    distance = np.where(maxima, np.abs(position), np.inf)
+    nearest = distance == distance.min(axis=-1, keepdims=True)
+    peak_index = np.argmax(np.where(nearest, values, -np.inf), axis=-1)
+    left_null = np.maximum(_last_before(minima & (idx < peak_index[:, None]), peak_index), 0)
+    right_null = np.minimum(_first_after(minima & (idx > peak_index[:, None]), peak_index), n - 1)
+    return peak_index, left_null, right_null
+
+
+def _crossing(values, i0, level):
+    """在 i0 与 i0+1 之间线性插值 values 等于 level 的位置 (分数下标)"""
+    n = values.shape[-1]
+    i0c = np.clip(i0, 0, n - 2)
+    v0 = np.take_along_axis(values, i0c[:, None], axis=-1)[:, 0]
+    v1 = np.take_along_axis(values, i0c[:, None] + 1, axis=-1)[:, 0]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        frac = np.where(v1 != v0, (level - v0) / (v1 - v0), 0.0)
+    return i0c + np.clip(frac, 0.0, 1.0)
+
+
+def _width(values, level_db, theta, peak_index, left_null, right_null):
+    """主瓣在主瓣峰值以下 level_db 处的宽度，交点只在两个零点之间寻找"""
+    n = values.shape[-1]
+    idx = np.arange(n)
+    peak = np.take_along_axis(values, peak_index[:, None], axis=-1)[:, 0]
+    level = peak * 10 ** (level_db / 20)
+    below = values < level[:, None]
+    left = _last_before(below & (idx >= left_null[:, None]), peak_index)
+    right = _first_after(below & (idx <= right_null[:, None]), peak_index)
+    # 主瓣在零点之前没有降到该电平时，边界取零点
+    x_left = np.where(left >= 0, _crossing(values, left, level), left_null)
+    x_right = np.where(right < n, _crossing(values, right - 1, level), right_null)
+    if theta is not None:
+        grid = np.arange(n)
+        x_left = np.interp(x_left, grid, theta)
+        x_right = np.interp(x_right, grid, theta)
+    # 没有交点且零点落在网格端点时曲线被截断，宽度无法确定
+    truncated = ((left < 0) & (left_null == 0)) | ((right >= n) & (right_null == n - 1))
+    return np.where(truncated, np.nan, x_right - x_left)
+
+
+def mainlobe_width(patterns, level_db, theta=None):
+    """
+    主瓣在主瓣峰值以下 level_db 处的宽度。
+
+    主瓣的确定见 beam_metrics；交点不越过主瓣零点，主瓣在零点之前没有降到
+    该电平时以零点为边界。
+
+    参数:
+    patterns (array_like): 声压幅值，形状 (B, n) 或 (n,)。
+    level_db (float): 相对峰值的电平，例如 -3 或 -6。
+    theta (array_like): 角度网格，长度 n；为 None 时以采样点数为单位，网格中点为正前方。
+
+    返回:
+    ndarray: 形状为 (B,) 的主瓣宽度，曲线在网格端点之前未降到该电平时为 NaN。
+    """
+    values = np.atleast_2d(np.asarray(patterns, dtype=float))
+    return _width(values, level_db, theta, *_mainlobe(values, theta))
+
+
+def beam_metrics(patterns, theta=None, reference=None):
+    """
+    批量计算波束图指标。
+
+    主瓣取距离正前方最近的极大值 (不一定是全局最大值) 两侧最近的严格极小值 (零点)
+    之间的区域，其余部分视为旁瓣。旁瓣高于主瓣时 psl_db 为正值。
+
+    参数:
+    patterns (array_like): 声压幅值，形状 (B, n) 或 (n,)。
+    theta (array_like): 角度网格，长度 n，用于确定正前方和换算主瓣宽度。
+    reference (array_like): 焦点增益的参考幅值，形状 (B,) 或标量；
+        为 None 时以整条波束图的均方根幅值为参考。
+
+    返回:
+    dict: METRICS 中各指标到形状 (B,) 数组的映射，另含主瓣峰值 peak 和 peak_index。
+    """
+    values = np.atleast_2d(np.asarray(patterns, dtype=float))
+    n = values.shape[-1]
+    idx = np.arange(n)
+    peak_index, left_null, right_null = _mainlobe(values, theta)
+    peak = np.take_along_axis(values, peak_index[:, None], axis=-1)[:, 0]
+    in_main = (idx >= left_null[:, None]) & (idx <= right_null[:, None])
+
+    power = values ** 2
+    side_power = np.sum(np.where(in_main, 0.0, power), axis=-1)
+    main_power = np.sum(np.where(in_main, power, 0.0), axis=-1)
+    side_peak = np.max(np.where(in_main, 0.0, values), axis=-1)
+
+    if reference is None:
+        reference = np.sqrt(power.mean(axis=-1))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        psl_db = 20 * np.log10(side_peak / peak)
+        isr_db = 10 * np.log10(side_power / main_power)
+        focal_gain_db = 20 * np.log10(peak / np.asarray(reference, dtype=float))
+
+    return {
+        'mainlobe_width_3db': _width(values, -3, theta, peak_index, left_null, right_null),
+        'mainlobe_width_6db': _width(values, -6, theta, peak_index, left_null, right_null),
+        'psl_db': psl_db,
+        'isr_db': isr_db,
+        'focal_gain_db': focal_gain_db,
+        'peak': peak,
+        'peak_index': peak_index,
+    }
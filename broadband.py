@@ -0,0 +1,130 @@
+# 宽带多频率波束图
+# 把频率作为额外的数组维度，一次广播计算整个频率向量上的波束图，
+# 再按换能器频谱加权，得到宽带波束图和带宽加权的评价指标。
+import dataclasses
+
+import numpy as np
+
+from annular_array import annular_array_pressure
+from beam_metrics import METRICS, beam_metrics
+
+
+def gaussian_spectrum(freqs, f0, fractional_bandwidth=0.6):
+    """
+    换能器的高斯型幅度谱，-6 dB 带宽为 fractional_bandwidth*f0。
+
+    参数:
+    freqs (array_like): 频率向量。
+    f0 (float): 中心频率。
+    fractional_bandwidth (float): -6 dB 相对带宽。
+
+    返回:
+    ndarray: 峰值为 1 的幅度谱。
+    """
+    freqs = np.asarray(freqs, dtype=float)
+    # |H| = 0.5 处 (f - f0) = bw/2，即 exp(-a*(bw/2)²) = 0.5
+    bw = fractional_bandwidth * f0
+    return np.exp(-np.log(2) * ((freqs - f0) / (bw / 2)) ** 2)
+
+
+def frequency_vector(f0, fractional_bandwidth=0.6, n=32, span=2.0):
+    """
+    以 f0 为中心、覆盖 span 倍 -6 dB 带宽的频率向量。
+
+    参数:
+    f0 (float): 中心频率。
+    fractional_bandwidth (float): -6 dB 相对带宽。
+    n (int): 频点数。
+    span (float): 覆盖范围相对 -6 dB 带宽的倍数。
+
+    返回:
+    ndarray: 频率向量 (均为正值)。
+    """
+    half = span * fractional_bandwidth * f0 / 2
+    return np.linspace(max(f0 - half, f0 * 1e-3), f0 + half, n)
+
+
+def broadband_pressure(array, medium, freqs, r, theta, phi=0.0, attenuation=None):
+    """
+    在频率向量上一次性计算复声压，频率为第一维。
+
+    参数:
+    array (AnnularArray): 阵列几何，a1/a2 形状为 (*B, m)。
+    medium (Medium): 介质参数，其中的频率被 freqs 代替。
+    freqs (array_like): 频率向量，长度 F。
+    r, theta, phi (array_like): 场点坐标。
+    attenuation (callable): 衰减因子，见 annular_array_pressure。
+
+    返回:
+    ndarray: 形状为 (F, *B, *P) 的复声压。
+    """
+    freqs = np.asarray(freqs, dtype=float)
+    ndim = array.a1.ndim - 1 + np.broadcast(np.asarray(r), np.asarray(theta), np.asarray(phi)).ndim
+    f = freqs.reshape((-1,) + (1,) * ndim)
+    return annular_array_pressure(array, dataclasses.replace(medium, f=f), r, theta, phi,
+                                  attenuation=attenuation)
+
+
+def broadband_beam_pattern(array, medium, freqs, theta, weights=None, r=None):
+    """
+    宽带波束图：各频率波束图按频谱能量加权后的均方根。
+
+    参数:
+    array (AnnularArray): 阵列几何。
+    medium (Medium): 介质参数。
+    freqs (array_like): 频率向量。
+    theta (array_like): 角度。
+    weights (array_like): 各频率的幅度谱，默认以 medium.f 为中心的 gaussian_spectrum。
+    r (float): 观察距离，默认等于焦距。
+
+    返回:
+    tuple: (pattern, patterns)，pattern 形状为 (*B, len(theta))，
+        patterns 为各频率的幅值，形状为 (F, *B, len(theta))。
+    """
+    freqs = np.asarray(freqs, dtype=float)
+    if weights is None:
+        weights = gaussian_spectrum(freqs, medium.f)
+    if r is None:
+        r = array.F
+    patterns = np.abs(broadband_pressure(array, medium, freqs, r, theta))
+    energy = np.asarray(weights, dtype=float) ** 2
+    energy = energy.reshape((-1,) + (1,) * (patterns.ndim - 1)) / energy.sum()
+    return np.sqrt(np.sum(energy * patterns ** 2, axis=0)), patterns
+
+
+def broadband_metrics(array, medium, freqs, theta, weights=None, r=None):
+    """
+    计算宽带波束图指标和带宽加权的单频指标。
+
+    参数:
+    array (AnnularArray): 阵列几何，a1/a2 形状为 (*B, m)。
+    medium (Medium): 介质参数。
+    freqs (array_like): 频率向量。
+    theta (array_like): 角度。
+    weights (array_like): 各频率的幅度谱。
+    r (float): 观察距离。
+
+    返回:
+    dict: 'broadband' 为宽带波束图的指标 (形状 B)，'per_frequency' 为各频率的指标 (形状 (F, *B))，
+        'weighted' 为各频率指标按频谱能量加权的平均 (形状 B)。a1/a2 为一维时 'broadband' 和
+        'weighted' 中为标量。
+    """
+    freqs = np.asarray(freqs, dtype=float)
+    if weights is None:
+        weights = gaussian_spectrum(freqs, medium.f)
+    pattern, patterns = broadband_beam_pattern(array, medium, freqs, theta, weights, r)
+    per_frequency = _batch_metrics(patterns, theta)
+    energy = np.asarray(weights, dtype=float) ** 2
+    energy = (energy / energy.sum()).reshape((-1,) + (1,) * (pattern.ndim - 1))
+    weighted = {name: np.nansum(energy * per_frequency[name], axis=0) for name in METRICS}
+    broadband = _batch_metrics(pattern, theta)
+    if pattern.ndim == 1:
+        weighted = {name: float(value) for name, value in weighted.items()}
+        broadband = {name: float(value) for name, value in broadband.items()}
+    return {'broadband': broadband, 'per_frequency': per_frequency, 'weighted': weighted}
+
+
+def _batch_metrics(patterns, theta):
+    """对形状 (*B, n) 的波束图逐条计算 beam_metrics，指标形状为 B"""
+    metrics = beam_metrics(patterns.reshape(-1, patterns.shape[-1]), theta)
+    return {name: value.reshape(patterns.shape[:-1]) for name, value in metrics.items()}
@@ -0,0 +1,108 @@
+import os
+
+import streamlit as st
+import numpy as np
+import matplotlib.pyplot as plt
+from matplotlib.patches import Wedge
+import pandas as pd
+
+from annular_array import Medium, beam_pattern
+from beam_metrics import METRICS
+from catalog_query import INDEX_SUFFIX, CatalogIndex
+
+st.title("环形阵列设计目录")
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+path = st.text_input("目录文件 (.parquet / .csv)", value=os.path.join(BASE_DIR, "annular_catalog.parquet"))
+if not os.path.exists(path):
+    st.info("目录文件不存在，可用 annular_sweep.run_sweep(..., catalog=CatalogWriter(路径)) 生成，"
+            "或用 design_catalog.convert_legacy_csv 转换 annular_array_parameters_all.csv")
+    st.stop()
+
+f0 = st.number_input("频率 f0 (MHz)", value=4.0, step=0.25) * 1e6
+c0 = st.number_input("声速 c0 (m/s)", value=1500.0, step=10.0)
+lam = c0 / f0
+
+# 索引按路径、修改时间和介质缓存在会话中 (兼容没有 st.cache_data 的 Streamlit 1.10)
+cache_key = (path, os.path.getmtime(path), f0, c0)
+if st.session_state.get('catalog_key') != cache_key:
+    with st.spinner("建立索引..."):
+        index = CatalogIndex.open(path)
+        # 缺少的指标按当前介质补算，写回索引文件，下次打开时不再重新计算
+        if index.fill_metrics(Medium(c=c0, f=f0)):
+            index.save(path + INDEX_SUFFIX)
+    st.session_state.catalog_key = cache_key
+    st.session_state.catalog_index = index
+index = st.session_state.catalog_index
+
+designs = index.designs
+st.write(f"共 {len(index)} 个设计")
+
+col1, col2, col3 = st.columns(3)
+m_min, m_max = int(designs['m'].min()), int(designs['m'].max())
+with col1:
+    m_range = st.slider("圆环个数", m_min, max(m_max, m_min + 1), (m_min, m_max))
+with col2:
+    r_max_mm = st.number_input("最大外半径 (mm)", value=float(np.ceil(designs['outer_radius'].max() * 1e4) / 10),
+                               step=0.5)
+with col3:
+    kerf_min = st.number_input("最小圆环间距 (λ)", value=0.0, step=0.1)
+
+col1, col2, col3 = st.columns(3)
+with col1:
+    order_by = st.selectbox("排序指标", list(METRICS), index=list(METRICS).index('psl_db'))
+with col2:
+    ascending = st.radio("排序", ["升序", "降序"]) == "升序"
+with col3:
+    limit = st.number_input("显示数量", min_value=1, value=50, step=10)
+
+# 间距为 0 时不限制，间距未知 (NaN) 的设计也显示
+result = index.query(m=m_range, outer_radius=(None, r_max_mm * 1e-3),
+                     delta_d=(kerf_min * lam, None) if kerf_min > 0 else None,
+                     order_by=order_by, ascending=ascending, limit=int(limit))
+
+table = pd.DataFrame({
+    '设计': result['design'],
+    '环数': result['m'],
+    '外半径 (mm)': result['outer_radius'] * 1e3,
+    '间距 (λ)': result['delta_d'] / lam,
+    '焦距 (mm)': result['F'] * 1e3,
+    **{name: result[name] for name in METRICS},
+})
+st.write(f"符合条件的设计：{len(table)} 个")
+st.dataframe(table)
+
+if len(table):
+    design = st.selectbox("查看设计", list(result['design']))
+    array = index.array_of(design)
+    theta = np.linspace(-np.pi / 2, np.pi / 2, 1000)
+    pattern = beam_pattern(array, Medium(c=c0, f=f0), theta)
+
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 5))
+    for a1, a2 in zip(array.a1, array.a2):
+        ax1.add_patch(Wedge((0, 0), a2 * 1e3, 0, 360, width=(a2 - a1) * 1e3, alpha=0.5))
+    lim = array.a2[-1] * 1e3 * 1.1
+    ax1.set_xlim(-lim, lim)
+    ax1.set_ylim(-lim, lim)
+    ax1.set_aspect('equal')
+    ax1.set_xlabel('x (mm)')
+    ax1.set_ylabel('y (mm)')
+    ax1.set_title(f'{array.m} rings')
+
+    ax2.plot(np.degrees(theta), 20 * np.log10(pattern / pattern.max()))
+    ax2.set_ylim(-60, 0)
+    ax2.set_xlabel('θ (deg)')
+    ax2.set_ylabel('dB')
+    ax2.set_title('beam pattern')
+    ax2.grid(True)
+    st.pyplot(fig)
+
+    rings = index.rings_of(design)
+    st.dataframe(pd.DataFrame({
+        '环编号': rings['ring'],
+        '内径 (mm)': rings['a1'] * 1e3,
+        '外径 (mm)': rings['a2'] * 1e3,
+        '宽度 (mm)': rings['width'] * 1e3,
+        '延时 (ns)': rings['delay'] * 1e9,
+    }))
@@ -0,0 +1,252 @@
+# 设计目录的索引和查询
+# 把 design_catalog 的逐环目录汇总成每个设计一行的设计表，对圆环个数建分桶索引、
+# 对外半径和圆环间距建排序索引，范围查询用二分查找完成，不必扫描整张表。
+# 设计表、排序索引和逐环目录保存在目录旁边的 .idx.npz 中，再次打开时直接载入不必重新排序，
+# 目录文件更新后自动重建。fill_metrics 补算的指标也可以用 save 写回索引文件，
+# 同时记录补算所用的介质，换用其他介质补算时这些设计重新计算。
+import os
+
+import numpy as np
+
+from annular_array import AnnularArray, Medium, beam_pattern
+from beam_metrics import METRICS, beam_metrics
+from design_catalog import read_catalog
+
+# 设计表中每个设计一个值的列
+DESIGN_COLUMNS = ('design', 'm', 'F', 'delta_d', 'R_max', 'outer_radius') + METRICS
+SORTED_KEYS = ('outer_radius', 'delta_d')   # 建排序索引的列
+INDEX_SUFFIX = '.idx.npz'
+INDEX_FORMAT = 3   # 索引文件格式版本，与文件中记录的不同时重建
+
+
+class CatalogIndex:
+    """
+    设计目录的内存索引。
+
+    designs 为设计表 (列名到长度为设计数的数组)，rings 为原始逐环目录，
+    按 design 排序以便按设计编号取出各圆环。filled 标记指标由 fill_metrics 补算的设计，
+    filled_medium 为补算所用的介质 (c, rho0, f, u)，尚未补算时为 None。
+    """
+
+    def __init__(self, rings):
+        """
+        参数:
+        rings (dict): read_catalog 返回的逐环目录。
+        """
+        order = np.lexsort((rings['ring'], rings['design']))
+        self.rings = {name: np.asarray(values)[order] for name, values in rings.items()}
+        design = self.rings['design']
+        # 每个设计的第一行和行数
+        self._start = np.flatnonzero(np.r_[True, design[1:] != design[:-1]])
+        self._count = np.diff(np.r_[self._start, len(design)])
+        self.designs = {name: self.rings[name][self._start] for name in DESIGN_COLUMNS if name != 'outer_radius'}
+        self.designs['outer_radius'] = np.maximum.reduceat(self.rings['a2'], self._start)
+        self.filled = np.zeros(len(self._start), dtype=bool)
+        self.filled_medium = None
+        self._build()
+
+    def _build(self):
+        """建立 SORTED_KEYS 的排序索引，值为 NaN 的设计不进入索引"""
+        self._sorted = {}
+        for name in SORTED_KEYS:
+            valid = np.flatnonzero(~np.isnan(self.designs[name]))
+            order = valid[np.argsort(self.designs[name][valid], kind='stable')]
+            self._sorted[name] = (self.designs[name][order], order)
+        self._build_buckets()
+
+    def _build_buckets(self):
+        """建立 m 的分桶索引"""
+        m = self.designs['m']
+        self._buckets = {int(value): np.flatnonzero(m == value) for value in np.unique(m)}
+
+    def save(self, index_path):
+        """
+        把设计表、排序索引和逐环目录写入索引文件 (先写临时文件再替换)。
+
+        参数:
+        index_path (str): 索引文件路径，通常为目录路径加 INDEX_SUFFIX。
+        """
+        arrays = {'format': np.array(INDEX_FORMAT), 'start': self._start, 'count': self._count,
+                  'filled': self.filled}
+        if self.filled_medium is not None:
+            arrays['filled_medium'] = np.array(self.filled_medium)
+        arrays.update({f'rings/{name}': values for name, values in self.rings.items()})
+        arrays.update({f'designs/{name}': values for name, values in self.designs.items()})
+        for name, (values, order) in self._sorted.items():
+            arrays[f'sorted/{name}/values'] = values
+            arrays[f'sorted/{name}/order'] = order
+        tmp_path = index_path + '.tmp.npz'
+        np.savez(tmp_path, **arrays)
+        os.replace(tmp_path, index_path)
+
+    @classmethod
+    def load(cls, index_path):
+        """
+        载入 save 写出的索引文件，格式版本不符时返回 None。
+
+        返回:
+        CatalogIndex: 索引。
+        """
+        with np.load(index_path) as data:
+            if 'format' not in data.files or int(data['format']) != INDEX_FORMAT:
+                return None
+            arrays = {name: data[name] for name in data.files}
+        index = cls.__new__(cls)
+        index.rings = {name[len('rings/'):]: v for name, v in arrays.items() if name.startswith('rings/')}
+        index.designs = {name: arrays[f'designs/{name}'] for name in DESIGN_COLUMNS}
+        index._start, index._count = arrays['start'], arrays['count']
+        index.filled = arrays['filled']
+        index.filled_medium = tuple(arrays['filled_medium'].tolist()) if 'filled_medium' in arrays else None
+        index._sorted = {name: (arrays[f'sorted/{name}/values'], arrays[f'sorted/{name}/order'])
+                         for name in SORTED_KEYS}
+        index._build_buckets()
+        return index
+
+    @classmethod
+    def open(cls, path, rebuild=False):
+        """
+        打开目录文件的索引，索引文件不存在、比目录旧或格式版本不符时重新建立并保存。
+
+        参数:
+        path (str): .parquet 或 .csv 目录路径。
+        rebuild (bool): 强制重建索引。
+
+        返回:
+        CatalogIndex: 索引。
+        """
+        index_path = path + INDEX_SUFFIX
+        if (not rebuild and os.path.exists(index_path) and
+                os.path.getmtime(index_path) >= os.path.getmtime(path)):
+            index = cls.load(index_path)
+            if index is not None:
+                return index
+        index = cls(read_catalog(path))
+        index.save(index_path)
+        return index
+
+    def __len__(self):
+        return len(self.designs['design'])
+
+    def _range(self, name, low, high):
+        """排序索引上的闭区间 [low, high] 查询，返回设计表中的行号；该列为 NaN 的设计总是不返回"""
+        values, order = self._sorted[name]
+        lo = 0 if low is None else np.searchsorted(values, low, side='left')
+        hi = len(values) if high is None else np.searchsorted(values, high, side='right')
+        return order[lo:hi]
+
+    def query(self, m=None, outer_radius=None, delta_d=None, where=None, order_by='psl_db', ascending=True,
+              limit=None):
+        """
+        按圆环个数、外半径和圆环间距查询设计，并按指标排序。
+
+        参数:
+        m (int 或 tuple): 圆环个数，或闭区间 (最小, 最大)。
+        outer_radius (tuple): 外半径的闭区间 (最小, 最大)，单位 m，None 表示不限。
+        delta_d (tuple): 圆环间距的闭区间，单位 m。给出 outer_radius 或 delta_d 时，
+            该列为 NaN 的设计 (例如间距未知) 不返回。
+        where (callable): 额外条件，参数为设计表，返回布尔数组。
+        order_by (str): 排序列，NaN 排在最后。
+        ascending (bool): 升序排列。
+        limit (int): 最多返回的设计数。
+
+        返回:
+        dict: 符合条件的设计表。
+
+        例如 6~8 环、外半径 < 9.5 mm、间距 >= 0.4λ，按旁瓣电平排序：
+        index.query(m=(6, 8), outer_radius=(None, 9.5e-3), delta_d=(0.4 * lam, None))
+        """
+        candidates = []
+        if m is not None:
+            low, high = (m, m) if np.ndim(m) == 0 else m
+            candidates.append(np.concatenate([rows for value, rows in self._buckets.items()
+                                              if (low is None or value >= low) and
+                                              (high is None or value <= high)] or [np.array([], int)]))
+        for name, bounds in (('outer_radius', outer_radius), ('delta_d', delta_d)):
+            if bounds is not None:
+                candidates.append(self._range(name, *bounds))
+        if candidates:
+            # 从最小的候选集开始求交集
+            candidates.sort(key=len)
+            rows = np.sort(candidates[0])
+            for other in candidates[1:]:
+                rows = rows[np.isin(rows, other, assume_unique=True)]
+        else:
+            rows = np.arange(len(self))
+        if where is not None:
+            rows = rows[where({name: values[rows] for name, values in self.designs.items()})]
+        if order_by is not None:
+            key = self.designs[order_by][rows]
+            order = np.argsort(key if ascending else -key, kind='stable')
+            rows = rows[order]
+        if limit is not None:
+            rows = rows[:limit]
+        return {name: values[rows] for name, values in self.designs.items()}
+
+    def rings_of(self, design):
+        """
+        取出一个设计的各圆环。
+
+        返回:
+        dict: 该设计的逐环目录行。
+        """
+        i = np.searchsorted(self.designs['design'], design)
+        if i >= len(self) or self.designs['design'][i] != design:
+            raise KeyError(f"目录中没有设计 {design}")
+        rows = slice(self._start[i], self._start[i] + self._count[i])
+        return {name: values[rows] for name, values in self.rings.items()}
+
+    def array_of(self, design):
+        """由目录中的半径重建设计的阵列几何"""
+        rings = self.rings_of(design)
+        return AnnularArray(rings['a1'], rings['a2'], F=float(rings['F'][0]))
+
+    def fill_metrics(self, medium=None, theta=None, cache=None):
+        """
+        计算目录中缺少波束指标的设计 (例如由旧 CSV 转换而来)，m 和焦距相同的设计合并为一批。
+        目录中原有的指标不变；此前用其他介质补算的设计按本次的介质重新计算。
+
+        参数:
+        medium (Medium): 介质参数。
+        theta (ndarray): 角度网格，默认与 annular_sweep 相同。
+        cache (ResultCache): 结果缓存，以半径、焦距、介质和角度网格为键。
+
+        返回:
+        int: 新计算的设计数 (不含缓存命中)。结果只更新内存中的设计表，需要保留时调用 save。
+        """
+        medium = medium or Medium()
+        theta = np.linspace(-np.pi / 2, np.pi / 2, 1000) if theta is None else theta
+        medium_key = (medium.c, medium.rho0, medium.f, medium.u)
+        if self.filled_medium is not None and self.filled_medium != medium_key:
+            for name in METRICS:
+                self.designs[name][self.filled] = np.nan
+        self.filled_medium = medium_key
+        missing = np.flatnonzero(np.isnan(self.designs['psl_db']))
+        groups = {}
+        for row in missing:
+            groups.setdefault((int(self.designs['m'][row]), float(self.designs['F'][row])), []).append(row)
+
+        computed = 0
+        for (m, F), rows in groups.items():
+            todo = []
+            for row in rows:
+                array = self.array_of(self.designs['design'][row])
+                key = cache.key(a1=array.a1, a2=array.a2, F=F, medium=medium, theta=theta) if cache else None
+                hit = cache.get(key) if cache else None
+                if hit is None:
+                    todo.append((row, array, key))
+                else:
+                    for name in METRICS:
+                        self.designs[name][row] = hit[name]
+            if not todo:
+                continue
+            # 堆叠成 (n, m) 的批量几何一次计算
+            batch = AnnularArray(np.stack([a.a1 for _, a, _ in todo]), np.stack([a.a2 for _, a, _ in todo]), F=F)
+            metrics = beam_metrics(beam_pattern(batch, medium, theta), theta)
+            for i, (row, _, key) in enumerate(todo):
+                for name in METRICS:
+                    self.designs[name][row] = metrics[name][i]
+                if cache:
+                    cache.put(key, {name: metrics[name][i] for name in METRICS})
+            computed += len(todo)
+        self.filled[missing] = True
+        return computed
@@ -0,0 +1,202 @@
+# 声学与电学联合设计
+# 圆环半径同时决定波束图 (annular_array_pressure) 和每个圆环的电阻抗
+# (ring_impedance 中的 calculate_tau / calculate_impedance，C0 = S/(β11S·l))。
+# 这里对每批候选几何只计算一次面积、中心半径和截面扭转系数，先算各圆环在驱动频率处的
+# 阻抗并筛掉电学上无法匹配的设计，只对剩下的设计计算波束图，最后按声学和电学指标的
+# 加权和排序。
+import numpy as np
+
+from annular_array import AnnularArray, Medium, beam_pattern, focus_delays
+from annular_sweep import DEFAULT_DESIGN, DEFAULT_THETA, design_array, design_grid
+from beam_metrics import METRICS, beam_metrics
+from ring_impedance import (PZT, calculate_impedance, calculate_k15t, calculate_tau, quarter_wave_thickness,
+                            resonance_frequencies)
+
+Z0 = 50.0   # 驱动源 / 传输线的特性阻抗，单位：Ω
+
+# 电学预筛选的默认限值
+ELECTRICAL_LIMITS = {
+    'z_ratio': 10.0,   # 各圆环 |Z| 与 Z0 之比须在 [1/z_ratio, z_ratio] 内，否则 L 型匹配网络的 Q 过高
+    'spread': 4.0,     # 同一设计中各圆环 |Z| 的最大值与最小值之比，过大时各通道的驱动幅度无法一致
+    'k_eff': 0.0,      # 有效耦合系数的下限
+}
+
+# 综合目标的默认权重，score = Σ 权重 × 指标，越小越好
+DEFAULT_WEIGHTS = {'psl_db': 1.0, 'z_mismatch_db': 0.5, 'z_spread_db': 0.5}
+
+# electrical_metrics 返回的每个设计一个值的指标
+ELECTRICAL_METRICS = ('z_mismatch_db', 'z_spread_db', 'k_eff_min', 'fr_mean')
+
+
+def ring_geometry(array):
+    """
+    声学和电学计算共用的几何量。
+
+    参数:
+    array (AnnularArray): 阵列几何，a1/a2 形状为 (*B, m)。
+
+    返回:
+    dict: 'area' 圆环面积、'center' 中心半径、'tau' 截面扭转系数，形状均为 (*B, m)。
+    """
+    return {'area': array.areas(), 'center': array.centers(), 'tau': calculate_tau(array.a1, array.a2)}
+
+
+def electrical_metrics(array, medium, geometry=None, thickness=None, material=PZT, z0=Z0):
+    """
+    各圆环在驱动频率 medium.f 处的阻抗，以及每个设计的电学指标。
+
+    参数:
+    array (AnnularArray): 阵列几何，a1/a2 形状为 (*B, m)。
+    medium (Medium): 介质参数，medium.f 为驱动频率。
+    geometry (dict): ring_geometry 的结果，默认重新计算。
+    thickness (float): 陶瓷厚度，默认为驱动频率 medium.f 下的 1/4 剪切波长。
+    material (PiezoMaterial): 材料常数。
+    z0 (float): 特性阻抗。
+
+    返回:
+    dict: 'impedance' (*B, m) 的复阻抗；'z_mismatch_db' 各圆环 |20·log10(|Z|/z0)| 的平均值、
+        'z_spread_db' 20·log10(max|Z|/min|Z|)、'k_eff_min' 最小有效耦合系数、
+        'fr_mean' 平均谐振频率，形状均为 (*B,)。
+    """
+    geometry = geometry or ring_geometry(array)
+    thickness = quarter_wave_thickness(material, medium.f) if thickness is None else thickness
+    omega = medium.w
+    C0 = geometry['area'] / (material.beta11s * thickness)
+    Z = calculate_impedance(calculate_k15t(geometry['tau'], material), omega / material.Ct, thickness, omega, C0)
+    magnitude_db = 20 * np.log10(np.abs(Z))
+    fr, _, k_eff = resonance_frequencies(array.a1, array.a2, thickness, material, tau=geometry['tau'])
+    return {
+        'impedance': Z,
+        'z_mismatch_db': np.mean(np.abs(magnitude_db - 20 * np.log10(z0)), axis=-1),
+        'z_spread_db': magnitude_db.max(axis=-1) - magnitude_db.min(axis=-1),
+        'k_eff_min': np.min(k_eff, axis=-1),
+        'fr_mean': np.mean(fr, axis=-1),
+    }
+
+
+def matchable(electrical, limits=None, z0=Z0):
+    """
+    电学预筛选：各圆环阻抗与 z0 的比值、圆环间的阻抗差别和耦合系数均在限值内。
+
+    参数:
+    electrical (dict): electrical_metrics 的结果。
+    limits (dict): 覆盖 ELECTRICAL_LIMITS 中的限值。
+    z0 (float): 特性阻抗。
+
+    返回:
+    ndarray: 形状为 (*B,) 的布尔数组。
+    """
+    limits = {**ELECTRICAL_LIMITS, **(limits or {})}
+    ratio_db = 20 * np.log10(limits['z_ratio'])
+    magnitude_db = 20 * np.log10(np.abs(electrical['impedance']))
+    in_range = np.all(np.abs(magnitude_db - 20 * np.log10(z0)) <= ratio_db, axis=-1)
+    # k_eff 为 NaN (无谐振) 时视为不满足
+    return (in_range & (electrical['z_spread_db'] <= 20 * np.log10(limits['spread'])) &
+            (electrical['k_eff_min'] >= limits['k_eff']))
+
+
+def combined_score(table, weights=None):
+    """
+    综合目标 Σ 权重 × 指标，指标取 table 中的列，缺少指标 (NaN) 的设计得分为 NaN。
+
+    参数:
+    table (dict): 列名到数组的映射，包含 weights 中的列。
+    weights (dict): 指标名到权重的映射，默认 DEFAULT_WEIGHTS；越大越好的指标 (例如 focal_gain_db)
+        用负权重。
+
+    返回:
+    ndarray: 得分，越小越好。
+    """
+    weights = DEFAULT_WEIGHTS if weights is None else weights
+    return sum(weight * np.asarray(table[name], dtype=float) for name, weight in weights.items())
+
+
+def codesign(array, medium=None, theta=None, thickness=None, material=PZT, z0=Z0, limits=None, weights=None,
+             engine='numpy'):
+    """
+    对一批 m 和焦距相同的候选几何联合计算电学和声学指标。
+
+    参数:
+    array (AnnularArray): 阵列几何，a1/a2 形状为 (B, m)；一维的单个设计按 B = 1 处理。
+    medium (Medium): 介质参数，medium.f 同时为声场频率和电驱动频率。
+    theta (ndarray): 波束图角度网格，默认与 annular_sweep 相同。
+    thickness (float): 陶瓷厚度，默认见 electrical_metrics。
+    material (PiezoMaterial): 材料常数。
+    z0 (float): 特性阻抗。
+    limits (dict): 电学预筛选限值，见 ELECTRICAL_LIMITS。
+    weights (dict): 综合目标的权重，见 combined_score。
+    engine (str): 波束图的计算实现，见 annular_array_pressure。
+
+    返回:
+    dict: 每个设计一个值的列：METRICS、ELECTRICAL_METRICS、'matchable'、'score'，
+        以及 (B, m) 的 'impedance' 和 'delays' (各通道的驱动阻抗和聚焦延时)。未通过电学筛选的设计不计算波束图，声学指标和得分为 NaN。
+    """
+    if array.a1.ndim == 1:
+        array = AnnularArray(array.a1[None], array.a2[None], F=array.F, center=array.center)
+    elif array.a1.ndim != 2:
+        raise ValueError(f"a1/a2 的形状应为 (B, m) 或 (m,)，实际为 {array.a1.shape}")
+    medium = medium or Medium()
+    theta = DEFAULT_THETA if theta is None else theta
+    geometry = ring_geometry(array)
+    table = electrical_metrics(array, medium, geometry, thickness, material, z0)
+    table['matchable'] = matchable(table, limits, z0)
+    table['delays'] = focus_delays(geometry['center'], array.F, medium.c)
+
+    n = array.a1.shape[0]
+    for name in METRICS:
+        table[name] = np.full(n, np.nan)
+    rows = np.flatnonzero(table['matchable'])
+    if len(rows):
+        subset = AnnularArray(array.a1[rows], array.a2[rows], F=array.F, center=array.center)
+        metrics = beam_metrics(beam_pattern(subset, medium, theta, engine=engine), theta)
+        for name in METRICS:
+            table[name][rows] = metrics[name]
+    table['score'] = combined_score(table, weights)
+    return table
+
+
+def codesign_sweep(axes, fixed=None, rule='equal_area', medium=None, theta=None, thickness=None, material=PZT,
+                   z0=Z0, limits=None, weights=None, engine='numpy'):
+    """
+    在 annular_sweep 的设计参数网格上进行联合设计，m 和焦距相同的设计合并为一批计算。
+
+    参数:
+    axes (dict): 扫描参数，见 annular_sweep.design_grid。
+    fixed (dict): 固定参数。
+    rule (str): 圆环半径生成规则。
+    其余参数见 codesign。
+
+    返回:
+    dict: 设计表，列为 'design'、设计参数、codesign 的指标、'matchable'、'score' 和 'rank'
+        (按得分升序的名次，从 1 开始，不可实现或未通过筛选的设计为 0)。
+        每个设计的各圆环阻抗在 'impedance' 中，为长度为设计数的对象数组。
+    """
+    designs = design_grid(axes, fixed)
+    n = len(designs)
+    table = {'design': np.arange(n)}
+    for name in DEFAULT_DESIGN:
+        table[name] = np.array([design[name] for design in designs])
+    for name in METRICS + ELECTRICAL_METRICS + ('score',):
+        table[name] = np.full(n, np.nan)
+    table['matchable'] = np.zeros(n, dtype=bool)
+    table['impedance'] = np.empty(n, dtype=object)
+
+    groups = {}
+    for i, design in enumerate(designs):
+        array = design_array(design, rule)
+        if array is not None:
+            groups.setdefault((design['m'], design['F']), []).append((i, array))
+    for (m, F), members in groups.items():
+        rows = np.array([i for i, _ in members])
+        batch = AnnularArray(np.stack([a.a1 for _, a in members]), np.stack([a.a2 for _, a in members]), F=F)
+        result = codesign(batch, medium, theta, thickness, material, z0, limits, weights, engine)
+        for name in METRICS + ELECTRICAL_METRICS + ('score', 'matchable'):
+            table[name][rows] = result[name]
+        for row, impedance in zip(rows, result['impedance']):
+            table['impedance'][row] = impedance
+
+    table['rank'] = np.zeros(n, dtype=int)
+    ranked = np.flatnonzero(np.isfinite(table['score']))
+    ranked = ranked[np.argsort(table['score'][ranked], kind='stable')]
+    table['rank'][ranked] = np.arange(1, len(ranked) + 1)
+    return table
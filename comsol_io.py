@@ -0,0 +1,290 @@
+# COMSOL 模型文件的读取
+# 解析 .mphtxt (几何的顶点/边，网格的顶点坐标/单元) 和 model-area.md 形式的参数表，
+# 得到 sound_field.sound_power_grid 和 annular_array_pressure 可以直接使用的圆环内外半径，
+# 使 COMSOL 和 Python 的计算共用同一份几何，不再在 CalTrans 中手工推导。
+#
+# .mphtxt 按行流式读取，只在块头处判断，每个数据块用 islice 一次取出后
+# 由 NumPy 整块转换，不对每一行做 Python 层面的解析。
+import ast
+import itertools
+import math
+import operator
+import re
+
+import numpy as np
+
+from annular_array import AnnularArray, Medium
+
+# 数据块标题到记录行数的计数项的映射
+_BLOCKS = {
+    'Vertices': 'number of vertices',
+    'Edges': 'number of edges',
+    'Mesh vertex coordinates': 'number of mesh vertices',
+    'Elements': 'number of elements',
+    'Geometric entity indices': 'number of geometric entity indices',
+}
+# 作为整数读取的数据块
+_INT_BLOCKS = {'Elements', 'Geometric entity indices'}
+
+# 表达式求值允许的运算符
+_BINARY_OPS = {ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul, ast.Div: operator.truediv,
+               ast.Pow: operator.pow}
+_UNARY_OPS = {ast.UAdd: operator.pos, ast.USub: operator.neg}
+
+# SI 词头和单位，参数表中 [mm]、[MHz]、[kg/m^3] 等换算为国际单位制的倍数
+_PREFIXES = {'p': 1e-12, 'n': 1e-9, 'u': 1e-6, 'µ': 1e-6, 'm': 1e-3, 'c': 1e-2, 'k': 1e3, 'M': 1e6, 'G': 1e9}
+_UNITS = {'m': 1.0, 's': 1.0, 'g': 1e-3, 'Hz': 1.0, 'Pa': 1.0, 'N': 1.0, 'V': 1.0, 'A': 1.0, 'W': 1.0,
+          'K': 1.0, 'rad': 1.0, 'Ohm': 1.0, 'F': 1.0, 'H': 1.0, 'C': 1.0, 'J': 1.0, 'deg': math.pi / 180}
+
+
+def _numbers(lines, n, dtype):
+    """把 n 行数字一次转换为 (n, 列数) 的数组"""
+    block = list(itertools.islice(lines, n))
+    if len(block) < n:
+        raise ValueError(f"数据块应有 {n} 行，文件中只有 {len(block)} 行")
+    values = np.array(' '.join(block).split(), dtype=float)
+    return values.reshape(n, -1).astype(dtype) if n else values.reshape(0, 0).astype(dtype)
+
+
+def read_mphtxt(path):
+    """
+    读取 COMSOL .mphtxt 文本文件中的几何或网格数据块。
+
+    参数:
+    path (str): 文件路径。
+
+    返回:
+    dict: 可能包含
+        'vertices' (n, 4)，几何顶点 X Y dom tol (2D)；
+        'edges' (n, 8)，几何边 vtx1 vtx2 s1 s2 up down curve tol，顶点编号从 1 开始；
+        'mesh_vertices' (n, sdim)，网格顶点坐标；
+        'elements' / 'entities' {单元类型: 数组}，网格单元的顶点编号和所属几何实体。
+        文件中有多个对象时取第一个对象的几何块。
+    """
+    result = {'elements': {}, 'entities': {}}
+    counts = {}
+    element_type = None
+    with open(path, encoding='utf-8', errors='replace') as f:
+        lines = (line.strip() for line in f)
+        for line in lines:
+            if not line:
+                continue
+            if line.startswith('#'):
+                title = line[1:].strip()
+                if title not in _BLOCKS:
+                    continue
+                n = counts.get(_BLOCKS[title], 0)
+                dtype = int if title in _INT_BLOCKS else float
+                if n:
+                    # 跳过块标题后的列说明等注释行，取第一行数据；空块不读取，以免吞掉下一块的内容
+                    first = next((line for line in lines if line and not line.startswith('#')), None)
+                    if first is None:
+                        raise ValueError(f"数据块 {title} 应有 {n} 行，文件已结束")
+                    data = _numbers(itertools.chain([first], lines), n, dtype)
+                else:
+                    data = np.zeros((0, 0), dtype)
+                if title == 'Elements':
+                    result['elements'][element_type] = data
+                elif title == 'Geometric entity indices':
+                    result['entities'][element_type] = data.ravel()
+                else:
+                    key = {'Vertices': 'vertices', 'Edges': 'edges', 'Mesh vertex coordinates': 'mesh_vertices'}[title]
+                    result.setdefault(key, data)
+                continue
+            if '#' in line:
+                value, label = (part.strip() for part in line.split('#', 1))
+                if label == 'type name':
+                    element_type = value.split()[-1]
+                elif label.startswith('number of'):
+                    counts[label] = int(value.split()[0])
+    if not result['elements']:
+        del result['elements'], result['entities']
+    return result
+
+
+def ring_layout(vertices, n_rings, z=0.0, scale=1e-3, tol=1e-9):
+    """
+    从轴对称二维几何 (x 为半径，y 为轴向) 中取出换能器表面上的圆环内外半径。
+
+    换能器表面上的顶点按半径排序后依次为 Rin0, Rout0, Rin1, Rout1, ...，
+    第一个顶点 (x=0) 为中心圆盘的内半径。
+
+    参数:
+    vertices (ndarray): read_mphtxt 返回的 'vertices'。
+    n_rings (int): 圆环个数，表面之外的顶点 (水域、PML 边界) 被忽略。
+    z (float): 换能器表面的 y 坐标 (几何单位)。
+    scale (float): 几何单位换算为 m 的倍数，COMSOL 几何默认单位为 mm。
+    tol (float): 判断顶点位于表面的容差。
+
+    返回:
+    tuple: (Rin, Rout)，长度为 n_rings 的数组，单位 m。
+    """
+    on_surface = np.abs(vertices[:, 1] - z) <= tol
+    x = np.sort(vertices[on_surface, 0])
+    if len(x) < 2 * n_rings:
+        raise ValueError(f"表面上只有 {len(x)} 个顶点，不足 {n_rings} 个圆环")
+    x = x[:2 * n_rings] * scale
+    return x[0::2], x[1::2]
+
+
+def evaluate(expr, names=None):
+    """
+    计算算术表达式，代替 eval：只允许数字、名称、+ - * / **、一元正负号，
+    以及对 names 中函数的调用 (例如 sqrt(x)、rn(a, b))。
+
+    参数:
+    expr (str): Python 语法的表达式 (乘方为 **)。
+    names (dict): 名称到数值或函数的映射。
+
+    返回:
+    float: 表达式的值。
+
+    异常:
+    NameError: 引用了 names 中没有的名称。
+    ValueError: 表达式包含不允许的语法，或计算出错 (除以零、溢出、超出函数定义域等)。
+    """
+    names = names or {}
+
+    def visit(node):
+        if isinstance(node, ast.Expression):
+            return visit(node.body)
+        if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+            # 按浮点数计算，避免 9**9**9 之类的整数乘方耗尽内存
+            return float(node.value)
+        if isinstance(node, ast.Name):
+            if node.id not in names:
+                raise NameError(node.id)
+            return names[node.id]
+        if isinstance(node, ast.BinOp) and type(node.op) in _BINARY_OPS:
+            return _BINARY_OPS[type(node.op)](visit(node.left), visit(node.right))
+        if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY_OPS:
+            return _UNARY_OPS[type(node.op)](visit(node.operand))
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and not node.keywords:
+            func = visit(node.func)
+            if not callable(func):
+                raise ValueError(f"{node.func.id} 不是函数")
+            args = [visit(arg) for arg in node.args]
+            try:
+                return func(*args)
+            except (ArithmeticError, ValueError, TypeError) as error:
+                raise ValueError(f"表达式 {expr} 中 {node.func.id} 无法计算: {error}") from error
+        raise ValueError(f"表达式中不允许的语法: {ast.dump(node)}")
+
+    try:
+        tree = ast.parse(expr.strip(), mode='eval')
+    except SyntaxError as error:
+        raise ValueError(f"无法解析的表达式: {expr}") from error
+    try:
+        return visit(tree)
+    except ArithmeticError as error:
+        raise ValueError(f"表达式 {expr} 无法计算: {error}") from error
+
+
+def _unit_factor(unit):
+    """把 'mm'、'm/s'、'kg/m^3'、'1/m' 等单位换算为 SI 倍数"""
+    def token(match):
+        name = match.group(0)
+        if name in _UNITS:
+            return repr(_UNITS[name])
+        if name[0] in _PREFIXES and name[1:] in _UNITS:
+            return repr(_PREFIXES[name[0]] * _UNITS[name[1:]])
+        raise ValueError(f"无法识别的单位: {name}")
+    expr = re.sub(r'[A-Za-zµ]+', token, unit).replace('^', '**')
+    return evaluate(expr)
+
+
+def rn(r_in, r_out):
+    """参数表中的 rn(Rin, Rout)：圆环中心半径，与 CalTrans 的 Rc 相同"""
+    return (r_in + r_out) / 2
+
+
+# 参数表表达式中可用的函数和常数
+EXPRESSION_NAMES = {'pi': math.pi, 'sqrt': math.sqrt, 'exp': math.exp, 'log': math.log, 'sin': math.sin,
+                    'cos': math.cos, 'tan': math.tan, 'abs': abs, 'min': min, 'max': max, 'rn': rn}
+
+
+def read_parameters(path, functions=None):
+    """
+    读取并计算 COMSOL 参数表 (每行为 名称 表达式 "说明"，例如 model-area.md)。
+
+    表达式中的 [单位] 换算为国际单位制，^ 为乘方；参数可以引用表中任意位置的其他参数。
+    表达式由 evaluate 计算，不执行任意 Python 代码。
+
+    参数:
+    path (str): 参数表路径。
+    functions (dict): 额外的函数，覆盖 EXPRESSION_NAMES 中的同名项 (例如 rn)。
+
+    返回:
+    dict: 参数名到数值 (SI 单位) 的映射，保持文件中的顺序。
+
+    异常:
+    ValueError: 参数无法求值，信息中给出参数名。
+    """
+    expressions = {}
+    descriptions = {}
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            match = re.match(r'(\w+)\s+("[^"]*"|\S+)\s*(.*)$', line)
+            if match is None:
+                continue
+            name, expr, description = match.groups()
+            expressions[name] = expr.strip('"')
+            descriptions[name] = description.strip('"')
+
+    names = {**EXPRESSION_NAMES, **(functions or {})}
+    compiled = {name: re.sub(r'\[([^\]]+)\]', lambda m: f'*{_unit_factor(m.group(1))!r}', expr).replace('^', '**')
+                for name, expr in expressions.items()}
+    values = {}
+    # 参数之间可以相互引用，逐轮计算直到全部求出
+    pending = dict(compiled)
+    while pending:
+        progress = False
+        for name, expr in list(pending.items()):
+            try:
+                values[name] = float(evaluate(expr, {**names, **values}))
+            except NameError:
+                continue
+            except ValueError as error:
+                raise ValueError(f"参数 {name} = {expressions[name]} 无法求值: {error}") from error
+            del pending[name]
+            progress = True
+        if not progress:
+            raise ValueError(f"参数无法求值 (未定义或循环引用): {sorted(pending)}")
+    return {name: values[name] for name in expressions}
+
+
+def parameter_layout(params):
+    """
+    从参数表中取出圆环半径 Rin0.., Rout0..。
+
+    返回:
+    tuple: (Rin, Rout)，单位 m。
+    """
+    n = int(params['N']) if 'N' in params else sum(1 for name in params if re.fullmatch(r'Rin\d+', name))
+    return (np.array([params[f'Rin{i}'] for i in range(n)]),
+            np.array([params[f'Rout{i}'] for i in range(n)]))
+
+
+def comsol_model(params_path, geometry_path=None, functions=None):
+    """
+    由 COMSOL 参数表 (和几何文件) 构造阵列和介质。
+
+    参数:
+    params_path (str): 参数表路径，提供 f0、c0、F、N、ro、u 和圆环半径。
+    geometry_path (str): .mphtxt 几何文件，给定时圆环半径取自几何而不是参数表。
+    functions (dict): 参数表中的额外函数。
+
+    返回:
+    tuple: (array, medium, params)，array 为 AnnularArray，medium 为 Medium。
+    """
+    params = read_parameters(params_path, functions)
+    if geometry_path is None:
+        Rin, Rout = parameter_layout(params)
+    else:
+        Rin, Rout = ring_layout(read_mphtxt(geometry_path)['vertices'], int(params['N']))
+    medium = Medium(c=params.get('c0', 1500.0), rho0=params.get('ro', 1000.0), f=params.get('f0', 4e6),
+                    u=params.get('u', 1.0))
+    return AnnularArray(Rin, Rout, F=params.get('F', 10e-3)), medium, params
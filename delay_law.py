@@ -0,0 +1,127 @@
+# 环形阵列的聚焦延时法则
+# 统一 CalTrans、focus_delays 和 notebook 中 t_m / annular_delta_delay 的延时计算：
+# 一次计算多个焦深的各环延时，按发射电路的时钟分辨率量化，并批量评估焦点增益。
+# 环形阵列关于轴线对称，只能沿轴线改变焦深，不能横向偏转波束。
+import numpy as np
+
+from annular_array import focus_delays
+
+CLOCK = 5e-9   # 默认发射电路延时分辨率 5 ns (200 MHz 时钟)
+
+
+def _depth_axis(depths, batch_ndim):
+    """把焦深向量扩展为 (D, 1, ..., 1)，以便与形状为 (*B, m) 的几何量广播"""
+    depths = np.atleast_1d(np.asarray(depths, dtype=float))
+    return depths.reshape(depths.shape + (1,) * (batch_ndim + 1))
+
+
+def delay_table(array, medium, depths):
+    """
+    计算多个焦深下各圆环的聚焦延时，参考圆环 (最外圈) 延时为 0。
+
+    参数:
+    array (AnnularArray): 阵列几何，a1/a2 形状为 (*B, m)。
+    medium (Medium): 介质参数。
+    depths (array_like): 焦深向量，长度 D。
+
+    返回:
+    ndarray: 形状为 (D, *B, m) 的延时，均不小于 0。
+    """
+    F = _depth_axis(depths, array.a1.ndim - 1)
+    return focus_delays(array.centers(), F, medium.c)
+
+
+def quantize_delays(delays, clock=CLOCK, bits=None):
+    """
+    把延时量化到时钟分辨率。
+
+    参数:
+    delays (array_like): 延时。
+    clock (float): 时钟周期。
+    bits (int): 延时计数器位数，给定时检查计数是否溢出。
+
+    返回:
+    tuple: (counts, quantized)，counts 为整数时钟计数，quantized = counts*clock。
+    """
+    counts = np.rint(np.asarray(delays, dtype=float) / clock).astype(np.int64)
+    if bits is not None and np.any(counts >= 2 ** bits):
+        raise ValueError(f"延时计数 {counts.max()} 超出 {bits} 位计数器的范围")
+    return counts, counts * clock
+
+
+def focal_gain(array, medium, depths, delays=None):
+    """
+    在各焦点处 (轴线上 z = 焦深) 计算声压和相干增益。
+
+    声压用轴线精确解 p = ρcu Σ e^{-jωτ_n}(e^{-jk·sqrt(a1²+z²)} - e^{-jk·sqrt(a2²+z²)})；
+    相干增益为 |p| 与各环贡献幅值之和的比值，完全同相时为 1 (0 dB)。
+
+    参数:
+    array (AnnularArray): 阵列几何，a1/a2 形状为 (*B, m)。
+    medium (Medium): 介质参数。
+    depths (array_like): 焦深向量，长度 D。
+    delays (array_like): 形状为 (D, *B, m) 的延时，默认为 delay_table 的精确延时。
+
+    返回:
+    tuple: (pressure, gain_db)，形状均为 (D, *B)。
+    """
+    if delays is None:
+        delays = delay_table(array, medium, depths)
+    z = _depth_axis(depths, array.a1.ndim - 1)
+    k = medium.k
+    ring = (np.exp(-1j * k * np.sqrt(array.a1 ** 2 + z ** 2)) -
+            np.exp(-1j * k * np.sqrt(array.a2 ** 2 + z ** 2)))
+    terms = np.exp(-1j * medium.w * np.asarray(delays, dtype=float)) * ring
+    pressure = medium.rho0 * medium.c * medium.u * terms.sum(axis=-1)
+    with np.errstate(divide='ignore'):
+        gain_db = 20 * np.log10(np.abs(terms.sum(axis=-1)) / np.abs(terms).sum(axis=-1))
+    return pressure, gain_db
+
+
+def zone_table(array, medium, depths, clock=CLOCK, bits=None):
+    """
+    生成多焦区延时表：每个焦深的量化延时计数以及量化前后的焦点增益。
+
+    参数:
+    array (AnnularArray): 阵列几何，a1/a2 为一维。
+    medium (Medium): 介质参数。
+    depths (array_like): 焦深向量，长度 D。
+    clock (float): 时钟周期。
+    bits (int): 延时计数器位数。
+
+    返回:
+    dict: 'depth' (D,)、'delay' (D, m) 精确延时、'counts' (D, m) 时钟计数、
+        'gain_db' / 'quantized_gain_db' (D,) 量化前后的相干增益、
+        'loss_db' (D,) 量化损失、'phase_error' (D,) 量化引起的最大相位误差 (弧度)。
+    """
+    depths = np.atleast_1d(np.asarray(depths, dtype=float))
+    delays = delay_table(array, medium, depths)
+    counts, quantized = quantize_delays(delays, clock, bits)
+    _, gain_db = focal_gain(array, medium, depths, delays)
+    _, quantized_db = focal_gain(array, medium, depths, quantized)
+    return {
+        'depth': depths,
+        'delay': delays,
+        'counts': counts,
+        'gain_db': gain_db,
+        'quantized_gain_db': quantized_db,
+        'loss_db': gain_db - quantized_db,
+        'phase_error': medium.w * np.max(np.abs(quantized - delays), axis=-1),
+    }
+
+
+def merge_zones(table):
+    """
+    把量化计数相同的相邻焦深合并为一个焦区。
+
+    参数:
+    table (dict): zone_table 的结果。
+
+    返回:
+    dict: 'start' / 'end' 为每个焦区的首尾焦深，'counts' 为该焦区的时钟计数。
+    """
+    counts = table['counts']
+    changed = np.any(counts[1:] != counts[:-1], axis=-1)
+    first = np.concatenate([[0], np.flatnonzero(changed) + 1])
+    last = np.concatenate([first[1:] - 1, [len(counts) - 1]])
+    return {'start': table['depth'][first], 'end': table['depth'][last], 'counts': counts[first]}
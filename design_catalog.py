@@ -0,0 +1,232 @@
+# 环形阵列设计目录
+# 取代 notebook 中 save_annular_array_parameters 的字符串格式化输出：每个圆环一行，
+# 列均为数值类型 (设计参数、圆环编号、半径、宽度、面积、延时、波束指标)，
+# 扫描过程中逐批追加。.parquet 路径写 Parquet (需要 pyarrow)，按行组保存统计信息，
+# 读取时可按条件跳过行组 (谓词下推)，不必把整个目录读入内存；.csv 路径写 CSV。
+import csv
+
+import numpy as np
+
+from annular_array import AnnularArray, Medium
+from beam_metrics import METRICS
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+ROW_GROUP_ROWS = 65536   # 每个 Parquet 行组的行数
+
+# 目录的列名和类型，每个圆环一行，设计参数和指标在同一设计的各行中重复
+CATALOG_COLUMNS = {
+    'design': np.int64,      # 设计编号
+    'F': np.float64,         # 焦距 (m)
+    'delta_d': np.float64,   # 圆环间距 (m)
+    'R_max': np.float64,     # 阵列最大半径 (m)
+    'm': np.int64,           # 圆环个数
+    'ring': np.int64,        # 圆环编号，从 1 开始，与旧 CSV 的 环编号 相同
+    'a1': np.float64,        # 内半径 (m)
+    'a2': np.float64,        # 外半径 (m)
+    'width': np.float64,     # 圆环宽度 (m)
+    'area': np.float64,      # 圆环面积 (m^2)
+    'center': np.float64,    # 圆环中心半径 (m)
+    'delay': np.float64,     # 聚焦延时 (s)
+    **{name: np.float64 for name in METRICS},
+}
+
+# 旧 CSV (annular_array_parameters_all.csv) 的表头
+LEGACY_COLUMNS = {'m值': 'm', '环编号': 'ring', '内径 (mm)': 'a1', '外径 (mm)': 'a2'}
+
+
+def design_columns(design_index, array, medium=None, design=None, metrics=None):
+    """
+    把一个设计展开成目录的列，每个圆环一行。
+
+    参数:
+    design_index (int): 设计编号。
+    array (AnnularArray): 阵列几何，a1/a2 为一维。
+    medium (Medium): 介质参数，用于计算延时，默认 Medium()。
+    design (dict): 设计参数 F、delta_d、R_max，缺少的列填 NaN。
+    metrics (dict): 波束指标，缺少的列填 NaN。
+
+    返回:
+    dict: 列名到长度为 m 的数组的映射，顺序和类型与 CATALOG_COLUMNS 相同。
+    """
+    medium = medium or Medium()
+    design = design or {}
+    metrics = metrics or {}
+    m = array.m
+    values = {
+        'design': design_index,
+        'F': design.get('F', array.F),
+        'delta_d': design.get('delta_d', np.nan),
+        'R_max': design.get('R_max', array.a2[-1]),
+        'm': m,
+        'ring': np.arange(1, m + 1),
+        'a1': array.a1,
+        'a2': array.a2,
+        'width': array.a2 - array.a1,
+        'area': array.areas(),
+        'center': array.centers(),
+        'delay': array.delays(medium),
+        **{name: metrics.get(name, np.nan) for name in METRICS},
+    }
+    return {name: np.broadcast_to(np.asarray(values[name], dtype=dtype), (m,))
+            for name, dtype in CATALOG_COLUMNS.items()}
+
+
+class CatalogWriter:
+    """
+    逐批追加写入设计目录。
+
+    路径以 .parquet 结尾时写 Parquet (未安装 pyarrow 时抛出 ImportError)，否则写 CSV；
+    用作上下文管理器，退出时写出剩余数据并关闭文件。
+    """
+
+    def __init__(self, path, row_group_rows=ROW_GROUP_ROWS):
+        """
+        参数:
+        path (str): 输出路径，已存在时覆盖。
+        row_group_rows (int): 累积多少行写一个 Parquet 行组 (CSV 时为写盘批量)。
+        """
+        if path.endswith('.parquet') and pq is None:
+            raise ImportError("写 Parquet 目录需要安装 pyarrow，或改用 .csv 输出")
+        self.path = path
+        self.row_group_rows = row_group_rows
+        self.rows = 0
+        self._buffer = []
+        self._buffered = 0
+        if path.endswith('.parquet'):
+            schema = pa.schema([(name, pa.from_numpy_dtype(dtype)) for name, dtype in CATALOG_COLUMNS.items()])
+            self._writer = pq.ParquetWriter(path, schema)
+            self._file = None
+        else:
+            self._writer = None
+            self._file = open(path, 'w', newline='')
+            self._csv = csv.writer(self._file)
+            self._csv.writerow(list(CATALOG_COLUMNS))
+
+    def append(self, columns):
+        """
+        追加一批行。
+
+        参数:
+        columns (dict): 列名到等长数组的映射，例如 design_columns 的结果。
+        """
+        n = len(columns['design'])
+        self._buffer.append(columns)
+        self._buffered += n
+        self.rows += n
+        if self._buffered >= self.row_group_rows:
+            self.flush()
+
+    def flush(self):
+        """把缓冲的行写入文件"""
+        if not self._buffer:
+            return
+        merged = {name: np.concatenate([batch[name] for batch in self._buffer]).astype(dtype, copy=False)
+                  for name, dtype in CATALOG_COLUMNS.items()}
+        self._buffer = []
+        self._buffered = 0
+        if self._writer is not None:
+            self._writer.write_table(pa.table(merged))
+        else:
+            self._csv.writerows(zip(*(merged[name].tolist() for name in CATALOG_COLUMNS)))
+            self._file.flush()
+
+    def close(self):
+        """写出剩余数据并关闭文件"""
+        self.flush()
+        if self._writer is not None:
+            self._writer.close()
+        else:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_catalog(path, filters=None, columns=None):
+    """
+    读取设计目录。
+
+    参数:
+    path (str): .parquet 或 .csv 路径。
+    filters (list): 条件列表，例如 [('m', '==', 6), ('psl_db', '<', -20)]，各条件取交集；
+        Parquet 时下推到行组统计，不满足条件的行组不会被读取。
+    columns (list): 需要的列，默认全部。
+
+    返回:
+    dict: 列名到数组的映射。
+    """
+    if path.endswith('.parquet'):
+        if pq is None:
+            raise ImportError("读取 Parquet 目录需要安装 pyarrow")
+        table = pq.read_table(path, columns=columns, filters=filters or None)
+        return {name: table.column(name).to_numpy() for name in table.column_names}
+
+    with open(path, newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        data = np.array(list(reader), dtype=float).reshape(-1, len(header))
+    table = {name: data[:, i].astype(CATALOG_COLUMNS.get(name, np.float64)) for i, name in enumerate(header)}
+    mask = np.ones(len(data), dtype=bool)
+    for name, op, value in filters or []:
+        mask &= _OPERATORS[op](table[name], value)
+    return {name: table[name][mask] for name in (columns or header)}
+
+
+# read_catalog 的 CSV 路径支持的比较运算
+_OPERATORS = {
+    '==': np.equal, '!=': np.not_equal, '<': np.less, '<=': np.less_equal,
+    '>': np.greater, '>=': np.greater_equal, 'in': lambda a, v: np.isin(a, list(v)),
+}
+
+
+def read_legacy_csv(path):
+    """
+    读取 notebook 生成的旧格式 CSV (表头为 m值、环编号、内径 (mm)、外径 (mm))。
+
+    返回:
+    dict: 'm'、'ring'、'a1'、'a2' 列，半径换算为 m。
+    """
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        reader = csv.DictReader(f)
+        rows = list(reader)
+    table = {LEGACY_COLUMNS[name]: np.array([row[name] for row in rows], dtype=float) for name in LEGACY_COLUMNS}
+    table['m'] = table['m'].astype(np.int64)
+    table['ring'] = table['ring'].astype(np.int64)
+    table['a1'] = table['a1'] * 1e-3
+    table['a2'] = table['a2'] * 1e-3
+    return table
+
+
+def convert_legacy_csv(legacy_path, out_path, F=10e-3, medium=None):
+    """
+    把旧格式 CSV 转换为设计目录，每个连续的 m 值块作为一个设计，宽度、面积和延时重新计算。
+    旧格式没有间距列，delta_d 取相邻圆环间隙 a1[i+1] - a2[i] 的平均值 (单环设计为 NaN)。
+
+    参数:
+    legacy_path (str): 旧 CSV 路径。
+    out_path (str): 输出目录路径。
+    F (float): 计算延时使用的焦距。
+    medium (Medium): 介质参数。
+
+    返回:
+    int: 写入的设计数。
+    """
+    table = read_legacy_csv(legacy_path)
+    # 编号回到 1 的位置开始一个新设计
+    starts = np.flatnonzero(table['ring'] == 1)
+    ends = np.append(starts[1:], len(table['ring']))
+    with CatalogWriter(out_path) as writer:
+        for index, (start, end) in enumerate(zip(starts, ends)):
+            array = AnnularArray(table['a1'][start:end], table['a2'][start:end], F=F)
+            gaps = array.a1[1:] - array.a2[:-1]
+            delta_d = float(gaps.mean()) if len(gaps) else np.nan
+            writer.append(design_columns(index, array, medium, {'delta_d': delta_d}))
+    return len(starts)
@@ -0,0 +1,117 @@
+# 分块流式计算二维声场图
+# 按 (r, θ) 网格分块计算，各圆环的贡献在块内原地累加，结果直接写入
+# 内存映射的 .npy 或 HDF5 文件，内存占用只与块大小有关，与网格总大小无关。
+import math
+
+import numpy as np
+
+from sound_field import C0, F0, P, U, jinc
+
+try:
+    import h5py
+except ImportError:
+    h5py = None
+
+# 默认分块大小 (距离点数, 角度点数)
+DEFAULT_TILE = (512, 512)
+
+
+def _open_output(out_path, shape, dtype):
+    """按扩展名创建 .npy 内存映射或 HDF5 数据集，返回 (数组, 关闭函数)"""
+    if out_path.endswith(('.h5', '.hdf5')):
+        if h5py is None:
+            raise ImportError("写入 HDF5 需要安装 h5py，或改用 .npy 输出")
+        f = h5py.File(out_path, 'w')
+        dset = f.create_dataset('field', shape=shape, dtype=dtype, chunks=True)
+        return dset, f.close
+    out = np.lib.format.open_memmap(out_path, mode='w+', dtype=dtype, shape=shape)
+    return out, out.flush
+
+
+def write_field_map(out_path, r, xita, tile_func, tile=DEFAULT_TILE, dtype=np.complex128):
+    """
+    逐块调用 tile_func 计算声场并写入文件。
+
+    参数:
+    out_path (str): 输出路径，以 .h5/.hdf5 结尾时写 HDF5 (数据集名 'field')，否则写 .npy。
+    r (array_like): 距离网格，一维。
+    xita (array_like): 角度网格，一维。
+    tile_func (callable): tile_func(r_tile, xita_tile) 返回形状 (len(r_tile), len(xita_tile)) 的数组。
+    tile (tuple): 分块大小 (距离点数, 角度点数)。
+    dtype: 输出数据类型，取 float 时写入幅值。
+
+    返回:
+    str: 输出路径。
+    """
+    r = np.asarray(r, dtype=float)
+    xita = np.asarray(xita, dtype=float)
+    out, close = _open_output(out_path, (len(r), len(xita)), dtype)
+    take_abs = not np.issubdtype(np.dtype(dtype), np.complexfloating)
+    try:
+        for i in range(0, len(r), tile[0]):
+            r_tile = r[i:i + tile[0]]
+            for j in range(0, len(xita), tile[1]):
+                block = tile_func(r_tile, xita[j:j + tile[1]])
+                out[i:i + len(r_tile), j:j + block.shape[1]] = np.abs(block) if take_abs else block
+    finally:
+        close()
+    return out_path
+
+
+def sound_power_tile(Rin, Rout, delay=None, t=0.0, f0=F0, c0=C0, u=U, p=P, jinc=jinc):
+    """
+    构造 sound_field.SoundPower 模型的分块计算函数，结果为所有圆环之和。
+
+    远场模型中距离因子与各圆环无关，因此每块只需对角度方向的指向性
+    逐环原地累加，再与距离因子做外积，不生成 (N, 块) 大小的中间数组。
+
+    参数:
+    Rin, Rout (array_like): 各圆环内外半径。
+    delay (array_like): 各圆环的延时，默认全 0。
+    t (float): 时间。
+    f0, c0, u, p (float): 频率、声速、质点速度和声压。
+    jinc (callable): 指向性函数的实现。
+
+    返回:
+    callable: 供 write_field_map 使用的 tile_func。
+    """
+    Rin = np.atleast_1d(np.asarray(Rin, dtype=float))
+    Rout = np.atleast_1d(np.asarray(Rout, dtype=float))
+    delay = np.zeros_like(Rin) if delay is None else np.asarray(delay, dtype=float)
+    w = 2 * math.pi * f0
+    k = w / c0
+    ring_phase = np.exp(-1j * w * delay)
+
+    def tile_func(r_tile, xita_tile):
+        sin_x = np.sin(xita_tile)
+        ring_sum = np.zeros(len(xita_tile), dtype=complex)
+        for n in range(len(Rin)):
+            ring_sum += (Rout[n] ** 2 * jinc(k * Rout[n] * sin_x) -
+                         Rin[n] ** 2 * jinc(k * Rin[n] * sin_x)) * ring_phase[n]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            radial = w * p * u / r_tile * np.exp(1j * (w * t - k * r_tile))
+        return np.multiply.outer(radial, ring_sum)
+
+    return tile_func
+
+
+def sound_power_map(out_path, r, xita, Rin, Rout, delay=None, t=0.0, tile=DEFAULT_TILE,
+                    dtype=np.complex128, **kwargs):
+    """
+    分块计算 (r, θ) 网格上所有圆环叠加的声压并写入文件，
+    结果与 sound_field.sound_power_sum(r, xita, Rin, Rout, t, delay)[..., 0] 相同。
+
+    参数:
+    out_path (str): 输出路径，.npy 或 .h5/.hdf5。
+    r, xita (array_like): 距离和角度网格。
+    Rin, Rout (array_like): 各圆环内外半径。
+    delay (array_like): 各圆环的延时。
+    t (float): 时间。
+    tile (tuple): 分块大小。
+    dtype: 输出数据类型，取 np.float64 时只保存幅值，文件大小减半。
+    kwargs: 传给 sound_power_tile 的 f0、c0、u、p、jinc。
+
+    返回:
+    str: 输出路径。
+    """
+    return write_field_map(out_path, r, xita, sound_power_tile(Rin, Rout, delay, t, **kwargs), tile, dtype)
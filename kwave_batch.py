@@ -0,0 +1,362 @@
+# k-Wave 批量仿真
+# annual_array_transducer_3D.ipynb 每次在 notebook 中搭建一个 kWaveGrid/kWaveArray 并运行，
+# 这里把同样的流程改为批处理：为每个圆环设计写出仿真输入文件，在有界的工作队列中
+# 调用本地 CPU 版 kspaceFirstOrder-OMP，运行结束后立即用 extract_amp_phase 把中心平面的
+# 声压时间序列归约为幅值/相位图，每个设计保存一个 .npz，并删除原始的输入输出 HDF5 文件。
+import argparse
+import os
+import shlex
+import subprocess
+import sys
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+
+import numpy as np
+
+from annular_array import Medium
+
+try:
+    import h5py
+    from kwave.data import Vector
+    from kwave.kgrid import kWaveGrid
+    from kwave.kmedium import kWaveMedium
+    from kwave.ksensor import kSensor
+    from kwave.ksource import kSource
+    from kwave.kspaceFirstOrder3D import kspaceFirstOrder3D
+    from kwave.options.simulation_execution_options import SimulationExecutionOptions
+    from kwave.options.simulation_options import SimulationOptions
+    from kwave.utils.filters import extract_amp_phase
+    from kwave.utils.kwave_array import kWaveArray
+    from kwave.utils.signals import create_cw_signals
+except ImportError:
+    kWaveGrid = None
+
+GEOMETRIES = ('flat', 'bowl')   # 平面圆环 (电子延时聚焦) 或 曲率半径为 F 的球冠圆环 (几何聚焦)
+RESULT_SUFFIX = '.npz'
+
+
+@dataclass
+class KWaveSettings:
+    """k-Wave 仿真的网格与计算参数，默认值与 annual_array_transducer_3D.ipynb 相同"""
+    ppw: float = 3              # 每波长网格点数
+    cfl: float = 0.5            # CFL 数
+    record_periods: int = 1     # 记录的周期数 (稳态)
+    source_x_offset: int = 20   # 声源相对网格起点的偏移点数
+    bli_tolerance: float = 0.01  # 离网格声源点的截断容差
+    upsampling_rate: int = 10   # 积分点相对网格的密度
+    axial_size: float = None    # 轴向网格尺寸 (m)，默认 2F
+    lateral_size: float = None  # 横向网格尺寸 (m)，默认阵列直径的 1.5 倍
+    t_end: float = None         # 仿真时长 (s)，默认为到达网格对角的传播时间的 1.5 倍
+    geometry: str = 'flat'      # 见 GEOMETRIES
+
+
+def _round_even(x):
+    """与 kwave.utils.math.round_even 相同，取最近的偶数"""
+    return int(2 * np.round(x / 2))
+
+
+def grid_parameters(array, medium, settings=None):
+    """
+    计算一个设计的网格和时间步参数，不依赖 k-Wave，可用于估计批量仿真的规模。
+
+    参数:
+    array (AnnularArray): 阵列几何，a1/a2 为一维。
+    medium (Medium): 介质参数，medium.f 为激励频率。
+    settings (KWaveSettings): 仿真参数。
+
+    返回:
+    dict: dx、Nx、Ny、Nz、ppp (每周期时间点数)、dt、Nt、axial_size、lateral_size。
+    """
+    settings = settings or KWaveSettings()
+    axial = settings.axial_size or 2 * array.F
+    lateral = settings.lateral_size or 3 * float(np.max(array.a2))
+    dx = medium.c / (settings.ppw * medium.f)
+    ppp = round(settings.ppw / settings.cfl)
+    dt = 1.0 / (ppp * medium.f)
+    t_end = settings.t_end or 1.5 * np.hypot(axial, lateral / 2) / medium.c
+    Ny = _round_even(lateral / dx)
+    return {'dx': dx, 'Nx': _round_even(axial / dx) + settings.source_x_offset, 'Ny': Ny, 'Nz': Ny,
+            'ppp': ppp, 'dt': dt, 'Nt': int(np.round(t_end / dt)), 'axial_size': axial, 'lateral_size': lateral}
+
+
+def source_elements(array, medium, geometry='flat'):
+    """
+    把圆环设计换算为 kWaveArray 的单元和各单元的连续波幅值、相位。
+
+    平面圆环表示为外径圆盘与内径圆盘之差：内圆盘使用相同幅值、相位加 π 的信号，
+    分布式声源叠加后即为圆环。相位 -ω·t_m 对应 AnnularArray.delays 的聚焦延时。
+    球冠圆环由 add_annular_array 直接给出，曲率半径为焦距，不加延时。
+    声源幅值为 ρ0·c·u，与 annular_array_pressure 的声源强度一致。
+
+    返回:
+    tuple: (elements, amp, phase)，elements 为 ('disc', 直径) 或 ('annulus', (内径, 外径)) 的列表。
+    """
+    if geometry not in GEOMETRIES:
+        raise ValueError(f"未知的声源几何: {geometry}，可选 {GEOMETRIES}")
+    p0 = medium.rho0 * medium.c * medium.u
+    if geometry == 'bowl':
+        elements = [('annulus', (2 * a1, 2 * a2)) for a1, a2 in zip(array.a1, array.a2)]
+        return elements, np.full(array.m, p0), np.zeros(array.m)
+
+    elements, phase = [], []
+    for a1, a2, phi in zip(array.a1, array.a2, -medium.w * array.delays(medium)):
+        elements.append(('disc', 2 * a2))
+        phase.append(phi)
+        if a1 > 0:
+            elements.append(('disc', 2 * a1))
+            phase.append(phi + np.pi)
+    return elements, np.full(len(elements), p0), np.array(phase)
+
+
+def solver_command(execution_options, sensor, input_path, output_path):
+    """
+    求解器命令行。k-wave-python 0.3.x 只有 get_options_string (返回字符串)，
+    较新的版本 (编写时为 0.6.2) 提供 as_list 并把前者标为弃用，这里按可用的接口选择。
+
+    参数:
+    execution_options (SimulationExecutionOptions): 执行参数，提供 binary_path 和求解器选项。
+    sensor (kSensor): 传感器，决定记录哪些量。
+    input_path, output_path (str): 输入输出 HDF5 文件。
+
+    返回:
+    list: 可直接传给 subprocess.run 的参数列表。
+    """
+    if hasattr(execution_options, 'as_list'):
+        options = execution_options.as_list(sensor)
+    else:
+        options = shlex.split(execution_options.get_options_string(sensor))
+    return [str(execution_options.binary_path), '-i', input_path, '-o', output_path] + [str(o) for o in options]
+
+
+def build_job(array, medium, name, work_dir, settings=None, threads=None):
+    """
+    为一个设计写出 k-Wave 输入文件 (HDF5)，不运行仿真。
+
+    参数:
+    array (AnnularArray): 阵列几何，a1/a2 为一维。
+    medium (Medium): 介质参数。
+    name (str): 设计名称，用于文件名。
+    work_dir (str): 输入输出 HDF5 文件所在目录。
+    settings (KWaveSettings): 仿真参数。
+    threads (int): 该仿真使用的 OpenMP 线程数，默认使用全部 CPU 核。
+
+    返回:
+    dict: 运行和归约所需的信息，command 为求解器命令行，meta 为写入结果文件的网格与设计参数。
+    """
+    if kWaveGrid is None:
+        raise ImportError("批量仿真需要安装 k-wave-python")
+    settings = settings or KWaveSettings()
+    grid = grid_parameters(array, medium, settings)
+    Nx, Ny, Nz, dx, off = grid['Nx'], grid['Ny'], grid['Nz'], grid['dx'], settings.source_x_offset
+
+    kgrid = kWaveGrid(Vector([Nx, Ny, Nz]), Vector([dx, dx, dx]))
+    kgrid.setTime(grid['Nt'], grid['dt'])
+
+    elements, amp, phase = source_elements(array, medium, settings.geometry)
+    karray = kWaveArray(bli_tolerance=settings.bli_tolerance, upsampling_rate=settings.upsampling_rate,
+                        single_precision=True)
+    position = [kgrid.x_vec[0].item() + off * kgrid.dx, 0, 0]
+    focus_pos = [kgrid.x_vec[-1].item(), 0, 0]
+    if settings.geometry == 'bowl':
+        karray.add_annular_array(position, float(array.F), [list(d) for _, d in elements], focus_pos)
+    else:
+        for _, diameter in elements:
+            karray.add_disc_element(position, float(diameter), focus_pos)
+    source = kSource()
+    source.p_mask = karray.get_array_binary_mask(kgrid)
+    signal = create_cw_signals(np.squeeze(kgrid.t_array), medium.f, amp, phase)
+    source.p = karray.get_distributed_source_signal(kgrid, signal)
+
+    # 记录中心平面 (不含声源所在的网格面) 最后 record_periods 个周期的声压
+    sensor = kSensor()
+    sensor.mask = np.zeros((Nx, Ny, Nz), dtype=bool)
+    sensor.mask[(off + 1):, :, Nz // 2] = True
+    sensor.record = ['p']
+    sensor.record_start_index = kgrid.Nt - settings.record_periods * grid['ppp'] + 1
+
+    meta = {
+        'x': np.squeeze(kgrid.x_vec[(off + 1):] - kgrid.x_vec[off]),
+        'y': np.squeeze(kgrid.y_vec),
+        'a1': array.a1, 'a2': array.a2, 'F': array.F, 'delays': array.delays(medium),
+        'f0': medium.f, 'c': medium.c, 'rho0': medium.rho0, 'u': medium.u,
+        'dx': dx, 'dt': grid['dt'], 'Nt': grid['Nt'],
+        **{key: value for key, value in asdict(settings).items() if value is not None},
+    }
+
+    input_path = os.path.join(work_dir, f'{name}_input.h5')
+    output_path = os.path.join(work_dir, f'{name}_output.h5')
+    simulation_options = SimulationOptions(pml_auto=True, pml_inside=False, data_recast=True, save_to_disk=True,
+                                           save_to_disk_exit=True, data_path=work_dir,
+                                           input_filename=os.path.basename(input_path),
+                                           output_filename=os.path.basename(output_path))
+    execution_options = SimulationExecutionOptions(is_gpu_simulation=False, num_threads=threads or os.cpu_count(),
+                                                   delete_data=False, verbose_level=0, show_sim_log=False)
+    kspaceFirstOrder3D(kgrid=kgrid, source=source, sensor=sensor, medium=kWaveMedium(sound_speed=medium.c,
+                                                                                      density=medium.rho0),
+                       simulation_options=simulation_options, execution_options=execution_options)
+    command = solver_command(execution_options, sensor, input_path, output_path)
+    return {'name': name, 'input': input_path, 'output': output_path, 'command': command,
+            'shape': (Nx - (off + 1), Ny), 'meta': meta}
+
+
+def run_job(job, timeout=None):
+    """
+    运行求解器，失败时抛出 subprocess.CalledProcessError (附带求解器输出)。
+
+    参数:
+    job (dict): build_job 的返回值。
+    timeout (float): 单个仿真的最长运行时间 (s)。
+    """
+    subprocess.run(job['command'], check=True, capture_output=True, text=True, timeout=timeout)
+
+
+def _remove(*paths):
+    for path in paths:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def reduce_job(job, out_path, keep_raw=False):
+    """
+    把中心平面的声压时间序列归约为激励频率处的幅值和相位图，并删除原始数据。
+
+    参数:
+    job (dict): build_job 的返回值，求解器已运行完成。
+    out_path (str): 结果 .npz 路径。
+    keep_raw (bool): 保留输入输出 HDF5 文件。
+
+    返回:
+    str: out_path。结果包含 amp、phase (形状为 (len(x), len(y)) 的 float32) 和 job['meta']。
+    """
+    meta = job['meta']
+    n_sensor = int(np.prod(job['shape']))
+    with h5py.File(job['output'], 'r') as f:
+        p = np.asarray(f['p'], dtype=np.float32).reshape(-1, n_sensor)
+    amp, phase, _ = extract_amp_phase(p.T, 1.0 / meta['dt'], meta['f0'], dim=1, fft_padding=1,
+                                      window='Rectangular')
+    # 传感器按 Fortran 顺序编号
+    amp = np.reshape(amp, job['shape'], order='F').astype(np.float32)
+    phase = np.reshape(phase, job['shape'], order='F').astype(np.float32)
+    tmp_path = out_path + '.tmp.npz'
+    np.savez_compressed(tmp_path, amp=amp, phase=phase, **meta)
+    # 先写临时文件再改名，中断时不会留下不完整的结果
+    os.replace(tmp_path, out_path)
+    if not keep_raw:
+        _remove(job['input'], job['output'])
+    return out_path
+
+
+def load_result(path):
+    """
+    读取 reduce_job 保存的结果。
+
+    返回:
+    dict: amp、phase、x、y 和设计、网格参数，标量参数转换为 Python 数值。
+    """
+    with np.load(path) as data:
+        return {name: data[name].item() if data[name].ndim == 0 else data[name] for name in data.files}
+
+
+def run_batch(arrays, medium, out_dir, names=None, settings=None, workers=1, threads=None, work_dir=None,
+              timeout=None, keep_raw=False):
+    """
+    批量运行 k-Wave 仿真，每个设计在 out_dir 中保存一个 <名称>.npz。
+
+    主线程依次写出输入文件，最多 workers 个求解器同时运行；写好但尚未运行的输入文件
+    最多一个，磁盘上同时存在的原始 HDF5 文件数因此有上限。已有结果的设计直接跳过，
+    中断后重新运行即从断点继续；单个设计失败时记录错误并继续其余设计。
+
+    参数:
+    arrays (list): AnnularArray 列表，a1/a2 为一维。
+    medium (Medium): 介质参数。
+    out_dir (str): 结果目录。
+    names (list): 各设计的名称，默认为 design_00000、design_00001、...
+    settings (KWaveSettings): 仿真参数。
+    workers (int): 同时运行的求解器个数。
+    threads (int): 每个求解器的线程数，默认为 CPU 核数 / workers。
+    work_dir (str): 原始 HDF5 文件目录，默认使用系统临时目录下的新目录。
+    timeout (float): 单个仿真的最长运行时间 (s)。
+    keep_raw (bool): 保留原始 HDF5 文件。
+
+    返回:
+    tuple: (results, failed)，results 为设计名称到结果路径的映射，failed 为名称到错误信息的映射。
+    """
+    if kWaveGrid is None:
+        raise ImportError("批量仿真需要安装 k-wave-python")
+    os.makedirs(out_dir, exist_ok=True)
+    work_dir = work_dir or tempfile.mkdtemp(prefix='kwave_batch_')
+    os.makedirs(work_dir, exist_ok=True)
+    names = names or [f'design_{i:05d}' for i in range(len(arrays))]
+    threads = threads or max(1, (os.cpu_count() or 1) // workers)
+
+    results, failed = {}, {}
+    lock = threading.Lock()
+    # 求解器占用的名额加一个预先写好的输入文件
+    slots = threading.BoundedSemaphore(workers + 1)
+
+    def execute(job, out_path):
+        try:
+            run_job(job, timeout)
+            reduce_job(job, out_path, keep_raw)
+            with lock:
+                results[job['name']] = out_path
+        except Exception as error:   # 单个设计失败不中断整个批次
+            detail = getattr(error, 'stderr', None) or str(error)
+            with lock:
+                failed[job['name']] = detail
+            if not keep_raw:
+                _remove(job['input'], job['output'])
+        finally:
+            slots.release()
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for array, name in zip(arrays, names):
+            out_path = os.path.join(out_dir, name + RESULT_SUFFIX)
+            if os.path.exists(out_path):
+                results[name] = out_path
+                continue
+            slots.acquire()
+            try:
+                job = build_job(array, medium, name, work_dir, settings, threads)
+            except Exception as error:
+                failed[name] = str(error)
+                slots.release()
+                continue
+            pool.submit(execute, job, out_path)
+    return results, failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="环形阵列设计的 k-Wave 批量仿真")
+    parser.add_argument('catalog', help="设计目录 (.parquet / .csv)，见 design_catalog")
+    parser.add_argument('out_dir', help="结果目录，每个设计一个 .npz")
+    parser.add_argument('--designs', type=int, nargs='*', help="设计编号，默认全部")
+    parser.add_argument('--f0', type=float, default=Medium.f, help="激励频率 (Hz)")
+    parser.add_argument('--c0', type=float, default=Medium.c, help="声速 (m/s)")
+    parser.add_argument('--ppw', type=float, default=KWaveSettings.ppw, help="每波长网格点数")
+    parser.add_argument('--geometry', choices=GEOMETRIES, default='flat', help="声源几何")
+    parser.add_argument('--workers', type=int, default=1, help="同时运行的求解器个数")
+    parser.add_argument('--threads', type=int, help="每个求解器的线程数")
+    parser.add_argument('--work-dir', help="原始 HDF5 文件目录")
+    parser.add_argument('--timeout', type=float, help="单个仿真的最长运行时间 (s)")
+    args = parser.parse_args(argv)
+
+    from catalog_query import CatalogIndex
+    index = CatalogIndex.open(args.catalog)
+    designs = args.designs if args.designs else index.designs['design'].tolist()
+    arrays = [index.array_of(design) for design in designs]
+    names = [f'design_{design:05d}' for design in designs]
+    settings = KWaveSettings(ppw=args.ppw, geometry=args.geometry)
+    results, failed = run_batch(arrays, Medium(c=args.c0, f=args.f0), args.out_dir, names, settings,
+                                workers=args.workers, threads=args.threads, work_dir=args.work_dir,
+                                timeout=args.timeout)
+    print(f"完成 {len(results)} 个设计，失败 {len(failed)} 个")
+    for name, error in failed.items():
+        print(f"{name}: {error}", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
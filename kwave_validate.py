@@ -0,0 +1,221 @@
+# 解析模型与 k-Wave 的交叉验证
+# 在同一圆环几何上比较 kwave_batch 的 k-Wave 结果与解析模型：轴线上的精确解、
+# 焦平面上的 Rayleigh 积分和整个平面上的远场模型 annular_array_pressure，
+# 给出焦点声压误差、焦点偏移、主瓣宽度误差等指标，用来判断快速的远场模型何时足够准确。
+# select_ppw 从最粗的网格开始逐个运行，取焦点声压误差低于阈值的最粗网格 (每波长点数)，
+# 三维仿真的计算量约与 ppw⁴ 成正比，网格分辨率由数据决定而不是沿用习惯值。
+import argparse
+import sys
+from dataclasses import replace
+
+import numpy as np
+
+from annular_array import AnnularArray, Medium, annular_array_pressure, annular_array_pressure_axis
+from beam_metrics import mainlobe_width
+from kwave_batch import KWaveSettings, grid_parameters, load_result, run_batch
+from rayleigh_field import rayleigh_pressure
+from result_cache import digest
+
+try:
+    from kwave.utils.mapgen import focused_annulus_oneil
+except ImportError:
+    focused_annulus_oneil = None
+
+FOCAL_TOL = 0.05                          # 默认焦点声压相对误差阈值
+PPW_CANDIDATES = (2, 2.5, 3, 4, 5, 6, 8)  # select_ppw 默认尝试的每波长点数
+RUN_KEY_LENGTH = 16                       # select_ppw 结果文件名中参数摘要的长度
+
+# compare_fields 返回的指标名称
+FIELD_METRICS = ('focal_error', 'focal_shift', 'axial_error', 'lateral_error', 'width_error', 'model_error')
+
+
+def result_model(result):
+    """由 kwave_batch 结果中保存的参数重建阵列和介质"""
+    array = AnnularArray(result['a1'], result['a2'], F=result['F'])
+    medium = Medium(c=result['c'], rho0=result['rho0'], f=result['f0'], u=result['u'])
+    return array, medium
+
+
+def axial_reference(array, medium, z, geometry='flat'):
+    """
+    轴线声压幅值的参考解：平面圆环为 annular_array_pressure_axis 的精确解，
+    球冠圆环为 O'Neil 解 (需要 k-wave-python)。
+    """
+    if geometry == 'bowl':
+        if focused_annulus_oneil is None:
+            raise ImportError("球冠圆环的轴线解需要安装 k-wave-python")
+        diameters = np.stack([2 * array.a1, 2 * array.a2])
+        return focused_annulus_oneil(array.F, diameters, np.full(array.m, medium.u), np.zeros(array.m),
+                                     medium.f, medium.c, medium.rho0, z)
+    return np.abs(annular_array_pressure_axis(array, medium, z))
+
+
+def _max_error(values, reference):
+    """相对于参考最大幅值的最大偏差"""
+    return float(np.max(np.abs(values - reference)) / np.max(np.abs(reference)))
+
+
+def compare_fields(result, z_min=None, rayleigh=True):
+    """
+    比较一个 k-Wave 结果与解析模型。
+
+    参数:
+    result (dict): kwave_batch.load_result 的返回值。
+    z_min (float): 参与轴线和平面比较的最小轴向距离，默认 F/2，避开远场模型不成立的近场；
+        焦点声压和焦平面上的比较不受 z_min 限制。
+    rayleigh (bool): 在焦平面上计算 Rayleigh 积分作为离轴参考 (仅平面圆环)。
+
+    返回:
+    dict: FIELD_METRICS 中的指标
+        focal_error 焦点 (z=F) 处 k-Wave 声压与轴线参考解的相对误差；
+        focal_shift 轴线声压最大值位置之差 (m)，正值表示 k-Wave 的焦点更远；
+        axial_error z >= z_min 的轴线上相对参考最大值的最大偏差；
+        lateral_error 焦平面上相对 Rayleigh 积分的最大偏差，球冠圆环或不计算时为 NaN；
+        width_error 焦平面 -6 dB 宽度的相对误差 (远场模型相对 k-Wave)；
+        model_error z >= z_min 的平面上远场模型相对 k-Wave 的均方根误差 (以 k-Wave 最大值归一化)。
+    """
+    array, medium = result_model(result)
+    geometry = result.get('geometry', 'flat')
+    x, y, amp = result['x'], result['y'], result['amp']
+    z_min = array.F / 2 if z_min is None else z_min
+    iy = int(np.argmin(np.abs(y)))
+    near = x >= z_min
+    if not near.any():
+        raise ValueError(f"z_min = {z_min:.4g} m 超出仿真区域 (x <= {x.max():.4g} m)")
+
+    # 轴线
+    kw_axis = amp[:, iy]
+    ref_axis = axial_reference(array, medium, x, geometry)
+    ref_focus = np.interp(array.F, x, ref_axis)
+    metrics = {
+        'focal_error': float(abs(np.interp(array.F, x, kw_axis) - ref_focus) / ref_focus),
+        'focal_shift': float(x[near][np.argmax(kw_axis[near])] - x[near][np.argmax(ref_axis[near])]),
+        'axial_error': _max_error(kw_axis[near], ref_axis[near]),
+    }
+
+    # 焦平面 (z 取最接近 F 的网格面)
+    ix = int(np.argmin(np.abs(x - array.F)))
+    kw_lateral = amp[ix]
+    if rayleigh and geometry == 'flat':
+        metrics['lateral_error'] = _max_error(kw_lateral, np.abs(rayleigh_pressure(array, medium, y, x[ix])))
+    else:
+        metrics['lateral_error'] = np.nan
+
+    # 远场模型：r = sqrt(y²+z²)，θ = atan(y/z)；焦平面单独计算，z_min > F 时也取同一个网格面
+    Z, Y = np.meshgrid(x[near], y, indexing='ij')
+    model = np.abs(annular_array_pressure(array, medium, np.hypot(Y, Z), np.arctan2(Y, Z)))
+    model_lateral = np.abs(annular_array_pressure(array, medium, np.hypot(y, x[ix]), np.arctan2(y, x[ix])))
+    kw_width = mainlobe_width(kw_lateral, -6, y)[0]
+    metrics['width_error'] = float(mainlobe_width(model_lateral, -6, y)[0] / kw_width - 1)
+    metrics['model_error'] = float(np.sqrt(np.mean((model - amp[near]) ** 2)) / amp[near].max())
+    return metrics
+
+
+def simulation_cost(array, medium, settings=None):
+    """k-Wave 计算量的估计：网格点数 × 时间步数"""
+    grid = grid_parameters(array, medium, settings)
+    return grid['Nx'] * grid['Ny'] * grid['Nz'] * grid['Nt']
+
+
+def validate(arrays, medium, out_dir, names=None, settings=None, workers=1, threads=None, z_min=None,
+             rayleigh=True, **batch_options):
+    """
+    对一批圆环几何运行 k-Wave 并与解析模型比较。
+
+    参数:
+    arrays (list): AnnularArray 列表。
+    medium (Medium): 介质参数。
+    out_dir (str): k-Wave 结果目录，已有结果直接使用。
+    names (list): 设计名称，见 kwave_batch.run_batch。
+    settings (KWaveSettings): 仿真参数。
+    workers (int): 同时运行的求解器个数。
+    threads (int): 每个求解器的线程数。
+    z_min (float): 见 compare_fields。
+    rayleigh (bool): 见 compare_fields。
+    batch_options: 传给 run_batch 的其他参数 (work_dir、timeout、keep_raw)。
+
+    返回:
+    tuple: (rows, failed)，rows 为设计名称到 compare_fields 指标的映射，failed 见 run_batch。
+    """
+    results, failed = run_batch(arrays, medium, out_dir, names, settings, workers=workers, threads=threads,
+                                **batch_options)
+    rows = {name: compare_fields(load_result(path), z_min, rayleigh) for name, path in sorted(results.items())}
+    return rows, failed
+
+
+def select_ppw(array, medium, out_dir, tol=FOCAL_TOL, candidates=PPW_CANDIDATES, settings=None, threads=None,
+               z_min=None, exhaustive=False, **batch_options):
+    """
+    选择焦点声压误差不超过 tol 的最粗 k-Wave 网格。
+
+    从最小的每波长点数开始依次仿真，第一个满足条件的即为结果，更细 (更贵) 的网格不再运行；
+    exhaustive=True 时运行全部候选，用于检查误差随网格的收敛情况。
+
+    参数:
+    array (AnnularArray): 阵列几何。
+    medium (Medium): 介质参数。
+    out_dir (str): k-Wave 结果目录，各网格的结果保存为 ppw_<点数>_<摘要>.npz，摘要由阵列、介质和
+        仿真参数计算，只有参数完全相同的已有结果才会直接使用。
+    tol (float): 焦点声压相对误差阈值。
+    candidates (tuple): 候选的每波长点数。
+    settings (KWaveSettings): 其余仿真参数，其中的 ppw 被忽略。
+    threads (int): 求解器线程数。
+    z_min (float): 见 compare_fields。
+    exhaustive (bool): 运行全部候选。
+    batch_options: 传给 run_batch 的其他参数。
+
+    返回:
+    dict: 'ppw' 为选出的每波长点数 (均不满足时为 None)，'table' 为各候选的
+        ppw、cost (网格点数 × 时间步数)、relative_cost (相对于默认 ppw) 和 compare_fields 指标。
+    """
+    settings = settings or KWaveSettings()
+    reference_cost = simulation_cost(array, medium, replace(settings, ppw=KWaveSettings.ppw))
+    chosen = None
+    table = []
+    for ppw in sorted(candidates):
+        trial = replace(settings, ppw=ppw)
+        name = f'ppw_{ppw:g}_{digest(array=array, medium=medium, settings=trial)[:RUN_KEY_LENGTH]}'
+        results, failed = run_batch([array], medium, out_dir, [name], trial, threads=threads, **batch_options)
+        if name in failed:
+            raise RuntimeError(f"ppw = {ppw:g} 的 k-Wave 仿真失败: {failed[name]}")
+        cost = simulation_cost(array, medium, trial)
+        row = {'ppw': ppw, 'cost': cost, 'relative_cost': cost / reference_cost,
+               **compare_fields(load_result(results[name]), z_min, rayleigh=False)}
+        table.append(row)
+        if chosen is None and row['focal_error'] <= tol:
+            chosen = ppw
+            if not exhaustive:
+                break
+    return {'ppw': chosen, 'table': table}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="选择 k-Wave 网格分辨率并与解析模型比较")
+    parser.add_argument('catalog', help="设计目录 (.parquet / .csv)")
+    parser.add_argument('design', type=int, help="设计编号")
+    parser.add_argument('out_dir', help="k-Wave 结果目录")
+    parser.add_argument('--tol', type=float, default=FOCAL_TOL, help="焦点声压相对误差阈值")
+    parser.add_argument('--ppw', type=float, nargs='*', default=list(PPW_CANDIDATES), help="候选的每波长点数")
+    parser.add_argument('--f0', type=float, default=Medium.f, help="激励频率 (Hz)")
+    parser.add_argument('--c0', type=float, default=Medium.c, help="声速 (m/s)")
+    parser.add_argument('--threads', type=int, help="求解器线程数")
+    parser.add_argument('--exhaustive', action='store_true', help="运行全部候选")
+    args = parser.parse_args(argv)
+
+    from catalog_query import CatalogIndex
+    array = CatalogIndex.open(args.catalog).array_of(args.design)
+    selection = select_ppw(array, Medium(c=args.c0, f=args.f0), args.out_dir, args.tol, args.ppw,
+                           threads=args.threads, exhaustive=args.exhaustive)
+    print(f"{'ppw':>5} {'相对计算量':>10} " + ' '.join(f'{name:>13}' for name in FIELD_METRICS))
+    for row in selection['table']:
+        print(f"{row['ppw']:5g} {row['relative_cost']:10.3f} " +
+              ' '.join(f'{row[name]:13.4g}' for name in FIELD_METRICS))
+    if selection['ppw'] is None:
+        print(f"没有候选网格满足焦点声压误差 <= {args.tol:g}")
+        return 1
+    print(f"选择 ppw = {selection['ppw']:g}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,189 @@
+# 环形阵列的脉冲激励时域声场
+# 用圆盘空间脉冲响应的解析式得到每个圆环的脉冲响应 (外圆盘减内圆盘)，
+# 按各环延时叠加后与任意激励波形做 FFT 卷积，场点成批计算。
+import numpy as np
+from scipy.signal import fftconvolve
+from scipy.signal.windows import tukey
+
+OVERSAMPLE = 4       # 每个采样间隔内的子采样数，对脉冲响应的不连续处做平均
+CHUNK_SIZE = 1024    # 每次处理的场点数
+TUKEY_FRACTION = 0.25   # Tukey 窗两端余弦过渡段占猝发长度的比例
+
+
+def tone_burst(f0, cycles, fs, window='hann'):
+    """
+    生成单位幅值的正弦猝发激励 (质点振速波形)。
+
+    'rect' 猝发起止处振速导数有阶跃，近场中各环的边缘波瞬态不能相互抵消，
+    声压峰值可达连续波幅值的两倍以上；接近连续波的长猝发宜用 'tukey'，
+    或用 steady_state_amplitude 只取稳态段。
+
+    参数:
+    f0 (float): 中心频率。
+    cycles (float): 周期数。
+    fs (float): 采样率。
+    window (str): 'hann' 加汉宁窗，'tukey' 加 Tukey 窗 (过渡段见 TUKEY_FRACTION)，'rect' 不加窗。
+
+    返回:
+    ndarray: 激励波形。
+    """
+    n = int(round(cycles * fs / f0))
+    t = np.arange(n) / fs
+    burst = np.sin(2 * np.pi * f0 * t)
+    if window == 'hann':
+        burst *= np.hanning(n)
+    elif window == 'tukey':
+        burst *= tukey(n, TUKEY_FRACTION)
+    elif window != 'rect':
+        raise ValueError(f"未知的窗函数: {window}，可选 'hann'、'tukey'、'rect'")
+    return burst
+
+
+def disc_impulse_response(a, x, z, t, c):
+    """
+    半径为 a 的圆盘活塞在 (x, 0, z) 处的空间脉冲响应 (解析式)。
+
+    h = c/π·arccos((x²+ρ²-a²)/(2xρ))，ρ = sqrt((ct)²-z²)，
+    参数裁剪到 [-1, 1] 后自动覆盖 h=c 和 h=0 两种情况。
+
+    参数:
+    a (array_like): 圆盘半径。
+    x, z (array_like): 场点横向和轴向坐标。
+    t (array_like): 时间。
+    c (float): 声速。
+
+    返回:
+    ndarray: 广播后的脉冲响应，单位 m/s。
+    """
+    rho2 = (c * t) ** 2 - z ** 2
+    rho = np.sqrt(np.maximum(rho2, 0.0))
+    x = np.maximum(np.abs(x), 1e-12)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        arg = (x ** 2 + rho ** 2 - a ** 2) / (2 * x * rho)
+    h = c / np.pi * np.arccos(np.clip(np.nan_to_num(arg, nan=1.0, posinf=1.0, neginf=-1.0), -1.0, 1.0))
+    return np.where(rho2 > 0, h, 0.0)
+
+
+def spatial_impulse_response(array, medium, x, z, fs, oversample=OVERSAMPLE):
+    """
+    环形阵列 (含各环聚焦延时) 在一批场点上的空间脉冲响应。
+
+    每个场点使用各自的时间起点，只覆盖脉冲响应非零的时间窗，
+    所有场点的窗长取最大值，以便整批做 FFT 卷积。
+
+    参数:
+    array (AnnularArray): 阵列几何，a1/a2 为一维。
+    medium (Medium): 介质参数。
+    x, z (array_like): 场点横向和轴向坐标，广播后展平为 P 个点。
+    fs (float): 采样率。
+    oversample (int): 每个采样间隔内的子采样数。
+
+    返回:
+    tuple: (t0, h)，t0 形状为 (P,)，是各场点第一个采样的时刻；h 形状为 (P, T)。
+    """
+    x, z = np.broadcast_arrays(np.asarray(x, dtype=float), np.asarray(z, dtype=float))
+    x = np.maximum(np.abs(x.ravel()), 1e-12)
+    z = z.ravel()
+    c = medium.c
+    a_max = array.a2.max()
+    delays = array.delays(medium)
+
+    t0 = np.hypot(z, np.maximum(x - a_max, 0.0)) / c + delays.min()
+    t1 = np.hypot(z, x + a_max) / c + delays.max()
+    n = int(np.ceil(np.max(t1 - t0) * fs)) + 2
+    # 每个采样取其前后半个间隔内 oversample 个子采样的平均
+    sub = (np.arange(oversample) + 0.5) / oversample - 0.5
+    offsets = (np.arange(n)[:, None] + sub) / fs
+
+    h = np.zeros((x.size, n))
+    for start in range(0, x.size, CHUNK_SIZE):
+        xs = x[start:start + CHUNK_SIZE, None, None]
+        zs = z[start:start + CHUNK_SIZE, None, None]
+        t = t0[start:start + CHUNK_SIZE, None, None] + offsets
+        acc = np.zeros(t.shape)
+        for a1, a2, tau in zip(array.a1, array.a2, delays):
+            # 内外圆盘共用 ρ，只在 ρ>0 时有响应
+            rho2 = (c * (t - tau)) ** 2 - zs ** 2
+            rho = np.sqrt(np.maximum(rho2, 1e-30))
+            base = xs ** 2 + rho ** 2
+            inv = 1 / (2 * xs * rho)
+            ring = (np.arccos(np.clip((base - a2 ** 2) * inv, -1.0, 1.0)) -
+                    np.arccos(np.clip((base - a1 ** 2) * inv, -1.0, 1.0)))
+            acc += np.where(rho2 > 0, ring, 0.0)
+        h[start:start + CHUNK_SIZE] = c / np.pi * acc.mean(axis=-1)
+    return t0, h
+
+
+def transmit_pressure(array, medium, x, z, excitation, fs):
+    """
+    发射声压 p = ρ·∂v/∂t * h，激励为质点振速波形，幅值乘以 medium.u。
+
+    参数:
+    array (AnnularArray): 阵列几何。
+    medium (Medium): 介质参数。
+    x, z (array_like): 场点坐标。
+    excitation (ndarray): 振速波形，采样率为 fs。
+    fs (float): 采样率。
+
+    返回:
+    tuple: (t, p)，t 形状为 (P, T)，是各场点的时间轴；p 形状为 (P, T)。
+    """
+    t0, h = spatial_impulse_response(array, medium, x, z, fs)
+    p = _convolve_velocity(h, medium, excitation, fs)
+    return t0[:, None] + np.arange(p.shape[-1]) / fs, p
+
+
+def _convolve_velocity(h, medium, excitation, fs):
+    """p = ρ·∂v/∂t * h，h 形状为 (P, T)"""
+    dv = np.gradient(medium.u * np.asarray(excitation, dtype=float)) * fs
+    return medium.rho0 * fftconvolve(h, dv[None, :], axes=-1) / fs
+
+
+def steady_state_amplitude(array, medium, x, z, excitation, fs):
+    """
+    长猝发激励下的稳态声压幅值，可与连续波解 (annular_array_pressure) 比较。
+
+    只取整段脉冲响应都落在激励之内的采样，不含猝发起止处的瞬态。
+
+    参数:
+    array (AnnularArray): 阵列几何。
+    medium (Medium): 介质参数。
+    x, z (array_like): 场点坐标。
+    excitation (ndarray): 振速波形，采样率为 fs，应比脉冲响应长若干个周期。
+    fs (float): 采样率。
+
+    返回:
+    ndarray: 各场点稳态段的峰值，形状为 (P,)。
+
+    异常:
+    ValueError: 激励不长于脉冲响应，没有稳态段。
+    """
+    _, h = spatial_impulse_response(array, medium, x, z, fs)
+    n_response, n_burst = h.shape[-1], len(excitation)
+    if n_burst <= n_response:
+        raise ValueError(f"激励长度 {n_burst} 个采样不超过脉冲响应长度 {n_response}，没有稳态段")
+    p = _convolve_velocity(h, medium, excitation, fs)
+    return np.abs(p[:, n_response - 1:n_burst]).max(axis=-1)
+
+
+def pulse_echo(array, medium, x, z, excitation, fs):
+    """
+    点散射体的脉冲回波信号 p = ρ/(2c)·∂³v/∂t³ * h_tx * h_rx，
+    收发使用同一阵列和同一组延时，因此 h_rx = h_tx。
+
+    参数:
+    array (AnnularArray): 阵列几何。
+    medium (Medium): 介质参数。
+    x, z (array_like): 散射体位置。
+    excitation (ndarray): 振速波形，采样率为 fs。
+    fs (float): 采样率。
+
+    返回:
+    tuple: (t, p)，t 形状为 (P, T)，是各场点的时间轴；p 形状为 (P, T)。
+    """
+    t0, h = spatial_impulse_response(array, medium, x, z, fs)
+    v = medium.u * np.asarray(excitation, dtype=float)
+    d3v = np.gradient(np.gradient(np.gradient(v))) * fs ** 3
+    h_pe = fftconvolve(h, h, axes=-1) / fs
+    p = medium.rho0 / (2 * medium.c) * fftconvolve(h_pe, d3v[None, :], axes=-1) / fs
+    return 2 * t0[:, None] + np.arange(p.shape[-1]) / fs, p
@@ -0,0 +1,188 @@
+# 声场计算结果的磁盘缓存
+# 以全部物理参数和网格定义的哈希为键保存 .npz 结果，按最近使用时间淘汰，
+# 计算核版本号变化时旧结果自动失效，跨会话、跨同事共享同一目录即可复用。
+# 每个版本目录中有 VERSION_MARKER 标记文件，prune 只删除带标记的旧版本目录。
+import dataclasses
+import functools
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+
+import numpy as np
+
+import annular_array
+import beam_metrics
+import sound_field
+
+DEFAULT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.acoustic_cache')
+DEFAULT_MAX_BYTES = 1 << 30   # 默认缓存上限 1 GB
+VERSION_MARKER = '.result_cache'   # 版本目录中的标记文件，内容为版本字符串
+
+
+def kernel_version():
+    """当前计算核的版本字符串"""
+    return (f"sf{sound_field.KERNEL_VERSION}-aa{annular_array.KERNEL_VERSION}"
+            f"-bm{beam_metrics.KERNEL_VERSION}")
+
+
+def _canonical(value):
+    """把参数转换成可 JSON 序列化且与写法无关的形式"""
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        fields = {f.name: _canonical(getattr(value, f.name)) for f in dataclasses.fields(value)}
+        return {'__class__': type(value).__name__, **fields}
+    if isinstance(value, np.ndarray):
+        value = np.ascontiguousarray(value)
+        return {'__ndarray__': value.dtype.str, 'shape': value.shape,
+                'sha256': hashlib.sha256(value.tobytes()).hexdigest()}
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in sorted(value.items())}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, float):
+        return repr(value)
+    if callable(value) and hasattr(value, '__qualname__'):
+        return {'__callable__': f"{value.__module__}.{value.__qualname__}"}
+    if hasattr(value, '__dict__'):
+        # 例如 sound_field.JincTable，按类名和属性区分
+        return {'__class__': type(value).__name__, **_canonical(vars(value))}
+    return value
+
+
+def digest(**params):
+    """由参数计算与写法无关的 SHA-256 十六进制摘要，ResultCache.key 和其他按参数命名结果的地方共用"""
+    text = json.dumps(_canonical(params), sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+class ResultCache:
+    """
+    内容寻址的结果缓存。
+
+    结果为 ndarray 或 {名称: 数组/标量} 字典，保存为 <目录>/<版本>/<键>.npz；
+    每次读取都会更新文件时间，超过容量时删除最久未使用的文件。
+    """
+
+    def __init__(self, directory=DEFAULT_DIR, max_bytes=DEFAULT_MAX_BYTES, version=None):
+        """
+        参数:
+        directory (str): 缓存根目录。
+        max_bytes (int): 缓存总大小上限。
+        version (str): 计算核版本，默认 kernel_version()；旧版本的结果保留，由 prune 删除。
+        """
+        self.root = directory
+        self.max_bytes = max_bytes
+        self.version = version or kernel_version()
+        self.directory = os.path.join(directory, self.version)
+        os.makedirs(self.directory, exist_ok=True)
+        marker = os.path.join(self.directory, VERSION_MARKER)
+        if not os.path.exists(marker):
+            with open(marker, 'w') as f:
+                f.write(self.version)
+
+    def prune(self):
+        """
+        删除根目录下其他版本的缓存目录。
+
+        只删除含有 VERSION_MARKER 且标记内容与目录名一致的目录，根目录中的其他文件和目录不受影响。
+
+        返回:
+        list: 被删除的版本。
+        """
+        removed = []
+        for entry in os.scandir(self.root):
+            if entry.name == self.version or not entry.is_dir(follow_symlinks=False):
+                continue
+            try:
+                with open(os.path.join(entry.path, VERSION_MARKER)) as f:
+                    marked = f.read().strip()
+            except OSError:
+                continue
+            if marked == entry.name and re.fullmatch(r'[\w.-]+', marked):
+                shutil.rmtree(entry.path, ignore_errors=True)
+                removed.append(entry.name)
+        return removed
+
+    def key(self, **params):
+        """由参数计算缓存键"""
+        return digest(**params)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + '.npz')
+
+    def get(self, key):
+        """
+        读取缓存结果，不存在时返回 None。
+
+        返回:
+        ndarray 或 dict: 与 put 时相同结构的结果。
+        """
+        path = self._path(key)
+        try:
+            with np.load(path) as data:
+                result = {name: data[name] for name in data.files}
+        except (FileNotFoundError, OSError, ValueError):
+            return None
+        os.utime(path)
+        if list(result) == ['__array__']:
+            return result['__array__']
+        return {name: value[()] if value.ndim == 0 else value for name, value in result.items()}
+
+    def put(self, key, result):
+        """
+        写入结果，先写临时文件再改名，多进程同时写入同一个键也是安全的。
+
+        参数:
+        key (str): 缓存键。
+        result (ndarray 或 dict): 计算结果。
+        """
+        arrays = {'__array__': result} if isinstance(result, np.ndarray) else result
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            np.savez(f, **arrays)
+        os.replace(tmp, self._path(key))
+        self.evict()
+
+    def evict(self):
+        """删除最久未使用的文件，直到总大小不超过上限"""
+        entries = []
+        total = 0
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.npz'):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def clear(self):
+        """清空当前版本的所有结果"""
+        for entry in os.scandir(self.directory):
+            if entry.name != VERSION_MARKER:
+                os.remove(entry.path)
+
+    def memoize(self, func):
+        """
+        装饰器：以函数名和全部参数为键缓存函数结果。
+
+        被装饰的函数须返回 ndarray 或 {名称: 数组/标量} 字典。
+        """
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = self.key(func=f"{func.__module__}.{func.__qualname__}", args=args, kwargs=kwargs)
+            result = self.get(key)
+            if result is None:
+                result = func(*args, **kwargs)
+                self.put(key, result)
+            return result
+        return wrapper
@@ -0,0 +1,160 @@
+# 压电陶瓷圆环的电阻抗模型
+# 从 impedance-TAOCI.ipynb 中提取 calculate_tau / calculate_k15t / calculate_impedance，
+# 去掉对全局常数的依赖并改为广播计算：a1、a2 可以是任意形状 (单个阵列的各圆环、
+# (设计数, m) 的目录、或 a1[:, None] 与 a2[None, :] 构成的半径网格)，频率为最后一维，
+# 一次调用得到所有圆环在整个频率扫描上的阻抗，以及谐振/反谐振频率和有效耦合系数。
+#
+# 材料常数与 notebook 相同。notebook 中的 beta11s = 1.23e-9 按数值是介电常数 ε11S (F/m)，
+# 直接作为逆介电常数代入时 k15t² ~ 1e17、C0 ~ S/(1.23e-9·l) 均无物理意义；
+# 这里取 β11S = 1/ε11S，k15t² ≈ 0.25~0.28，C0 = ε11S·S/l，与 notebook 中 C0 = S/(β11s·l) 的写法一致。
+from dataclasses import dataclass
+
+import numpy as np
+
+F0 = 4e6             # 设计中心频率，单位：Hz
+BISECTION_STEPS = 60  # 求谐振频率的二分次数
+
+
+@dataclass
+class PiezoMaterial:
+    """压电陶瓷的材料常数，默认值为 impedance-TAOCI.ipynb 中的 PZT-3 型陶瓷"""
+    h15: float = -2.6e9      # 压电应力常数，单位：V/m
+    eps11s: float = 1.23e-9  # 恒应变介电常数 ε11S，单位：F/m
+    rho: float = 7500.0      # 密度，单位：kg/m^3
+    C55D: float = 2.94e10    # 恒电位移弹性刚度常数，单位：Pa
+    Qm: float = np.inf       # 机械品质因数，有限值时弹性常数取 C55D·(1 + j/Qm)
+
+    @property
+    def beta11s(self):
+        """恒应变逆介电常数 β11S = 1/ε11S"""
+        return 1 / self.eps11s
+
+    @property
+    def Ct(self):
+        """剪切波传播速度 (计入机械损耗时为复数)"""
+        return np.sqrt(self.C55D * (1 + 1j / self.Qm) / self.rho) if np.isfinite(self.Qm) \
+            else np.sqrt(self.C55D / self.rho)
+
+
+PZT = PiezoMaterial()
+
+
+def quarter_wave_thickness(material=PZT, f0=F0):
+    """notebook 中的厚度取法：中心频率下剪切波长的 1/4"""
+    return np.real(material.Ct) / f0 / 4
+
+
+def calculate_tau(a1, a2):
+    """圆环的截面扭转系数 τ，a1、a2 可广播"""
+    a1 = np.asarray(a1, dtype=float)
+    a2 = np.asarray(a2, dtype=float)
+    return (9 * (a1 + a2) ** 2 * (a1 ** 2 + a2 ** 2)) / (8 * (a1 ** 2 + a1 * a2 + a2 ** 2) ** 2)
+
+
+def calculate_k15t(tau, material=PZT):
+    """机电耦合系数 k15t = h15 / sqrt(β11S·C55D·τ)"""
+    return material.h15 / np.sqrt(material.beta11s * material.C55D * np.asarray(tau))
+
+
+def clamped_capacitance(a1, a2, thickness, material=PZT):
+    """圆环的夹持电容 C0 = S/(β11S·l)，S 为圆环面积"""
+    area = np.pi * (np.asarray(a2, dtype=float) ** 2 - np.asarray(a1, dtype=float) ** 2)
+    return area / (material.beta11s * thickness)
+
+
+def calculate_impedance(k15t, kt, l, omega, C0):
+    """
+    Z = 1/(jωC0)·(1 - k15t²·tan(kt·l/2)/(kt·l/2))，各参数可广播。
+
+    参数:
+    k15t (array_like): 机电耦合系数。
+    kt (array_like): 剪切波波数 ω/Ct。
+    l (float): 厚度。
+    omega (array_like): 角频率。
+    C0 (array_like): 夹持电容。
+
+    返回:
+    ndarray: 复阻抗，单位 Ω。
+    """
+    x = np.asarray(kt) * l / 2
+    # 面积为 0 的圆环 (a1 = a2) C0 = 0，阻抗为无穷大
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return 1 / (1j * np.asarray(omega) * C0) * (1 - np.asarray(k15t) ** 2 * (np.tan(x) / x))
+
+
+def ring_impedance(a1, a2, f, thickness=None, material=PZT):
+    """
+    圆环在一组频率上的复阻抗。
+
+    参数:
+    a1, a2 (array_like): 圆环内外半径，可广播，广播后的形状记为 R。
+    f (array_like): 一维频率数组。
+    thickness (float): 陶瓷厚度，默认为 quarter_wave_thickness(material)。
+    material (PiezoMaterial): 材料常数。
+
+    返回:
+    ndarray: 形状为 (*R, len(f)) 的复阻抗。
+    """
+    thickness = quarter_wave_thickness(material) if thickness is None else thickness
+    a1, a2 = np.broadcast_arrays(np.asarray(a1, dtype=float), np.asarray(a2, dtype=float))
+    omega = 2 * np.pi * np.asarray(f, dtype=float)
+    k15t = calculate_k15t(calculate_tau(a1, a2), material)[..., None]
+    C0 = clamped_capacitance(a1, a2, thickness, material)[..., None]
+    return calculate_impedance(k15t, omega / material.Ct, thickness, omega, C0)
+
+
+def resonance_frequencies(a1, a2, thickness=None, material=PZT, tau=None):
+    """
+    谐振频率 fr (Z = 0) 、反谐振频率 fa (Z → ∞) 和有效耦合系数。
+
+    x = kt·l/2，fa 对应 tan(x) 的第一个极点 x = π/2，与半径无关；
+    fr 为 k15t²·tan(x) = x 在 (0, π/2) 内的根，对所有圆环同时二分求解，
+    k15t² >= 1 时无根，fr 和 k_eff 为 NaN。计入机械损耗时按 Ct 的实部计算。
+
+    参数:
+    a1, a2 (array_like): 圆环内外半径，可广播。
+    thickness (float): 陶瓷厚度，默认为 quarter_wave_thickness(material)。
+    material (PiezoMaterial): 材料常数。
+    tau (array_like): 已算好的截面扭转系数 calculate_tau(a1, a2)，给出时不再由 a1、a2 重新计算。
+
+    返回:
+    tuple: (fr, fa, k_eff)，形状为 a1、a2 广播后的形状，k_eff = sqrt(1 - (fr/fa)²)。
+    """
+    thickness = quarter_wave_thickness(material) if thickness is None else thickness
+    tau = calculate_tau(a1, a2) if tau is None else np.asarray(tau, dtype=float)
+    k2 = calculate_k15t(tau, material) ** 2
+    low = np.zeros_like(k2)
+    high = np.full_like(k2, np.pi / 2)
+    for _ in range(BISECTION_STEPS):
+        mid = (low + high) / 2
+        positive = k2 * np.tan(mid) > mid
+        high = np.where(positive, mid, high)
+        low = np.where(positive, low, mid)
+    x = np.where(k2 < 1, (low + high) / 2, np.nan)
+    # f = x·Ct/(π·l)
+    scale = np.real(material.Ct) / (np.pi * thickness)
+    fr = x * scale
+    fa = np.full_like(fr, np.pi / 2 * scale)
+    return fr, fa, np.sqrt(1 - (fr / fa) ** 2)
+
+
+def impedance_sweep(a1, a2, f, thickness=None, material=PZT):
+    """
+    一次计算所有圆环的阻抗扫描和谐振参数，用于逐环电匹配。
+
+    参数:
+    a1, a2 (array_like): 圆环内外半径，例如 AnnularArray 的 a1/a2 (形状 (*B, m))。
+    f (array_like): 一维频率数组。
+    thickness (float): 陶瓷厚度，默认为 quarter_wave_thickness(material)。
+    material (PiezoMaterial): 材料常数。
+
+    返回:
+    dict: 'Z' 复阻抗、'magnitude' |Z| (Ω)、'phase' 相位 (rad)，形状为 (*R, len(f))；
+        'fr'、'fa' (Hz)、'k_eff'、'C0' (F)，形状为 R。
+    """
+    thickness = quarter_wave_thickness(material) if thickness is None else thickness
+    Z = ring_impedance(a1, a2, f, thickness, material)
+    fr, fa, k_eff = resonance_frequencies(a1, a2, thickness, material)
+    return {'Z': Z, 'magnitude': np.abs(Z), 'phase': np.angle(Z), 'fr': fr, 'fa': fa, 'k_eff': k_eff,
+            'C0': clamped_capacitance(*np.broadcast_arrays(a1, a2), thickness, material)}
+
@@ -7,6 +7,8 @@ import matplotlib.pyplot as plt
 import math,cmath
 from scipy import integrate
 from scipy.special import jv,yv,j1
+# 向量化声压计算引擎
+from sound_field import sound_power_grid, axis_sound_power_grid
 
 # %%
 # 定义一个变量f0，其值为2.25乘以10的6次方，代表频率
@@ -116,9 +118,7 @@ Psound = np.zeros([N,len(xita)],dtype=complex)
 print(Psound.shape)
 
 CalTrans(Rmax,lamd/2,N)
-for i in np.arange(0,N):
-    for j in np.arange(0,len(xita)):
-        Psound[i][j] = SoundPower(F,Rin[i],Rout[i],xita[j],delay[0]-delay[i])   
+Psound[:] = sound_power_grid(F, xita, Rin, Rout, delay[0], delay, f0=f0, c0=c0, u=u, p=p)[:, 0, :, 0]
 Psound_sum_abs = np.absolute(np.sum(Psound,axis=0)) 
 
 
@@ -128,9 +128,7 @@ plt.legend()
 # %%
 def TestPsoundVSdiffL(difL):
     CalTrans(Rmax,difL,N)
-    for i in np.arange(0,N):
-        for j in np.arange(0,len(xita)):
-            Psound[i][j] = SoundPower(F,Rin[i],Rout[i],xita[j],delay[0]-delay[i])   
+    Psound[:] = sound_power_grid(F, xita, Rin, Rout, delay[0], delay, f0=f0, c0=c0, u=u, p=p)[:, 0, :, 0]
     ret = np.absolute(np.sum(Psound,axis=0))
     return ret
 
@@ -149,10 +147,7 @@ tdelay = np.arange(0, F/c0, F/c0/1000)
 Psound_time = np.zeros([N,len(tdelay)],dtype=complex)
 print(Psound_time.shape)
 
-for i in np.arange(0,N):
-    print(-delay[i])
-    for j in np.arange(0,len(tdelay)):
-        Psound_time[i][j] = SoundPower(F,Rin[i],Rout[i],1e-9,tdelay[j]-delay[i])
+Psound_time[:] = sound_power_grid(F, 1e-9, Rin, Rout, tdelay, delay, f0=f0, c0=c0, u=u, p=p)[:, 0, 0, :]
 
 x = tdelay
 plt.xlim([2e-6, 3e-6])
@@ -182,9 +177,7 @@ CalTrans(Rmax,difL/2,N)
 dis = np.arange(0, 1000*lamd, lamd/20)
 Psound_axis = np.zeros([N,len(dis)],dtype=complex)
 
-for i in np.arange(0,N):
-    for j in np.arange(0,len(dis)):
-        Psound_axis[i][j] = AxisSoundPower(dis[j],Rin[i],Rout[i],delay[0]-delay[i])
+Psound_axis[:] = axis_sound_power_grid(dis, Rin, Rout, delay[0], delay, f0=f0, c0=c0, u=u, p=p)[:, :, 0]
 
 dysum = np.absolute(np.sum(Psound_axis,axis=0))
 
@@ -194,9 +187,7 @@ plt.legend()
 # %%
 def TestPsoundAxisVSdiffL(difL):
     CalTrans(Rmax,difL,N)
-    for i in np.arange(0,N):
-        for j in np.arange(0,len(xita)):
-            Psound_axis[i][j] = AxisSoundPower(F,Rin[i],Rout[i],delay[0]-delay[i])   
+    Psound_axis[:] = axis_sound_power_grid(dis, Rin, Rout, delay[0], delay, f0=f0, c0=c0, u=u, p=p)[:, :, 0]
     ret = np.absolute(np.sum(Psound_axis,axis=0))
     return ret
 
@@ -217,18 +208,9 @@ from mpl_toolkits.mplot3d import Axes3D
 dis = np.arange(-lamd*10, lamd*10, lamd/10)  # 这里 M 是你需要定义的一个整数
 xita = np.arange(-np.pi / 4, np.pi / 4, np.pi / 1000)
 
-# 初始化 Psound 数组，形状为 (M, len(xita))
-Psound = np.zeros([N,len(dis), len(xita)], dtype=complex)
-Psound_sum = np.zeros([len(dis), len(xita)], dtype=complex)
-# 假设 SoundPower 函数可以接受 dis 作为参数
-for index in np.arange(N):
-    for i in range(len(dis)):
-        for j in range(len(xita)):
-            Psound[index][i][j] = SoundPower(dis[i], Rin[index], Rout[index], xita[j], delay[0]-delay[index])
-
-for i in range(len(dis)):
-        for j in range(len(xita)):
-            Psound_sum[i][j] = np.sum(Psound[:,i,j])
+# 一次性计算所有圆环在 (dis, xita) 网格上的声压，形状为 (N, len(dis), len(xita))
+Psound = sound_power_grid(dis, xita, Rin, Rout, delay[0], delay, f0=f0, c0=c0, u=u, p=p)[..., 0]
+Psound_sum = np.sum(Psound, axis=0)
 
 # 取 Psound 的绝对值
 Psound_abs = np.absolute(Psound_sum)
@@ -0,0 +1,262 @@
+# 六环换能器远场声压的向量化计算引擎
+# six-ring-math.py 中 SoundPower/Jf/AxisSoundPower 的数组版本，
+# 一次调用即可得到 (圆环, 距离, 角度, 时间) 全网格上的复声压张量。
+import math
+import time
+
+import numpy as np
+from scipy.special import j1
+
+# 计算核版本号，修改任何会改变计算结果的代码时加 1，使 result_cache 中的旧结果失效
+KERNEL_VERSION = 1
+
+# 默认物理参数，与 six-ring-math.py 保持一致
+F0 = 4e6        # 频率 (Hz)
+C0 = 1500.0     # 声速 (m/s)
+U = 1.0e3       # 质点速度
+P = 1.0e3       # 声压
+
+
+def jinc(x):
+    """
+    计算指向性函数 2*J1(x)/x，x=0 处按极限值 1 处理。
+
+    参数:
+    x (array_like): 自变量 k*a*sin(θ)。
+
+    返回:
+    ndarray: 与 x 同形状的指向性值。
+    """
+    x = np.asarray(x, dtype=float)
+    zero = x == 0
+    # 用掩码代替分支：先把零点替换成 1 避免除零，再写回极限值
+    safe = np.where(zero, 1.0, x)
+    return np.where(zero, 1.0, 2 * j1(safe) / safe)
+
+
+class JincTable:
+    """
+    2*J1(x)/x 的查表实现，在均匀网格上线性插值。
+
+    线性插值误差不超过 h²/8*max|f''|，而 |f''| <= 1/4，
+    因此取步长 h = sqrt(32*tol) 即可保证误差不超过 tol。
+    超出表范围的点退回直接调用 j1。
+    """
+
+    def __init__(self, x_max, tol=1e-6):
+        """
+        参数:
+        x_max (float): 表覆盖的最大自变量，通常取 k*a_max。
+        tol (float): 允许的最大绝对误差。
+        """
+        self.tol = tol
+        self.step = math.sqrt(32 * tol)
+        n = int(math.ceil(x_max / self.step)) + 2
+        self.x_max = (n - 2) * self.step
+        self.table = jinc(np.arange(n) * self.step)
+
+    @classmethod
+    def for_aperture(cls, k, a_max, tol=1e-6):
+        """按波数和最大半径生成覆盖 k*a_max 的表"""
+        return cls(k * a_max, tol)
+
+    def __call__(self, x):
+        x = np.abs(np.asarray(x, dtype=float))
+        inside = x <= self.x_max
+        pos = np.where(inside, x, 0.0) / self.step
+        i = pos.astype(np.intp)
+        frac = pos - i
+        y0 = self.table[i]
+        ret = y0 + frac * (self.table[i + 1] - y0)
+        if not np.all(inside):
+            ret = np.where(inside, ret, jinc(np.where(inside, 1.0, x)))
+        return ret
+
+
+def check_jinc_table(table, n=1_000_000, seed=0):
+    """
+    在随机点上比较查表与直接调用 j1 的误差和耗时。
+
+    参数:
+    table (JincTable): 待检查的表。
+    n (int): 采样点数。
+    seed (int): 随机数种子。
+
+    返回:
+    dict: max_error、tol、exact_time、table_time (秒)。
+    """
+    x = np.random.default_rng(seed).uniform(-table.x_max, table.x_max, n)
+    start = time.perf_counter()
+    exact = jinc(x)
+    exact_time = time.perf_counter() - start
+    start = time.perf_counter()
+    approx = table(x)
+    table_time = time.perf_counter() - start
+    return {
+        'max_error': float(np.max(np.abs(approx - exact))),
+        'tol': table.tol,
+        'exact_time': exact_time,
+        'table_time': table_time,
+    }
+
+
+def Jf(a, xita, k):
+    """
+    圆盘活塞的指向性因子，等价于 six-ring-math.py 中的 Jf，
+    sin(θ)=0 或 a=0 时取极限值。
+
+    参数:
+    a (array_like): 圆盘半径。
+    xita (array_like): 角度。
+    k (float): 波数。
+
+    返回:
+    ndarray: 广播后的指向性因子。
+    """
+    return jinc(k * np.asarray(a) * np.sin(xita))
+
+
+def CalTrans(Rmax, difL, N, F, c0=C0):
+    """
+    按等面积规则计算各圆环的内外半径和聚焦延时，
+    与 six-ring-math.py 中的 CalTrans 相同，但不依赖全局数组。
+
+    参数:
+    Rmax (float): 最大半径。
+    difL (float): 圆环间距。
+    N (int): 圆环个数。
+    F (float): 焦距。
+    c0 (float): 声速。
+
+    返回:
+    tuple: (Rin, Rout, wc, Rc, delay)，均为长度为 N 的数组。
+    """
+    maxArea = math.pi * (Rmax ** 2)
+    avgArea = (maxArea - (N - 1) * 2 * math.pi * Rmax / 2 * difL) / N
+
+    Rin = np.zeros(N)
+    Rout = np.zeros(N)
+    Rin[0] = 1e-9
+    Rout[0] = math.sqrt(avgArea / math.pi)
+    for i in range(1, N):
+        Rin[i] = Rout[i - 1] + difL
+        Rout[i] = math.sqrt(Rin[i] ** 2 + Rout[0] ** 2)
+
+    wc = Rout - Rin
+    Rc = (Rout + Rin) / 2
+    delay = (np.sqrt(Rc ** 2 + F ** 2) - np.sqrt(Rc[0] ** 2 + F ** 2)) / c0
+    return Rin, Rout, wc, Rc, delay
+
+
+def sound_power_grid(r, xita, Rin, Rout, t=0.0, delay=None, f0=F0, c0=C0, u=U, p=P, jinc=jinc,
+                     attenuation=None):
+    """
+    在 (圆环, 距离, 角度, 时间) 网格上一次性计算各圆环的复声压。
+
+    结果满足 ret[n, i, j, l] == SoundPower(r[i], Rin[n], Rout[n], xita[j], t[l] - delay[n])。
+
+    参数:
+    r (array_like): 距离，一维。
+    xita (array_like): 角度，一维，范围 -π/2 到 π/2。
+    Rin (array_like): 各圆环内半径，长度 N。
+    Rout (array_like): 各圆环外半径，长度 N。
+    t (array_like): 时间，一维，默认 0。
+    delay (array_like): 各圆环的延时，长度 N，默认全 0。
+    f0, c0, u, p (float): 频率、声速、质点速度和声压。
+    jinc (callable): 指向性函数 2*J1(x)/x 的实现，默认直接调用 j1。
+    attenuation (callable): 衰减因子 attenuation(r, xita, f0)，例如 attenuation.LayeredMedium，
+        默认不计衰减。
+
+    返回:
+    ndarray: 形状为 (N, len(r), len(xita), len(t)) 的复数数组。
+    """
+    Rin = np.atleast_1d(np.asarray(Rin, dtype=float))
+    Rout = np.atleast_1d(np.asarray(Rout, dtype=float))
+    assert np.all(Rin <= Rout), "内半径不能大于外半径"
+    xita = np.atleast_1d(np.asarray(xita, dtype=float))
+    assert np.all(np.abs(xita) <= np.pi / 2), "角度必须在 -π/2 到 π/2 之间"
+    r = np.atleast_1d(np.asarray(r, dtype=float))
+    t = np.atleast_1d(np.asarray(t, dtype=float))
+    if delay is None:
+        delay = np.zeros_like(Rin)
+    delay = np.atleast_1d(np.asarray(delay, dtype=float))
+
+    w = 2 * math.pi * f0
+    k = w / c0
+
+    # 圆环轴 (N,1,1,1)，距离轴 (1,R,1,1)，角度轴 (1,1,X,1)，时间轴 (1,1,1,T)
+    Rin = Rin[:, None, None, None]
+    Rout = Rout[:, None, None, None]
+    sin_x = np.sin(xita)[None, None, :, None]
+    # 指向性只与圆环和角度有关，先在 (N,1,X,1) 上算好再广播
+    t2 = Rout ** 2 * jinc(k * Rout * sin_x)
+    t3 = Rin ** 2 * jinc(k * Rin * sin_x)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t1 = w * p * u / r[None, :, None, None]
+    if attenuation is not None:
+        # 衰减只与距离和角度有关，在 (1,R,X,1) 上算一次
+        t1 = t1 * attenuation(r[:, None], xita[None, :], f0)[None, :, :, None]
+    tt = t[None, None, None, :] - delay[:, None, None, None]
+    t4 = np.exp(1j * (w * tt - k * r[None, :, None, None]))
+    return t1 * (t2 - t3) * t4
+
+
+def sound_power_sum(r, xita, Rin, Rout, t=0.0, delay=None, **kwargs):
+    """
+    计算所有圆环叠加后的复声压，参数同 sound_power_grid。
+
+    返回:
+    ndarray: 形状为 (len(r), len(xita), len(t)) 的复数数组。
+    """
+    return sound_power_grid(r, xita, Rin, Rout, t, delay, **kwargs).sum(axis=0)
+
+
+def axis_sound_power_grid(r, Rin, Rout, t=0.0, delay=None, f0=F0, c0=C0, u=U, p=P, attenuation=None):
+    """
+    轴线上各圆环的复声压，AxisSoundPower 的数组版本。
+
+    结果满足 ret[n, i, l] == AxisSoundPower(r[i], Rin[n], Rout[n], t[l] - delay[n])。
+
+    参数:
+    r (array_like): 轴向距离，一维。
+    Rin (array_like): 各圆环内半径，长度 N。
+    Rout (array_like): 各圆环外半径，长度 N。
+    t (array_like): 时间，一维，默认 0。
+    delay (array_like): 各圆环的延时，长度 N，默认全 0。
+    f0, c0, u, p (float): 频率、声速、质点速度和声压。
+    attenuation (callable): 衰减因子 attenuation(r, xita, f0)，分别作用于
+        从内外边缘到场点的两条路径，默认不计衰减。
+
+    返回:
+    ndarray: 形状为 (N, len(r), len(t)) 的复数数组。
+    """
+    Rin = np.atleast_1d(np.asarray(Rin, dtype=float))[:, None, None]
+    Rout = np.atleast_1d(np.asarray(Rout, dtype=float))[:, None, None]
+    r = np.atleast_1d(np.asarray(r, dtype=float))[None, :, None]
+    t = np.atleast_1d(np.asarray(t, dtype=float))
+    if delay is None:
+        delay = np.zeros(Rin.shape[0])
+    delay = np.atleast_1d(np.asarray(delay, dtype=float))
+
+    w = 2 * math.pi * f0
+    k = w / c0
+
+    R1 = np.sqrt(Rout ** 2 + r ** 2)
+    R2 = np.sqrt(Rin ** 2 + r ** 2)
+    t1 = p * c0 * u
+    t4 = np.exp(1j * w * (t[None, None, :] - delay[:, None, None]))
+    e1 = np.exp(-1j * k * R1)
+    e2 = np.exp(-1j * k * R2)
+    if attenuation is not None:
+        e1 = e1 * attenuation(R1, np.arctan2(Rout, r), f0)
+        e2 = e2 * attenuation(R2, np.arctan2(Rin, r), f0)
+    return t1 * (e1 - e2) * t4
+
+
+if __name__ == '__main__':
+    # 查表指向性函数的精度和速度，误差上限的检查见 tests/test_sound_field.py
+    k = 2 * math.pi * F0 / C0
+    for tol in (1e-4, 1e-6, 1e-8):
+        result = check_jinc_table(JincTable.for_aperture(k, 25e-3, tol))
+        print(f"tol={tol:.0e} 最大误差={result['max_error']:.2e} "
+              f"j1: {result['exact_time'] * 1e3:.1f} ms 查表: {result['table_time'] * 1e3:.1f} ms")
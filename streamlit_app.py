@@ -13,7 +13,9 @@ pages = {
     "Smith Chart": "smithmatch.py",
     "Snubber": "snubber.py",
     "Unit Calc": "unitCal.py",
-    "TO DO OR NOT TO DO": "DOORNOTTODO.py"
+    "TO DO OR NOT TO DO": "DOORNOTTODO.py",
+    "Annular Catalog": "catalog_browser.py",
+    "Annular Designer": "annular_designer.py"
 }
 
 # 初始化会话状态 - 默认为None（空白页）
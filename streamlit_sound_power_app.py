@@ -5,6 +5,7 @@ import math
 import cmath
 from scipy import integrate
 from scipy.special import jv, yv, j1
+import sound_field
 
 # Define the app title and description
 st.title("My Streamlit App")
@@ -39,22 +40,19 @@ a = st.number_input("Enter the value of a", value=10e-3)
 
 
 def Jf(a, xita):
-    tmp = 2 * j1(k * a * math.sin(xita))
-    ret = tmp / (k * a * math.sin(xita))
-    return ret
+    # 使用向量化的指向性函数，sin(θ)=0 处取极限值
+    return sound_field.Jf(a, xita, k)
 
 
 def SoundPower(r, a, xita, t):
     t1 = w * p * u * (a ** 2) / (2 * r)
     t2 = Jf(a, xita)
-    t3 = cmath.exp(complex(0, 1) * (w * t - k * r))
+    t3 = np.exp(1j * (w * t - k * r))
     return np.absolute(t1 * t2 * t3)
 
 
 xita = np.arange(-np.pi / 2, np.pi / 2, 0.01)
-y = np.zeros(len(xita))
-for i in np.arange(0, len(xita)):
-    y[i] = SoundPower(r, a, xita[i], c0 / f0)
+y = SoundPower(r, a, xita, c0 / f0)
 
 x = xita
 fig1, ax1 = plt.subplots()
@@ -72,9 +70,7 @@ def Direction(a, angle):
 
 t = 3
 angle = np.arange(-np.pi / 2, np.pi / 2, 0.01)
-y = np.zeros(len(angle))
-for i in np.arange(0, len(angle)):
-    y[i] = Jf(t / k, angle[i])
+y = Jf(t / k, angle)
 
 x = angle
 fig2, ax2 = plt.subplots()
@@ -0,0 +1,8 @@
+from annular_bench import ACCURACY_TOL, check_accuracy
+
+
+def test_vectorized_matches_original_scalar_code():
+    errors = check_accuracy(n=32)
+    assert set(errors) == {'sound_power_grid', 'axis_sound_power_grid', 'annular_array_pressure', 'total_pressure'}
+    for name, error in errors.items():
+        assert error <= ACCURACY_TOL, name
@@ -0,0 +1,28 @@
+import csv
+import json
+
+import annular_cli
+
+
+def _sweep_job(tmp_path, fmt):
+    job_path = tmp_path / 'sweep.json'
+    job_path.write_text(json.dumps({'kind': 'sweep', 'axes': {'m': [4, 5]}, 'theta': [-1.5, 1.5, 200],
+                                    'metrics': ['psl_db']}))
+    out_path = str(tmp_path / f'sweep.{fmt}')
+    assert annular_cli.main([str(job_path), '-o', out_path]) == 0
+    return out_path
+
+
+def test_sweep_csv_keeps_selected_metrics(tmp_path):
+    out_path = _sweep_job(tmp_path, 'csv')
+    with open(out_path, newline='') as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == 2
+    assert 'psl_db' in rows[0] and 'isr_db' not in rows[0] and 'ratio' not in rows[0]
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['sweep.csv', 'sweep.json']
+
+
+def test_sweep_npz_matches_csv_columns(tmp_path):
+    import numpy as np
+    with np.load(_sweep_job(tmp_path, 'npz')) as data:
+        assert 'psl_db' in data.files and 'isr_db' not in data.files
@@ -0,0 +1,27 @@
+import numpy as np
+import pytest
+
+import annular_jit
+from annular_array import AnnularArray, Medium, annular_array_pressure
+from sound_field import jinc
+
+
+def test_rational_jinc_within_tol():
+    # 未安装 numba 时 _jinc_scalar 为普通 Python 函数；覆盖有理逼近在 x=8 处的分段点
+    x = np.concatenate([np.linspace(0, 300, 30001), [8 - 1e-9, 8.0, 8 + 1e-9]])
+    approx = np.array([annular_jit._jinc_scalar(value) for value in x])
+    assert np.max(np.abs(approx - jinc(x))) <= annular_jit.JIT_TOL
+
+
+def test_numba_engine_matches_numpy():
+    pytest.importorskip('numba')
+    medium = Medium()
+    arrays = [AnnularArray.equal_area(7e-3, m, 0.6 * medium.lambda_, F) for m, F in ((4, 8e-3), (6, 10e-3))]
+    # (B, m) 的批量几何，检查计算核的展平和还原
+    six = arrays[1]
+    batch = AnnularArray(np.stack([six.a1, six.a1 * 0.9]), np.stack([six.a2, six.a2 * 0.9]), F=six.F)
+    theta = np.linspace(-np.pi / 2, np.pi / 2, 2001)
+    for array in arrays + [batch]:
+        expected = annular_array_pressure(array, medium, array.F, theta, engine='numpy')
+        actual = annular_array_pressure(array, medium, array.F, theta, engine='numba')
+        assert np.max(np.abs(actual - expected)) / np.max(np.abs(expected)) <= annular_jit.JIT_TOL
@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from annular_array import calculate_annular_radii
+from annular_optimizer import (PLATEAU_THRESHOLD, RADIUS_RESOLUTION, GeometryObjective, check_kerf_range,
+                               optimize_ring_count)
+
+R_MAX, F = 7e-3, 10e-3
+KERF_RANGE = (1e-4, 3e-4)
+THETA = np.linspace(-np.pi / 2, np.pi / 2, 400)
+
+
+class _ConstantObjective:
+    """返回固定旁瓣电平的评价函数"""
+
+    def __init__(self, value):
+        self.value = value
+        self.evaluations = 0
+        self.cache_hits = 0
+
+    def __call__(self, a1, a2):
+        return np.full(a1.shape[0], self.value), a1, a2
+
+
+def test_search_improves_on_start_within_bounds():
+    m = 4
+    a1, a2 = calculate_annular_radii(R_MAX, m, sum(KERF_RANGE) / 2)
+    start_psl = GeometryObjective(F, theta=THETA)(a1[None], a2[None])[0][0]
+
+    result = optimize_ring_count(m, R_MAX, F, KERF_RANGE, GeometryObjective(F, theta=THETA),
+                                 population=16, max_iterations=15, seed=0)
+    assert result.psl_db < start_psl
+    assert np.all(np.diff(result.history) <= 0)
+    assert KERF_RANGE[0] <= result.kerf <= KERF_RANGE[1]
+    array = result.array
+    assert array.a1[0] >= 0
+    assert np.all(array.a2 > array.a1)
+    assert array.a2[-1] == pytest.approx(R_MAX, abs=RADIUS_RESOLUTION)
+    np.testing.assert_allclose(array.a1[1:] - array.a2[:-1], result.kerf, atol=2 * RADIUS_RESOLUTION)
+
+
+def test_objective_reuses_quantized_geometry():
+    objective = GeometryObjective(F, theta=THETA)
+    a1, a2 = calculate_annular_radii(R_MAX, 3, 2e-4)
+    # 相差不到半个量化步长的几何视为同一个
+    psl, _, _ = objective(np.stack([a1, a1 + 0.2 * RADIUS_RESOLUTION]), np.stack([a2, a2]))
+    assert objective.evaluations == 1 and objective.cache_hits == 0
+    assert psl[0] == psl[1]
+    objective(a1[None], a2[None])
+    assert objective.evaluations == 1 and objective.cache_hits == 1
+
+
+def test_plateau_stops_early():
+    result = optimize_ring_count(3, R_MAX, F, KERF_RANGE, _ConstantObjective(-20.0),
+                                 population=8, max_iterations=100, seed=0)
+    assert len(result.history) == PLATEAU_THRESHOLD + 1
+    assert result.psl_db == -20.0
+
+
+def test_infeasible_kerf_range():
+    with pytest.raises(ValueError):
+        check_kerf_range(8, R_MAX, (1e-4, 1e-3))
+    with pytest.raises(ValueError):
+        optimize_ring_count(8, R_MAX, F, (1e-4, 1e-3))
+    with pytest.raises(ValueError):
+        check_kerf_range(3, R_MAX, (3e-4, 1e-4))
+
+
+def test_no_finite_candidate():
+    with pytest.raises(RuntimeError):
+        optimize_ring_count(3, R_MAX, F, KERF_RANGE, _ConstantObjective(np.nan),
+                            population=8, max_iterations=20, seed=0)
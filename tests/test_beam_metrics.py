@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from beam_metrics import beam_metrics, mainlobe_width
+
+# 21 个采样点，x = -10..10，网格中点 x=0 为正前方
+X = np.arange(-10, 11)
+DB3 = 10 ** (-3 / 20)
+DB6 = 10 ** (-6 / 20)
+
+
+def _symmetric(half):
+    """由 x = 0..10 的取值生成对称的波束图"""
+    half = np.asarray(half, dtype=float)
+    return np.r_[half[:0:-1], half]
+
+
+# 三角形主瓣 (x = ±5 处为零点) 加 0.25 的三角形旁瓣
+SINGLE = _symmetric([1.0, 0.8, 0.6, 0.4, 0.2, 0.0, 0.125, 0.25, 0.125, 0.0, 0.0])
+# 正前方为 0.8 的主瓣，x = ±4 处为更高的对称双峰
+TWIN = _symmetric([0.8, 0.6, 0.45, 0.7, 1.0, 0.5, 0.1, 0.1, 0.1, 0.1, 0.1])
+# 顶部平台 (x = -1..1) 和肩部平台 (x = ±2, ±3)，零点在 x = ±5
+PLATEAU = _symmetric([1.0, 1.0, 0.6, 0.6, 0.3, 0.0, 0.2, 0.0, 0.0, 0.0, 0.0])
+
+
+def test_single_peak():
+    metrics = beam_metrics(SINGLE)
+    assert metrics['peak_index'][0] == 10
+    # 线性下降段 1 - |x|/5 上的交点
+    assert metrics['mainlobe_width_3db'][0] == pytest.approx(10 * (1 - DB3))
+    assert metrics['mainlobe_width_6db'][0] == pytest.approx(10 * (1 - DB6))
+    assert metrics['psl_db'][0] == pytest.approx(20 * np.log10(0.25))
+    side = 2 * (0.125 ** 2 * 2 + 0.25 ** 2)
+    main = 1 + 2 * (0.8 ** 2 + 0.6 ** 2 + 0.4 ** 2 + 0.2 ** 2)
+    assert metrics['isr_db'][0] == pytest.approx(10 * np.log10(side / main))
+
+
+def test_twin_peaks_are_sidelobes_of_the_broadside_lobe():
+    metrics = beam_metrics(TWIN)
+    assert metrics['peak_index'][0] == 10
+    assert metrics['peak'][0] == 0.8
+    # 双峰高于主瓣，PSL 为正
+    assert metrics['psl_db'][0] == pytest.approx(20 * np.log10(1 / 0.8))
+    # -3 dB 交点在 x=1 (0.6) 与 x=2 (0.45) 之间
+    assert metrics['mainlobe_width_3db'][0] == pytest.approx(2 * (1 + (0.6 - 0.8 * DB3) / 0.15))
+    # 主瓣在零点 (0.45) 之前降不到 -6 dB (0.401)，宽度止于零点
+    assert metrics['mainlobe_width_6db'][0] == pytest.approx(4.0)
+
+
+def test_plateaus_are_not_nulls():
+    metrics = beam_metrics(PLATEAU)
+    assert abs(X[metrics['peak_index'][0]]) <= 1
+    assert metrics['psl_db'][0] == pytest.approx(20 * np.log10(0.2))
+    assert metrics['mainlobe_width_3db'][0] == pytest.approx(2 * (1 + (1 - DB3) / 0.4))
+    # -6 dB 交点越过肩部平台，在 x=3 (0.6) 与 x=4 (0.3) 之间
+    assert metrics['mainlobe_width_6db'][0] == pytest.approx(2 * (3 + (0.6 - DB6) / 0.3))
+
+
+def test_batch_and_theta_scaling():
+    patterns = np.stack([SINGLE, TWIN, PLATEAU])
+    theta = X * 0.01
+    batch = beam_metrics(patterns, theta)
+    for i, pattern in enumerate(patterns):
+        single = beam_metrics(pattern)
+        assert batch['psl_db'][i] == pytest.approx(single['psl_db'][0])
+        assert batch['mainlobe_width_6db'][i] == pytest.approx(0.01 * single['mainlobe_width_6db'][0])
+    np.testing.assert_allclose(mainlobe_width(patterns, -3, theta), batch['mainlobe_width_3db'])
+
+
+def test_truncated_mainlobe_width_is_nan():
+    # 单调曲线：主瓣一直延伸到网格端点
+    assert np.isnan(mainlobe_width(np.linspace(1, 0.9, 21), -6)[0])
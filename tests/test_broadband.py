@@ -0,0 +1,29 @@
+import numpy as np
+
+from annular_array import AnnularArray, Medium
+from beam_metrics import METRICS
+from broadband import broadband_metrics, frequency_vector
+
+THETA = np.linspace(-np.pi / 2, np.pi / 2, 300)
+
+
+def test_metrics_keep_batch_axes():
+    medium = Medium()
+    freqs = frequency_vector(medium.f, n=5)
+    designs = [[AnnularArray.equal_area(R_max, 4, kerf, 10e-3) for R_max in (6e-3, 7e-3, 8e-3)]
+               for kerf in (1e-4, 2e-4)]
+    a1 = np.stack([[array.a1 for array in row] for row in designs])
+    a2 = np.stack([[array.a2 for array in row] for row in designs])
+    batch = broadband_metrics(AnnularArray(a1, a2, F=10e-3), medium, freqs, THETA)
+
+    assert batch['per_frequency']['psl_db'].shape == (5, 2, 3)
+    for name in METRICS:
+        assert batch['broadband'][name].shape == (2, 3)
+        assert batch['weighted'][name].shape == (2, 3)
+    for i, row in enumerate(designs):
+        for j, array in enumerate(row):
+            single = broadband_metrics(array, medium, freqs, THETA)
+            for name in METRICS:
+                np.testing.assert_allclose(batch['broadband'][name][i, j], single['broadband'][name])
+                np.testing.assert_allclose(batch['weighted'][name][i, j], single['weighted'][name])
+                np.testing.assert_allclose(batch['per_frequency'][name][:, i, j], single['per_frequency'][name])
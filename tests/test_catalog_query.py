@@ -0,0 +1,62 @@
+import numpy as np
+
+from annular_array import AnnularArray, Medium
+from catalog_query import INDEX_SUFFIX, CatalogIndex
+from design_catalog import CatalogWriter, design_columns
+
+
+def _write_catalog(path):
+    with CatalogWriter(path) as writer:
+        for i, delta_d in enumerate((1e-4, 2e-4, 3e-4)):
+            array = AnnularArray.equal_area(7e-3, 4, delta_d, 10e-3)
+            writer.append(design_columns(i, array, design={'delta_d': delta_d}))
+        # 间距未知 (NaN) 的设计
+        writer.append(design_columns(3, AnnularArray.equal_area(6e-3, 3, 2e-4, 10e-3)))
+
+
+def test_range_query_skips_nan(tmp_path):
+    path = str(tmp_path / 'catalog.csv')
+    _write_catalog(path)
+    index = CatalogIndex.open(path)
+    assert list(index.query(delta_d=(1.5e-4, None), order_by=None)['design']) == [1, 2]
+    assert list(index.query(delta_d=(None, None), order_by=None)['design']) == [0, 1, 2]
+    assert len(index.query(outer_radius=(None, None))['design']) == 4
+
+
+def test_index_file_round_trip(tmp_path):
+    path = str(tmp_path / 'catalog.csv')
+    _write_catalog(path)
+    index = CatalogIndex.open(path)
+    assert index.fill_metrics() == 4
+    index.save(path + INDEX_SUFFIX)
+
+    reopened = CatalogIndex.open(path)
+    np.testing.assert_array_equal(reopened.designs['psl_db'], index.designs['psl_db'])
+    for name, (values, order) in index._sorted.items():
+        np.testing.assert_array_equal(reopened._sorted[name][0], values)
+        np.testing.assert_array_equal(reopened._sorted[name][1], order)
+    np.testing.assert_array_equal(reopened.array_of(2).a2, index.array_of(2).a2)
+
+
+def test_old_index_format_is_rebuilt(tmp_path):
+    path = str(tmp_path / 'catalog.csv')
+    _write_catalog(path)
+    index = CatalogIndex.open(path)
+    # 旧版本的索引文件只有逐环目录
+    np.savez(path + INDEX_SUFFIX, **index.rings)
+    assert len(CatalogIndex.open(path)) == 4
+    assert CatalogIndex.load(path + INDEX_SUFFIX) is not None
+
+
+def test_fill_metrics_follows_medium(tmp_path):
+    path = str(tmp_path / 'catalog.csv')
+    _write_catalog(path)
+    index = CatalogIndex.open(path)
+    assert index.fill_metrics(Medium(f=3e6)) == 4
+    index.save(path + INDEX_SUFFIX)
+
+    reopened = CatalogIndex.open(path)
+    assert reopened.fill_metrics(Medium(f=3e6)) == 0
+    # 换用其他介质时，补算过的设计重新计算
+    assert reopened.fill_metrics(Medium(f=5e6)) == 4
+    assert not np.allclose(reopened.designs['mainlobe_width_6db'], index.designs['mainlobe_width_6db'], equal_nan=True)
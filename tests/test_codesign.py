@@ -0,0 +1,31 @@
+import numpy as np
+
+from annular_array import AnnularArray, Medium
+from codesign import codesign, electrical_metrics
+from ring_impedance import PZT, calculate_tau, quarter_wave_thickness, resonance_frequencies
+
+ARRAY = AnnularArray.equal_area(7e-3, 6, 0.6 * 1500 / 4e6, 10e-3)
+
+
+def test_single_design_is_promoted_to_batch():
+    single = codesign(ARRAY)
+    batch = codesign(AnnularArray(ARRAY.a1[None], ARRAY.a2[None], F=ARRAY.F))
+    assert single['score'].shape == (1,) and single['impedance'].shape == (1, ARRAY.m)
+    for name, values in batch.items():
+        np.testing.assert_array_equal(single[name], values)
+
+
+def test_default_thickness_follows_drive_frequency():
+    medium = Medium(f=3e6)
+    default = electrical_metrics(ARRAY, medium)
+    explicit = electrical_metrics(ARRAY, medium, thickness=quarter_wave_thickness(PZT, medium.f))
+    np.testing.assert_array_equal(default['impedance'], explicit['impedance'])
+    np.testing.assert_array_equal(default['fr_mean'], explicit['fr_mean'])
+
+
+def test_precomputed_tau_matches_recomputed():
+    fr, _, _ = resonance_frequencies(ARRAY.a1, ARRAY.a2)
+    fr_tau, _, _ = resonance_frequencies(ARRAY.a1, ARRAY.a2, tau=np.full(ARRAY.m, 0.9))
+    assert not np.allclose(fr, fr_tau)
+    tau = calculate_tau(ARRAY.a1, ARRAY.a2)
+    np.testing.assert_array_equal(resonance_frequencies(ARRAY.a1, ARRAY.a2, tau=tau)[0], fr)
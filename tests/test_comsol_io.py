@@ -0,0 +1,79 @@
+import os
+
+import numpy as np
+import pytest
+
+from comsol_io import EXPRESSION_NAMES, comsol_model, evaluate, read_mphtxt, read_parameters
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_evaluate_arithmetic():
+    assert evaluate('-2^2'.replace('^', '**')) == -4
+    assert evaluate('sqrt(F**2 + 3**2)', {**EXPRESSION_NAMES, 'F': 4.0}) == 5.0
+    assert evaluate('rn(1, 3) / 2', EXPRESSION_NAMES) == 1.0
+
+
+@pytest.mark.parametrize('expr', ['__import__("os").system("true")', '(1).real', 'x.y', '[1][0]', 'lambda: 1',
+                                  'x(1)', '1 if x else 2', 'sqrt(x=1)'])
+def test_evaluate_rejects_code(expr):
+    with pytest.raises((ValueError, NameError)):
+        evaluate(expr, {**EXPRESSION_NAMES, 'x': 1.0})
+
+
+def test_evaluate_unknown_name():
+    with pytest.raises(NameError):
+        evaluate('undefined + 1')
+
+
+@pytest.mark.parametrize('expr', ['10.0**400', '1/0', 'log(0)', 'sqrt(-1)', 'exp(1000)'])
+def test_evaluate_arithmetic_error(expr):
+    with pytest.raises(ValueError, match='无法计算'):
+        evaluate(expr, EXPRESSION_NAMES)
+
+
+def test_parameter_error_names_parameter(tmp_path):
+    path = tmp_path / 'params.md'
+    path.write_text('a 2[mm] "ok"\nbad a/(a-2[mm]) "divides by zero"\n', encoding='utf-8')
+    with pytest.raises(ValueError, match='bad'):
+        read_parameters(str(path))
+
+
+def test_parameters_match_geometry():
+    params = read_parameters(os.path.join(ROOT, 'model-area.md'))
+    assert params['f0'] == 4e6 and params['F'] == pytest.approx(11e-3)
+    from_params, _, _ = comsol_model(os.path.join(ROOT, 'model-area.md'))
+    from_geometry, _, _ = comsol_model(os.path.join(ROOT, 'model-area.md'), os.path.join(ROOT, 'ring.mphtxt'))
+    np.testing.assert_allclose(from_geometry.a1, from_params.a1, atol=1e-12)
+    np.testing.assert_allclose(from_geometry.a2, from_params.a2, atol=1e-12)
+
+
+def test_read_mphtxt_empty_block(tmp_path):
+    path = tmp_path / 'mesh.mphtxt'
+    path.write_text('\n'.join([
+        '2 # sdim',
+        '2 # number of mesh vertices',
+        '# Mesh vertex coordinates',
+        '0 0',
+        '1 0',
+        '3 tri # type name',
+        '0 # number of elements',
+        '# Elements',
+        '2 # number of geometric entity indices',
+        '# Geometric entity indices',
+        '1',
+        '2',
+        '',
+        '2 edg # type name',
+        '1 # number of elements',
+        '# Elements',
+        '0 1',
+        '0 # number of geometric entity indices',
+        '# Geometric entity indices',
+    ]) + '\n')
+    data = read_mphtxt(str(path))
+    np.testing.assert_array_equal(data['mesh_vertices'], [[0, 0], [1, 0]])
+    assert data['elements']['tri'].size == 0
+    np.testing.assert_array_equal(data['entities']['tri'], [1, 2])
+    np.testing.assert_array_equal(data['elements']['edg'], [[0, 1]])
+    assert data['entities']['edg'].size == 0
@@ -0,0 +1,19 @@
+import numpy as np
+
+from annular_array import AnnularArray
+from design_catalog import convert_legacy_csv, read_catalog
+
+
+def test_convert_legacy_csv_infers_delta_d(tmp_path):
+    array = AnnularArray.equal_area(7e-3, 4, 2e-4, 10e-3)
+    legacy = tmp_path / 'legacy.csv'
+    rows = ['m值,环编号,内径 (mm),外径 (mm)']
+    rows += [f'4,{n + 1},{a1 * 1e3:.6f},{a2 * 1e3:.6f}' for n, (a1, a2) in enumerate(zip(array.a1, array.a2))]
+    rows += ['1,1,0.000000,3.000000']
+    legacy.write_text('\n'.join(rows) + '\n', encoding='utf-8')
+
+    assert convert_legacy_csv(str(legacy), str(tmp_path / 'catalog.csv')) == 2
+    catalog = read_catalog(str(tmp_path / 'catalog.csv'))
+    delta_d = catalog['delta_d'][catalog['design'] == 0]
+    np.testing.assert_allclose(delta_d, 2e-4, atol=1e-9)
+    assert np.all(np.isnan(catalog['delta_d'][catalog['design'] == 1]))
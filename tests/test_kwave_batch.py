@@ -0,0 +1,92 @@
+import os
+
+import numpy as np
+import pytest
+
+from annular_array import AnnularArray, Medium, annular_array_pressure_axis
+from kwave_batch import load_result, reduce_job, solver_command, source_elements
+
+
+def test_flat_source_elements_reproduce_exact_axis():
+    # 圆盘活塞轴线声压 p0·(e^{-jkz} - e^{-jk·sqrt(z²+a²)})，按 source_elements 的幅值和相位叠加
+    medium = Medium()
+    z = np.linspace(1e-3, 30e-3, 500)
+    for array in (AnnularArray.equal_area(7e-3, 6, 0.6 * medium.lambda_, 10e-3),
+                  AnnularArray(np.array([1e-3, 3e-3]), np.array([2.5e-3, 5e-3]), F=8e-3)):
+        elements, amp, phase = source_elements(array, medium)
+        total = sum(p * np.exp(1j * phi) * (np.exp(-1j * medium.k * z) -
+                                            np.exp(-1j * medium.k * np.sqrt(z ** 2 + (d / 2) ** 2)))
+                    for (_, d), p, phi in zip(elements, amp, phase))
+        exact = annular_array_pressure_axis(array, medium, z)
+        assert np.max(np.abs(total - exact)) / np.max(np.abs(exact)) < 1e-12
+
+
+def test_reduce_job_recovers_cw_amplitude_and_phase(tmp_path):
+    h5py = pytest.importorskip('h5py')
+    pytest.importorskip('kwave')
+    from kwave.utils.signals import create_cw_signals
+
+    medium = Medium()
+    p0 = medium.rho0 * medium.c * medium.u
+    shape = (3, 4)
+    n_sensor = shape[0] * shape[1]
+    ppp = 16                                   # 每周期点数，记录一个完整周期
+    dt = 1 / (medium.f * ppp)
+    amp = p0 * (1 + np.arange(n_sensor) / 10)
+    phase = np.linspace(-3, 3, n_sensor)
+    # 与 build_job 相同的连续波信号 (开头 4 个周期为渐升段)，只记录稳态的最后一个周期
+    t = dt * np.arange(6 * ppp)
+    signals = create_cw_signals(t, medium.f, amp, phase)[:, -ppp:]    # (n_sensor, ppp)
+
+    job = {'input': str(tmp_path / 'in.h5'), 'output': str(tmp_path / 'out.h5'), 'shape': shape,
+           'meta': {'dt': dt, 'f0': medium.f, 'x': np.arange(shape[0]), 'y': np.arange(shape[1])}}
+    open(job['input'], 'w').close()
+    with h5py.File(job['output'], 'w') as f:
+        # 与求解器输出相同的布局 (1, 时间, 传感器)
+        f['p'] = signals.T[None].astype(np.float32)
+    result = load_result(reduce_job(job, str(tmp_path / 'result.npz')))
+
+    assert not os.path.exists(job['input']) and not os.path.exists(job['output'])
+    # 传感器按 Fortran 顺序对应 (x, y)
+    expected_amp = amp.reshape(shape, order='F')
+    np.testing.assert_allclose(result['amp'], expected_amp, rtol=1e-5)
+    # 相位只差与传感器无关的常数 (记录起点和 sin/cos 的差别)
+    offset = np.exp(1j * (result['phase'] - phase.reshape(shape, order='F')))
+    np.testing.assert_allclose(offset, offset[0, 0], atol=1e-5)
+
+
+class _ListOptions:
+    """k-wave-python >= 0.4 的执行参数接口"""
+    binary_path = '/opt/kwave/kspaceFirstOrder-OMP'
+
+    def as_list(self, sensor):
+        return ['-t', '4', '-s', str(sensor['start']), '--p_raw']
+
+
+class _StringOptions:
+    """k-wave-python 0.3.x 的执行参数接口"""
+    binary_path = '/opt/kwave/kspaceFirstOrder-OMP'
+
+    def get_options_string(self, sensor):
+        return f" -t 4 -s {sensor['start']} --p_raw"
+
+
+@pytest.mark.parametrize('options', [_ListOptions(), _StringOptions()])
+def test_solver_command_for_both_option_apis(options):
+    command = solver_command(options, {'start': 17}, 'in.h5', 'out.h5')
+    assert command == ['/opt/kwave/kspaceFirstOrder-OMP', '-i', 'in.h5', '-o', 'out.h5',
+                       '-t', '4', '-s', '17', '--p_raw']
+
+
+def test_solver_command_with_installed_kwave():
+    pytest.importorskip('kwave')
+    from kwave.ksensor import kSensor
+    from kwave.options.simulation_execution_options import SimulationExecutionOptions
+    sensor = kSensor(mask=np.ones((2, 2, 2), dtype=bool), record=['p'])
+    sensor.record_start_index = 5
+    options = SimulationExecutionOptions(is_gpu_simulation=False, num_threads=1, verbose_level=0)
+    command = solver_command(options, sensor, 'in.h5', 'out.h5')
+    assert command[:5] == [str(options.binary_path), '-i', 'in.h5', '-o', 'out.h5']
+    assert all(isinstance(part, str) for part in command)
+    assert '-s' in command and command[command.index('-s') + 1] == '5'
+    assert '--p_raw' in command
@@ -0,0 +1,70 @@
+import os
+
+import numpy as np
+import pytest
+
+import kwave_validate
+from annular_array import AnnularArray, Medium
+from kwave_validate import compare_fields, select_ppw
+from rayleigh_field import rayleigh_pressure
+
+MEDIUM = Medium()
+ARRAY = AnnularArray.equal_area(7e-3, 6, 0.6 * MEDIUM.lambda_, 10e-3)
+X = np.linspace(2e-3, 16e-3, 36)      # 轴向
+Y = np.linspace(-3e-3, 3e-3, 41)      # 横向，含 y=0
+
+
+@pytest.fixture(scope='module')
+def rayleigh_amp():
+    Z, Yg = np.meshgrid(X, Y, indexing='ij')
+    return np.abs(rayleigh_pressure(ARRAY, MEDIUM, Yg, Z))
+
+
+def _result(array, amp):
+    return {'a1': array.a1, 'a2': array.a2, 'F': array.F, 'c': MEDIUM.c, 'rho0': MEDIUM.rho0,
+            'f0': MEDIUM.f, 'u': MEDIUM.u, 'x': X, 'y': Y, 'amp': amp, 'geometry': 'flat'}
+
+
+def test_rayleigh_field_passes_comparison(rayleigh_amp):
+    metrics = compare_fields(_result(ARRAY, rayleigh_amp))
+    assert metrics['lateral_error'] < 1e-6
+    assert metrics['focal_error'] < 1e-3
+    assert abs(metrics['focal_shift']) <= X[1] - X[0]
+
+
+def test_focal_plane_beyond_z_min(rayleigh_amp):
+    result = _result(ARRAY, rayleigh_amp)
+    default = compare_fields(result, rayleigh=False)
+    # z_min > F 时焦平面仍取 x 最接近 F 的网格面，而不是回绕到其他行
+    beyond = compare_fields(result, z_min=1.2 * ARRAY.F, rayleigh=False)
+    assert beyond['width_error'] == pytest.approx(default['width_error'])
+    with pytest.raises(ValueError):
+        compare_fields(result, z_min=2 * X.max())
+
+
+def test_select_ppw_picks_coarsest_passing_grid(tmp_path, monkeypatch, rayleigh_amp):
+    runs = []
+
+    def fake_run_batch(arrays, medium, out_dir, names, settings, **options):
+        # 代替求解器：Rayleigh 场乘以随网格加密而减小的误差 0.5/ppw²
+        name = names[0]
+        runs.append(name)
+        path = os.path.join(out_dir, name + '.npz')
+        if not os.path.exists(path):
+            np.savez(path, **_result(arrays[0], rayleigh_amp * (1 + 0.5 / settings.ppw ** 2)))
+        return {name: path}, {}
+
+    monkeypatch.setattr(kwave_validate, 'run_batch', fake_run_batch)
+    selection = select_ppw(ARRAY, MEDIUM, str(tmp_path), tol=0.05)
+    # 0.5/ppw²：2 → 0.125，2.5 → 0.08，3 → 0.056，4 → 0.031
+    assert selection['ppw'] == 4
+    assert [row['ppw'] for row in selection['table']] == [2, 2.5, 3, 4]
+    for row in selection['table']:
+        assert row['focal_error'] == pytest.approx(0.5 / row['ppw'] ** 2, rel=0.05)
+
+    # 同一目录中的另一个设计不能复用前一个设计的结果
+    other = AnnularArray.equal_area(6e-3, 5, 0.6 * MEDIUM.lambda_, 10e-3)
+    first = set(runs)
+    runs.clear()
+    select_ppw(other, MEDIUM, str(tmp_path), tol=0.05)
+    assert first.isdisjoint(runs)
@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+from annular_array import AnnularArray, Medium, annular_array_pressure_axis
+from pulse_field import steady_state_amplitude, tone_burst, transmit_pressure
+
+F0, FS = 4e6, 400e6
+Z = np.array([5e-3])
+
+
+@pytest.fixture(scope='module')
+def setup():
+    medium = Medium(f=F0)
+    array = AnnularArray.equal_area(7e-3, 6, 0.6 * medium.lambda_, 10e-3)
+    cw = np.abs(annular_array_pressure_axis(array, medium, Z))
+    return array, medium, cw
+
+
+@pytest.mark.parametrize('window', ['rect', 'tukey'])
+def test_steady_state_matches_cw(setup, window):
+    array, medium, cw = setup
+    amplitude = steady_state_amplitude(array, medium, 0 * Z, Z, tone_burst(F0, 40, FS, window), FS)
+    np.testing.assert_allclose(amplitude, cw, rtol=0.02)
+
+
+def test_tukey_burst_has_no_edge_spike(setup):
+    array, medium, cw = setup
+    _, rect = transmit_pressure(array, medium, 0 * Z, Z, tone_burst(F0, 40, FS, 'rect'), FS)
+    _, windowed = transmit_pressure(array, medium, 0 * Z, Z, tone_burst(F0, 40, FS, 'tukey'), FS)
+    assert np.abs(rect).max() > 2 * cw[0]
+    assert np.abs(windowed).max() < 1.3 * cw[0]
+
+
+def test_short_burst_has_no_steady_state(setup):
+    array, medium, _ = setup
+    with pytest.raises(ValueError):
+        steady_state_amplitude(array, medium, 0 * Z, Z, tone_burst(F0, 2, FS), FS)
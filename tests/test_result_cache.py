@@ -0,0 +1,62 @@
+import os
+
+import numpy as np
+
+import beam_metrics
+from result_cache import VERSION_MARKER, ResultCache
+
+
+def _counting(cache):
+    calls = []
+
+    @cache.memoize
+    def square(x):
+        calls.append(x)
+        return np.asarray(x) ** 2
+
+    return square, calls
+
+
+def test_memoize_hits_on_repeated_call(tmp_path):
+    square, calls = _counting(ResultCache(str(tmp_path)))
+    np.testing.assert_array_equal(square(np.arange(3)), [0, 1, 4])
+    np.testing.assert_array_equal(square(np.arange(3)), [0, 1, 4])
+    assert len(calls) == 1
+    square(np.arange(4))
+    assert len(calls) == 2
+
+
+def test_kernel_version_change_misses(tmp_path, monkeypatch):
+    square, calls = _counting(ResultCache(str(tmp_path)))
+    square(np.arange(3))
+    monkeypatch.setattr(beam_metrics, 'KERNEL_VERSION', beam_metrics.KERNEL_VERSION + 1)
+    square, calls = _counting(ResultCache(str(tmp_path)))
+    square(np.arange(3))
+    assert len(calls) == 1
+
+
+def test_evict_removes_oldest_until_under_limit(tmp_path):
+    cache = ResultCache(str(tmp_path), max_bytes=1 << 30)
+    for i in range(4):
+        key = cache.key(i=i)
+        cache.put(key, np.zeros(1000))
+        os.utime(cache._path(key), (1000 + i, 1000 + i))
+    size = os.path.getsize(cache._path(cache.key(i=0)))
+    cache.max_bytes = 2 * size
+    cache.evict()
+    assert [cache.get(cache.key(i=i)) is not None for i in range(4)] == [False, False, True, True]
+
+
+def test_prune_only_removes_marked_versions(tmp_path):
+    old = ResultCache(str(tmp_path), version='old')
+    old.put(old.key(x=1), np.ones(3))
+    (tmp_path / 'notes').mkdir()
+    (tmp_path / 'notes' / 'keep.txt').write_text('x')
+    # 标记内容与目录名不一致的目录也保留
+    (tmp_path / 'copied').mkdir()
+    (tmp_path / 'copied' / VERSION_MARKER).write_text('other')
+
+    cache = ResultCache(str(tmp_path), version='new')
+    assert cache.prune() == ['old']
+    assert sorted(os.listdir(tmp_path)) == ['copied', 'new', 'notes']
+    assert (tmp_path / 'notes' / 'keep.txt').exists()
@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+from scipy.optimize import brentq
+
+from ring_impedance import (PZT, PiezoMaterial, calculate_k15t, calculate_tau, quarter_wave_thickness,
+                            resonance_frequencies, ring_impedance)
+
+A1 = np.array([0.0, 1e-3, 3e-3, 5e-3])
+A2 = np.array([2e-3, 2.5e-3, 4e-3, 5.3e-3])
+
+
+def test_resonance_matches_brentq():
+    thickness = quarter_wave_thickness()
+    fr, fa, k_eff = resonance_frequencies(A1, A2, thickness)
+    k2 = calculate_k15t(calculate_tau(A1, A2)) ** 2
+    scale = np.real(PZT.Ct) / (np.pi * thickness)   # f = x·Ct/(π·l)
+    for i in range(len(A1)):
+        x = brentq(lambda x: k2[i] * np.tan(x) - x, 1e-9, np.pi / 2 - 1e-12, xtol=1e-15)
+        assert fr[i] == pytest.approx(x * scale, rel=1e-10)
+    np.testing.assert_allclose(fa, np.pi / 2 * scale)
+    np.testing.assert_allclose(k_eff, np.sqrt(1 - (fr / fa) ** 2))
+
+
+def test_impedance_zero_at_fr_and_pole_at_fa():
+    thickness = quarter_wave_thickness()
+    fr, fa, _ = resonance_frequencies(A1, A2, thickness)
+    for i in range(len(A1)):
+        reference = np.abs(ring_impedance(A1[i], A2[i], [0.5 * fr[i]], thickness))[0]
+        assert np.abs(ring_impedance(A1[i], A2[i], [fr[i]], thickness))[0] < 1e-8 * reference
+        # 从下方接近 fa 时 |Z| 单调增大且无界
+        delta = np.array([1e-1, 1e-2, 1e-3, 1e-4, 1e-5])
+        near = np.abs(ring_impedance(A1[i], A2[i], fa[i] * (1 - delta), thickness))
+        assert np.all(np.diff(near) > 0)
+        assert near[-1] > 1e3 * reference
+
+
+def test_no_resonance_when_coupling_too_strong():
+    material = PiezoMaterial(h15=-1e10)
+    assert np.all(calculate_k15t(calculate_tau(A1, A2), material) ** 2 >= 1)
+    fr, _, k_eff = resonance_frequencies(A1, A2, material=material)
+    assert np.all(np.isnan(fr)) and np.all(np.isnan(k_eff))
@@ -0,0 +1,26 @@
+import math
+
+import numpy as np
+import pytest
+
+from sound_field import C0, F0, JincTable, jinc
+
+
+@pytest.mark.parametrize('tol', [1e-4, 1e-6, 1e-8])
+def test_jinc_table_error_bound(tol):
+    k = 2 * math.pi * F0 / C0
+    table = JincTable.for_aperture(k, 25e-3, tol)
+    # 整个表范围内的密集网格，外加每个区间的中点 (线性插值误差最大处)、
+    # x=0 附近和最后一个网格点两侧的点
+    dense = np.linspace(0, table.x_max, 2_000_001)
+    midpoints = (np.arange(int(table.x_max / table.step)) + 0.5) * table.step
+    near_zero = np.concatenate([[0.0], np.logspace(-12, 0, 200) * table.step])
+    last = table.x_max + np.linspace(-2, 2, 401) * table.step
+    x = np.concatenate([dense, midpoints, near_zero, -near_zero, last, -last])
+    assert np.max(np.abs(table(x) - jinc(x))) <= tol
+
+
+def test_jinc_limit_at_zero():
+    assert jinc(0.0) == 1.0
+    assert JincTable(10.0)(0.0) == 1.0
+    assert np.isclose(jinc(1e-8), 1.0)